@@ -0,0 +1,231 @@
+"""
+Columnar analytics engine.
+Lap records are converted to numpy arrays once; every metric is then a grouped reduction
+over sorted arrays (medians, stdevs, least-squares slopes, minima) instead of a Python
+regroup-and-rescan of the lap list. Results match the per-metric functions in
+consistency.py, degradation.py, pace.py and qualifying.py, which remain the reference.
+"""
+import math
+import re
+from typing import Optional
+import numpy as np
+import pandas as pd
+from analytics.consistency import MAX_STD_MS
+from analytics.qualifying import SECTORS
+
+# Track status codes for safety car, VSC and red flag
+NEUTRALISED = r"[456]"
+EVOLUTION_BUCKET_S = 300
+
+_FLOAT_FIELDS = (
+    "lap_number", "lap_time_ms", "sector1_ms", "sector2_ms", "sector3_ms", "stint", "gap_ahead_s", "session_time_s",
+)
+
+
+def lap_columns(laps: list[dict]) -> dict[str, np.ndarray]:
+    """
+    Lap records (get_laps contract) → one array per field. Numbers are float64 with NaN
+    for missing; driver_id and compound are object arrays, with the defaults the per-metric
+    functions apply to missing keys. Track status is reduced to two flags up front:
+    neutralised (SC, VSC or red flag) and green ("" or "1").
+    """
+    columns = {
+        "driver_id": np.array([lap.get("driver_id") or "" for lap in laps], dtype=object),
+        "compound": np.array([lap.get("compound", "UNKNOWN") for lap in laps], dtype=object),
+    }
+    for field in _FLOAT_FIELDS:
+        columns[field] = np.array([lap.get(field) for lap in laps], dtype=np.float64)
+
+    columns["track_status"] = np.array([str(lap.get("track_status", "")) for lap in laps], dtype=object)
+    return with_status_flags(columns)
+
+
+def with_status_flags(columns: dict) -> dict:
+    """
+    Add the neutralised and green flags to lap columns that carry track_status as strings
+    (lap_columns, or get_laps(columnar=True) output).
+    """
+    # A session has a handful of distinct statuses: classify those, then broadcast
+    codes, statuses = pd.factorize(columns["track_status"])
+    statuses = np.asarray(statuses, dtype=object)
+    return {
+        **columns,
+        "neutralised": np.array([re.search(NEUTRALISED, str(s)) is not None for s in statuses], dtype=bool)[codes],
+        "green": np.isin(statuses, ["", "1"])[codes],
+    }
+
+
+def _factorize(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Integer group codes in order of first appearance, and the distinct values (as given, None kept)."""
+    codes, _ = pd.factorize(values, use_na_sentinel=False)
+    _, first = np.unique(codes, return_index=True)
+    return codes, np.asarray(values, dtype=object)[first]
+
+
+def _sorted_groups(groups: np.ndarray, values: np.ndarray, n_groups: int):
+    """Sort by (group, value); returns the sorted arrays, group sizes and group start offsets."""
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return groups, values, counts, starts
+
+
+def _grouped_median(values: np.ndarray, counts: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Per-group median of values sorted by (group, value); NaN for empty groups."""
+    present = counts > 0
+    lo = starts + np.maximum(counts - 1, 0) // 2
+    hi = starts + counts // 2
+    out = np.full(len(counts), np.nan)
+    out[present] = (values[lo[present]] + values[hi[present]]) / 2
+    return out
+
+
+def _grouped_stdev(groups: np.ndarray, values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Per-group sample standard deviation (ddof=1); NaN for groups of fewer than two."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.bincount(groups, values, minlength=len(counts)) / counts
+        squares = np.bincount(groups, (values - means[groups]) ** 2, minlength=len(counts))
+        return np.where(counts >= 2, np.sqrt(squares / (counts - 1)), np.nan)
+
+
+# ─── Per-driver metrics ──────────────────────────────────────────────────────
+
+def consistency_per_driver(columns: dict) -> dict[str, float]:
+    """compute_consistency_per_driver: 0–100 score from the stdev of clean laps, outliers removed."""
+    drivers, names = _factorize(columns["driver_id"])
+    n = len(names)
+    t = columns["lap_time_ms"]
+    valid = (t > 0) & ~columns["neutralised"]  # NaN compares False
+
+    groups, times, counts, starts = _sorted_groups(drivers[valid], t[valid], n)
+    median = _grouped_median(times, counts, starts)
+    std = _grouped_stdev(groups, times, counts)
+    # Outlier filter only applies to drivers with at least 3 laps
+    keep = (counts[groups] < 3) | (np.abs(times - median[groups]) <= 2 * std[groups])
+    groups, times = groups[keep], times[keep]
+    counts = np.bincount(groups, minlength=n)
+    std = _grouped_stdev(groups, times, counts)
+
+    return {
+        name: round(max(0.0, 100.0 * (1.0 - float(std[i]) / MAX_STD_MS)), 1) if counts[i] >= 3 else 0.0
+        for i, name in enumerate(names)
+        if name
+    }
+
+
+def degradation_slopes(columns: dict) -> dict:
+    """
+    compute_degradation_slope: least-squares slope of lap time vs lap number per
+    driver → stint → compound, first and last lap of longer stints excluded.
+    """
+    t, x, stint = columns["lap_time_ms"], columns["lap_number"], columns["stint"]
+    valid = ~np.isnan(t) & ~np.isnan(x) & ~np.isnan(stint) & ~columns["neutralised"]
+    t, x, stint = t[valid], x[valid], stint[valid]
+    drivers, driver_names = _factorize(columns["driver_id"][valid])
+    stints, stint_values = _factorize(stint)
+    compounds, compound_names = _factorize(columns["compound"][valid])
+    key = (drivers * len(stint_values) + stints) * max(len(compound_names), 1) + compounds
+    groups, group_keys = pd.factorize(key)
+    n = len(group_keys)
+    if n == 0:
+        return {}
+
+    # Order laps by lap number within each group (stable, like list.sort)
+    order = np.lexsort((x, groups))
+    groups, x, t = groups[order], x[order], t[order]
+    lap_count = np.bincount(groups, minlength=n)
+    starts = np.concatenate(([0], np.cumsum(lap_count)[:-1]))
+    position = np.arange(len(groups)) - starts[groups]
+    size = lap_count[groups]
+    rep = (size <= 3) | ((position >= 1) & (position <= size - 2))
+    groups, x, t = groups[rep], x[rep], t[rep]
+    m = np.bincount(groups, minlength=n)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = x - (np.bincount(groups, x, minlength=n) / m)[groups]
+        dy = t - (np.bincount(groups, t, minlength=n) / m)[groups]
+        sxx = np.bincount(groups, dx * dx, minlength=n)
+        sxy = np.bincount(groups, dx * dy, minlength=n)
+        slope = np.where((m >= 3) & (sxx != 0), sxy / sxx, np.nan)
+
+    _, y_sorted, counts, y_starts = _sorted_groups(groups, t, n)
+    median = _grouped_median(y_sorted, counts, y_starts)
+
+    # Decode group keys and build the output from plain Python lists
+    n_compounds = max(len(compound_names), 1)
+    driver_idx, rest = np.divmod(group_keys, len(stint_values) * n_compounds)
+    stint_idx, compound_idx = np.divmod(rest, n_compounds)
+    result: dict = {}
+    for d, s, c, b, count, med in zip(
+        driver_idx.tolist(), stint_idx.tolist(), compound_idx.tolist(),
+        slope.tolist(), lap_count.tolist(), median.tolist(),
+    ):
+        result.setdefault(driver_names[d], []).append({
+            "stint": int(stint_values[s]),
+            "compound": compound_names[c],
+            "slope_ms_per_lap": None if math.isnan(b) else round(b, 3),  # NaN: too few laps or flat x
+            "lap_count": count,
+            "median_time_ms": round(med, 1),
+        })
+    return result
+
+
+def sector_bests(columns: dict) -> dict[str, dict[str, float]]:
+    """driver_sector_bests: each driver's best time per sector."""
+    drivers, names = _factorize(columns["driver_id"])
+    bests: dict = {}
+    for sec, key in SECTORS:
+        v = columns[key]
+        valid = (v != 0) & ~np.isnan(v)
+        best = np.full(len(names), np.inf)
+        np.minimum.at(best, drivers[valid], v[valid])
+        for i in np.flatnonzero(np.isfinite(best)):
+            if names[i]:
+                bests.setdefault(names[i], {})[sec] = float(best[i])
+    return bests
+
+
+def track_evolution_per_driver(columns: dict, session_time_s: np.ndarray) -> dict[str, list[dict]]:
+    """compute_track_evolution of each driver's laps: best lap time per 5-minute bucket."""
+    drivers, names = _factorize(columns["driver_id"])
+    t = columns["lap_time_ms"]
+    valid = ~np.isnan(t) & ~np.isnan(session_time_s)
+    buckets = (session_time_s[valid] // EVOLUTION_BUCKET_S).astype(np.int64) * EVOLUTION_BUCKET_S
+    drivers, t = drivers[valid], t[valid]
+
+    # Fastest lap first within each (driver, bucket)
+    order = np.lexsort((t, buckets, drivers))
+    drivers, buckets, t = drivers[order], buckets[order], t[order]
+    first = np.ones(len(t), dtype=bool)
+    first[1:] = (drivers[1:] != drivers[:-1]) | (buckets[1:] != buckets[:-1])
+
+    curves: dict = {name: [] for name in names}
+    for d, bucket, best in zip(drivers[first], buckets[first], t[first]):
+        curves[names[d]].append({"session_time_s": int(bucket), "best_lap_time_ms": float(best)})
+    return curves
+
+
+# ─── Session metrics ─────────────────────────────────────────────────────────
+
+def clean_air_baseline(columns: dict, gap_threshold_s: float = 2.0) -> Optional[float]:
+    """estimate_clean_air_baseline: median time of green-flag laps with a gap ahead over the threshold."""
+    t, gap = columns["lap_time_ms"], columns["gap_ahead_s"]
+    clean = t[(t != 0) & ~np.isnan(t) & (gap > gap_threshold_s) & columns["green"]]
+    if len(clean) < 3:
+        return None
+    return round(float(np.median(clean)), 1)
+
+
+def traffic_loss(columns: dict, baseline_ms: Optional[float], gap_threshold_s: float = 1.0) -> Optional[float]:
+    """estimate_traffic_loss: mean excess over baseline of green-flag laps in traffic."""
+    if baseline_ms is None:
+        return None
+    t, gap = columns["lap_time_ms"], columns["gap_ahead_s"]
+    traffic = t[(t != 0) & ~np.isnan(t) & (gap < gap_threshold_s) & columns["green"]]
+    if len(traffic) < 2:
+        return None
+    excess = traffic[traffic > baseline_ms] - baseline_ms
+    if len(excess) == 0:
+        return 0.0
+    return round(float(np.mean(excess)), 1)
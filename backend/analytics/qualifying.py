@@ -2,6 +2,7 @@
 Qualifying analytics — teammate delta, track evolution, peak performance window.
 """
 import statistics
+from collections import defaultdict
 from typing import Optional
 
 
@@ -22,25 +23,22 @@ def compute_teammate_delta(driver_best_ms: float, teammate_best_ms: float) -> di
 def compute_track_evolution(laps_by_time: list[dict]) -> list[dict]:
     """
     Computes track evolution curve: lap time improvement trend over session clock.
-    laps_by_time: sorted list of {driver_id, lap_time_ms, session_time_s}
-    Returns rolling best lap time per time bucket (every 5 minutes).
+    laps_by_time: list of {driver_id, lap_time_ms, session_time_s}; laps without a
+    lap time or session time are skipped.
+    Returns best lap time per time bucket (every 5 minutes).
     """
-    if not laps_by_time:
-        return []
     bucket_size = 300  # 5 minutes in seconds
-    buckets: dict = {}
-    for lap in laps_by_time:
-        t = lap.get("session_time_s", 0)
-        lt = lap.get("lap_time_ms")
-        if lt is None:
-            continue
-        bucket = int(t // bucket_size) * bucket_size
-        if bucket not in buckets or lt < buckets[bucket]:
-            buckets[bucket] = lt
-    return [
-        {"session_time_s": k, "best_lap_time_ms": v}
-        for k, v in sorted(buckets.items())
-    ]
+    # Sorted by (bucket, lap time): each bucket's first entry is its best lap
+    timed = sorted(
+        (int(lap["session_time_s"] // bucket_size) * bucket_size, lap["lap_time_ms"])
+        for lap in laps_by_time
+        if lap.get("lap_time_ms") is not None and lap.get("session_time_s") is not None
+    )
+    curve: list[dict] = []
+    for bucket, lt in timed:
+        if not curve or curve[-1]["session_time_s"] != bucket:
+            curve.append({"session_time_s": bucket, "best_lap_time_ms": lt})
+    return curve
 
 
 def compute_peak_performance_window(laps: list[dict]) -> dict:
@@ -65,20 +63,47 @@ def compute_peak_performance_window(laps: list[dict]) -> dict:
     }
 
 
-def sector_dominance(laps: list[dict]) -> dict:
+SECTORS = [("sector1", "sector1_ms"), ("sector2", "sector2_ms"), ("sector3", "sector3_ms")]
+
+
+def merge_track_evolution(curves: list[list[dict]]) -> list[dict]:
     """
-    Returns driver with fastest S1, S2, S3 across all laps in the session.
+    Combine compute_track_evolution curves of disjoint lap sets (e.g. one per driver)
+    into the curve of all their laps: best lap time per bucket across curves.
     """
-    sectors = {"sector1": {}, "sector2": {}, "sector3": {}}
+    buckets: dict = {}
+    for curve in curves:
+        for point in curve:
+            bucket, lt = point["session_time_s"], point["best_lap_time_ms"]
+            if bucket not in buckets or lt < buckets[bucket]:
+                buckets[bucket] = lt
+    return [
+        {"session_time_s": k, "best_lap_time_ms": v}
+        for k, v in sorted(buckets.items())
+    ]
+
+
+def driver_sector_bests(laps: list[dict]) -> dict[str, dict[str, float]]:
+    """Each driver's best time per sector: {driver_id: {sector1: ms, ...}}."""
+    bests: dict = {}
     for lap in laps:
-        for sec, key in [("sector1", "sector1_ms"), ("sector2", "sector2_ms"), ("sector3", "sector3_ms")]:
+        driver = lap.get("driver_id")
+        if not driver:
+            continue
+        for sec, key in SECTORS:
             val = lap.get(key)
-            driver = lap.get("driver_id")
-            if val and driver:
-                if driver not in sectors[sec] or val < sectors[sec][driver]:
-                    sectors[sec][driver] = val
+            if val:
+                driver_bests = bests.setdefault(driver, {})
+                if sec not in driver_bests or val < driver_bests[sec]:
+                    driver_bests[sec] = val
+    return bests
+
+
+def sector_dominance_from_bests(bests: dict[str, dict[str, float]]) -> dict:
+    """sector_dominance from driver_sector_bests output (possibly merged from several lap sets)."""
     result = {}
-    for sec, driver_times in sectors.items():
+    for sec, _ in SECTORS:
+        driver_times = {driver: times[sec] for driver, times in bests.items() if sec in times}
         if driver_times:
             best_driver = min(driver_times, key=lambda d: driver_times[d])
             result[sec] = {
@@ -86,3 +111,60 @@ def sector_dominance(laps: list[dict]) -> dict:
                 "time_ms": round(driver_times[best_driver], 1),
             }
     return result
+
+
+def sector_dominance(laps: list[dict]) -> dict:
+    """
+    Returns driver with fastest S1, S2, S3 across all laps in the session.
+    """
+    return sector_dominance_from_bests(driver_sector_bests(laps))
+
+
+def qualifying_summary(laps: list[dict]) -> dict:
+    """
+    Peak performance window and teammate deltas of a qualifying session, from one pass
+    grouping its laps by driver and team (the laps' team field). Returns
+    {peak_window, drivers: {driver_id: {team, best_lap_ms, peak_window}}, teammate_deltas},
+    with one delta per pair of drivers who set a time for the same team.
+    """
+    timed: dict = defaultdict(list)
+    teams: dict = {}
+    for lap in laps:
+        driver = lap.get("driver_id")
+        if not driver:
+            continue
+        if lap.get("team"):
+            teams[driver] = lap["team"]
+        if lap.get("lap_time_ms"):
+            timed[driver].append(lap)
+
+    best = {driver: min(l["lap_time_ms"] for l in driver_laps) for driver, driver_laps in timed.items()}
+    drivers = {
+        driver: {
+            "team": teams.get(driver),
+            "best_lap_ms": round(best[driver], 1),
+            "peak_window": compute_peak_performance_window(timed[driver]),
+        }
+        for driver in sorted(timed)
+    }
+
+    by_team: dict = defaultdict(list)
+    for driver in drivers:
+        if teams.get(driver):
+            by_team[teams[driver]].append(driver)
+    teammate_deltas = [
+        {
+            "team": team,
+            "driver_id": driver,
+            "teammate_id": teammate,
+            **compute_teammate_delta(best[driver], best[teammate]),
+        }
+        for team, members in sorted(by_team.items())
+        for i, driver in enumerate(members)
+        for teammate in members[i + 1:]
+    ]
+    return {
+        "peak_window": compute_peak_performance_window([lap for driver_laps in timed.values() for lap in driver_laps]),
+        "drivers": drivers,
+        "teammate_deltas": teammate_deltas,
+    }
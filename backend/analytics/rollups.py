@@ -0,0 +1,153 @@
+"""
+Season rollups — per driver × session × compound aggregates of representative laps,
+written at ingestion so season-wide questions are answered without re-reading laps.
+Each row keeps count, sum and sum of squares of lap times (mean, stdev), regression sums
+against tyre age (degradation slope), and a quantile sketch of the lap times
+(analytics.sketch) that merges into season-level medians and percentiles.
+"""
+import math
+from typing import Optional
+import numpy as np
+import pandas as pd
+from analytics.consistency import MAX_STD_MS
+from analytics.sketch import QuantileSketch
+
+SUM_FIELDS = ("laps", "sum_ms", "sum_sq_ms", "sum_x", "sum_xx", "sum_xy")
+
+
+def encode_sketch(times) -> bytes:
+    """Quantile sketch of a rollup row's lap times, serialized. Exact at per-row sizes."""
+    sketch = QuantileSketch()
+    sketch.update_many(times)
+    return sketch.to_bytes()
+
+
+def session_rollups(columns: dict) -> list[dict]:
+    """
+    Rollup rows for one session from lap columns with status flags (engine.with_status_flags).
+    Representative laps follow compute_degradation_slope: timed, stint known, not under
+    SC/VSC/red flag, and not the first or last lap of a stint longer than 3 laps.
+    x is the lap's position in its stint (tyre age). Rows: {driver_id (code), compound,
+    laps, sum_ms, sum_sq_ms, sum_x, sum_xx, sum_xy, sketch (encode_sketch)}.
+    """
+    t, lap_number, stint = columns["lap_time_ms"], columns["lap_number"].astype(np.float64), columns["stint"]
+    driver, compound = columns["driver_id"], columns["compound"]
+    valid = ~np.isnan(t) & ~np.isnan(stint) & ~columns["neutralised"] & (driver != "")
+    if not valid.any():
+        return []
+    frame = pd.DataFrame({
+        "driver_id": driver[valid], "compound": compound[valid], "stint": stint[valid],
+        "lap_number": lap_number[valid], "t": t[valid],
+    }).sort_values(["driver_id", "stint", "compound", "lap_number"], kind="stable")
+
+    by_stint = frame.groupby(["driver_id", "stint", "compound"], sort=False, dropna=False)
+    frame["x"] = by_stint.cumcount().astype(np.float64)
+    size = by_stint["t"].transform("size")
+    frame = frame[(size <= 3) | ((frame["x"] >= 1) & (frame["x"] <= size - 2))]
+    frame = frame.assign(t2=frame["t"] ** 2, xx=frame["x"] ** 2, xy=frame["x"] * frame["t"])
+
+    grouped = frame.groupby(["driver_id", "compound"], sort=False, dropna=False)
+    sums = grouped.agg(
+        laps=("t", "size"), sum_ms=("t", "sum"), sum_sq_ms=("t2", "sum"),
+        sum_x=("x", "sum"), sum_xx=("xx", "sum"), sum_xy=("xy", "sum"),
+    )
+    sketches = grouped["t"].agg(lambda s: encode_sketch(s.to_numpy()))
+    return [
+        {
+            "driver_id": driver_id,
+            "compound": compound if isinstance(compound, str) else None,
+            **{field: (int(row[field]) if field == "laps" else float(row[field])) for field in SUM_FIELDS},
+            "sketch": sketch,
+        }
+        for ((driver_id, compound), row), sketch in zip(sums.iterrows(), sketches)
+    ]
+
+
+def _merge(rows: list[dict]) -> dict:
+    merged = {field: sum(row[field] for row in rows) for field in SUM_FIELDS}
+    # Fixed seed: the same rows always give the same answer
+    merged["sketch"] = QuantileSketch.merged((QuantileSketch.from_bytes(row["sketch"]) for row in rows), seed=0)
+    return merged
+
+
+def _centred(row: dict) -> tuple[float, float]:
+    """Within-row Sxx and Sxy (sums of centred squares / products) from raw sums."""
+    n = row["laps"]
+    return row["sum_xx"] - row["sum_x"] ** 2 / n, row["sum_xy"] - row["sum_x"] * row["sum_ms"] / n
+
+
+def pooled_slope(rows: list[dict]) -> Optional[float]:
+    """
+    Lap time gained per lap of tyre age, pooled across rows: each row is centred on its
+    own means, so pace differences between drivers and circuits do not bias the slope.
+    """
+    sxx = sxy = 0.0
+    for row in rows:
+        if row["laps"] >= 3:
+            row_sxx, row_sxy = _centred(row)
+            sxx += row_sxx
+            sxy += row_sxy
+    return sxy / sxx if sxx > 0 else None
+
+
+def pooled_stdev(rows: list[dict]) -> Optional[float]:
+    """Within-row standard deviation pooled across rows (compound pace offsets removed)."""
+    squares = sum(row["sum_sq_ms"] - row["sum_ms"] ** 2 / row["laps"] for row in rows if row["laps"] >= 2)
+    dof = sum(row["laps"] - 1 for row in rows if row["laps"] >= 2)
+    return math.sqrt(max(squares / dof, 0.0)) if dof > 0 else None
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return round(value, 1) if value is not None else None
+
+
+def season_degradation(rows: list[dict]) -> list[dict]:
+    """Per compound across the rows (e.g. a season): pooled slope, lap count, lap time median and p10/p90."""
+    by_compound: dict = {}
+    for row in rows:
+        by_compound.setdefault(row["compound"], []).append(row)
+    result = []
+    for compound, compound_rows in sorted(by_compound.items(), key=lambda item: str(item[0])):
+        merged = _merge(compound_rows)
+        slope = pooled_slope(compound_rows)
+        p10, median, p90 = merged["sketch"].quantiles((0.1, 0.5, 0.9))
+        result.append({
+            "compound": compound,
+            "slope_ms_per_lap": round(slope, 3) if slope is not None else None,
+            "laps": merged["laps"],
+            "drivers": len({row["driver_id"] for row in compound_rows}),
+            "rounds": len({(row["season"], row["round"]) for row in compound_rows}),
+            "median_time_ms": _rounded(median),
+            "p10_time_ms": _rounded(p10),
+            "p90_time_ms": _rounded(p90),
+        })
+    return result
+
+
+def consistency_trend(rows: list[dict]) -> dict[str, list[dict]]:
+    """
+    Per driver, one point per session in (season, round) order: laps, mean and median lap
+    time, pooled stdev and the consistency score on the compute_consistency_index scale.
+    Unlike the per-session metric, outliers are not removed (the rollups keep no raw laps).
+    """
+    sessions: dict = {}
+    for row in rows:
+        sessions.setdefault(row["driver_id"], {}).setdefault((row["season"], row["round"]), []).append(row)
+    trend = {}
+    for driver_id in sorted(sessions):
+        points = []
+        for (season, round_num), session_rows in sorted(sessions[driver_id].items()):
+            merged = _merge(session_rows)
+            std = pooled_stdev(session_rows)
+            points.append({
+                "season": season,
+                "round": round_num,
+                "laps": merged["laps"],
+                "mean_time_ms": round(merged["sum_ms"] / merged["laps"], 1) if merged["laps"] else None,
+                "median_time_ms": _rounded(merged["sketch"].median()),
+                "stdev_ms": round(std, 1) if std is not None else None,
+                "consistency": round(max(0.0, 100.0 * (1.0 - std / MAX_STD_MS)), 1)
+                if std is not None and merged["laps"] >= 3 else 0.0,
+            })
+        trend[driver_id] = points
+    return trend
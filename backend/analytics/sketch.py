@@ -0,0 +1,159 @@
+"""
+Mergeable quantile sketch (KLL — Karnin, Lang & Liberty, 2016) for medians and
+percentiles over lap sets too large to keep, e.g. a season of rollup rows.
+
+Items live in levels of compactors; an item at level h stands for 2**h inputs. When the
+sketch outgrows its budget a full level is sorted and every other item (random offset)
+is promoted one level up, halving its size while preserving total weight. Sketches of
+disjoint data merge by concatenating levels and compacting again.
+
+Error bound: with k = 200 the rank of a returned quantile differs from the requested rank
+by at most 1.65% of n with 99% probability (the bound Apache DataSketches publishes for
+KLL at the same k); tests hold merged sketches to 2%. Until the first compaction — about
+k items — the sketch keeps every item and is exact. Memory stays near 3k items
+(~5 KB serialized) however many items are added.
+"""
+import itertools
+import math
+import random
+import struct
+from typing import Iterable, Optional
+import numpy as np
+
+DEFAULT_K = 200
+MIN_CAPACITY = 8
+_CAPACITY_DECAY = 2 / 3
+
+# magic, version, k, n, min, max, number of levels; then uint32 level sizes, then float64 items
+_MAGIC = b"OF1Q"
+_VERSION = 1
+_HEADER = struct.Struct("<4sBHqddH")
+
+
+class QuantileSketch:
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.levels: list[list[float]] = [[]]
+        self._seed = seed
+        self._rng: Optional[random.Random] = None  # created at the first compaction; seeding is not free
+
+    # ─── Building ────────────────────────────────────────────────────────────
+
+    def update(self, value: float) -> None:
+        self.update_many((value,))
+
+    def update_many(self, values: Iterable[float]) -> None:
+        """Add values; NaN and None are ignored."""
+        values = [float(v) for v in values if v is not None and v == v]
+        if not values:
+            return
+        self.n += len(values)
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+        self.levels[0].extend(values)
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold another sketch into this one (in place); returns self."""
+        if other.n == 0:
+            return self
+        self.k = min(self.k, other.k)
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, level in enumerate(other.levels):
+            self.levels[h].extend(level)
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    @classmethod
+    def merged(cls, sketches: Iterable["QuantileSketch"], seed: Optional[int] = None) -> "QuantileSketch":
+        out = cls(seed=seed)
+        for sketch in sketches:
+            out.merge(sketch)
+        return out
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(MIN_CAPACITY, math.ceil(self.k * _CAPACITY_DECAY ** depth))
+
+    def _compress(self) -> None:
+        if sum(map(len, self.levels)) <= self.k:
+            return  # within the top level's capacity alone
+        if self._rng is None:
+            self._rng = random.Random(self._seed)
+        while sum(map(len, self.levels)) > sum(self._capacity(h) for h in range(len(self.levels))):
+            for h, level in enumerate(self.levels):
+                if len(level) >= self._capacity(h):
+                    if h + 1 == len(self.levels):
+                        self.levels.append([])
+                    items = sorted(level)
+                    # An odd item out stays at this level so no weight is lost
+                    keep = [items.pop()] if len(items) % 2 else []
+                    self.levels[h + 1].extend(items[self._rng.randint(0, 1)::2])
+                    self.levels[h] = keep
+                    break
+
+    # ─── Queries ─────────────────────────────────────────────────────────────
+
+    @property
+    def exact(self) -> bool:
+        """True until the first compaction: every added item is still held."""
+        return all(not level for level in self.levels[1:])
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Value at quantile q (0..1), None if empty. While exact, linear interpolation between
+        the closest ranks (statistics.median for q=0.5); afterwards the smallest retained
+        item whose cumulative weight reaches q·n.
+        """
+        if self.n == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        if self.exact:
+            items = sorted(self.levels[0])
+            position = q * (len(items) - 1)
+            lo = math.floor(position)
+            hi = min(lo + 1, len(items) - 1)
+            return items[lo] + (items[hi] - items[lo]) * (position - lo)
+        items = np.concatenate([np.asarray(level, dtype=np.float64) for level in self.levels])
+        weights = np.concatenate([np.full(len(level), 1 << h, dtype=np.int64) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        return float(items[order][np.searchsorted(cumulative, q * self.n, side="left")])
+
+    def quantiles(self, qs: Iterable[float]) -> list[Optional[float]]:
+        return [self.quantile(q) for q in qs]
+
+    def median(self) -> Optional[float]:
+        return self.quantile(0.5)
+
+    # ─── Serialization ───────────────────────────────────────────────────────
+
+    def to_bytes(self) -> bytes:
+        sizes = np.array([len(level) for level in self.levels], dtype="<u4")
+        items = np.concatenate([np.asarray(level, dtype="<f8") for level in self.levels])
+        header = _HEADER.pack(_MAGIC, _VERSION, self.k, self.n, self.min, self.max, len(self.levels))
+        return header + sizes.tobytes() + items.tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes, seed: Optional[int] = None) -> "QuantileSketch":
+        magic, version, k, n, lo, hi, n_levels = _HEADER.unpack_from(blob)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a quantile sketch")
+        offset = _HEADER.size
+        sizes = np.frombuffer(blob, dtype="<u4", count=n_levels, offset=offset)
+        items = np.frombuffer(blob, dtype="<f8", offset=offset + sizes.nbytes)
+        sketch = cls(k=k, seed=seed)
+        sketch.n, sketch.min, sketch.max = n, lo, hi
+        bounds = [0, *itertools.accumulate(sizes.tolist())]
+        sketch.levels = [items[bounds[h]:bounds[h + 1]].tolist() for h in range(n_levels)]
+        return sketch
@@ -1,9 +1,12 @@
 """
 Pre-season testing analytics — long-run clustering, performance band grouping.
 """
+import base64
+import math
 import statistics
 from collections import defaultdict
 from typing import Optional
+from analytics.sketch import QuantileSketch
 
 
 def cluster_long_runs(laps: list[dict], min_stint_length: int = 8) -> list[dict]:
@@ -92,3 +95,76 @@ def compute_stability_index(laps_by_driver: dict[str, list[dict]]) -> dict[str,
         elif times:
             result[driver] = 0.0
     return result
+
+
+# ─── Multi-day merge ─────────────────────────────────────────────────────────
+# A test runs over several days loaded one at a time. Each day is reduced to a summary
+# (its long-run clusters, and per driver the lap count, mean, sum of squared deviations
+# and a lap-time sketch) that is stored; the multi-day result merges summaries, so a new
+# day never requires earlier days' laps again.
+
+def summarize_testing_day(laps: list[dict], min_stint_length: int = 8) -> dict:
+    """
+    One testing day's laps → {clusters, drivers: {driver_id: {laps, mean_ms, m2, sketch}}}.
+    sketch is a base64 analytics.sketch.QuantileSketch of the lap times (JSON-storable).
+    """
+    times_by_driver: dict = defaultdict(list)
+    for lap in laps:
+        if lap.get("lap_time_ms") and lap.get("driver_id"):
+            times_by_driver[lap["driver_id"]].append(lap["lap_time_ms"])
+
+    drivers = {}
+    for driver, times in times_by_driver.items():
+        mean = statistics.fmean(times)
+        sketch = QuantileSketch()
+        sketch.update_many(times)
+        drivers[driver] = {
+            "laps": len(times),
+            "mean_ms": mean,
+            "m2": sum((t - mean) ** 2 for t in times),
+            "sketch": base64.b64encode(sketch.to_bytes()).decode("ascii"),
+        }
+    return {"clusters": cluster_long_runs(laps, min_stint_length), "drivers": drivers}
+
+
+def _merge_moments(a: dict, b: dict) -> dict:
+    """Combine (laps, mean, M2) of two disjoint lap sets (Chan et al. parallel variance)."""
+    n = a["laps"] + b["laps"]
+    delta = b["mean_ms"] - a["mean_ms"]
+    return {
+        "laps": n,
+        "mean_ms": a["mean_ms"] + delta * b["laps"] / n,
+        "m2": a["m2"] + b["m2"] + delta ** 2 * a["laps"] * b["laps"] / n,
+    }
+
+
+def merge_testing_days(days: dict[int, dict]) -> dict:
+    """
+    Combine summarize_testing_day outputs keyed by day number into the multi-day result:
+    long runs (tagged with their day — stint numbers restart every day), performance bands,
+    stability index over all laps (as compute_stability_index) and per-driver lap count
+    and median lap time.
+    """
+    clusters = [{**cluster, "day": day} for day, summary in sorted(days.items()) for cluster in summary["clusters"]]
+
+    moments: dict = {}
+    sketches: dict = defaultdict(list)
+    for day, summary in sorted(days.items()):
+        for driver, stats in summary["drivers"].items():
+            moments[driver] = _merge_moments(moments[driver], stats) if driver in moments else stats
+            sketches[driver].append(QuantileSketch.from_bytes(base64.b64decode(stats["sketch"])))
+
+    stability, drivers = {}, {}
+    for driver in sorted(moments):
+        n = moments[driver]["laps"]
+        stability[driver] = round(math.sqrt(max(moments[driver]["m2"], 0.0) / (n - 1)), 1) if n > 1 else 0.0
+        median = QuantileSketch.merged(sketches[driver], seed=0).median()
+        drivers[driver] = {"laps": n, "median_lap_ms": round(median, 1) if median is not None else None}
+
+    return {
+        "days": sorted(days),
+        "long_runs": clusters,
+        "performance_bands": performance_band_grouping(clusters),
+        "stability_index": stability,
+        "drivers": drivers,
+    }
@@ -0,0 +1,31 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from connectors.fastf1_disk_cache import cache_index
+from config import get_settings
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+settings = get_settings()
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """Endpoints that change state need X-Admin-Token to match ADMIN_TOKEN; without one set they are off."""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@router.get("/fastf1-cache")
+def get_fastf1_cache_index():
+    """
+    The FastF1 disk cache index: cached sessions with size and last access, totals and
+    the byte budget. Read only.
+    """
+    return cache_index()
+
+
+@router.post("/fastf1-cache/rescan", dependencies=[Depends(require_admin)])
+def rescan_fastf1_cache():
+    """Rebuild the index from the cache directory and evict down to the byte budget."""
+    return cache_index(rescan=True)
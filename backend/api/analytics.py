@@ -1,60 +1,270 @@
-from fastapi import APIRouter, Path, Query, HTTPException
-from connectors.fastf1_connector import get_session, get_laps
-from analytics.degradation import compute_degradation_slope
-from analytics.consistency import compute_consistency_per_driver
-from analytics.pace import estimate_clean_air_baseline, estimate_traffic_loss
-from analytics.strategy import pit_timing_efficiency
-from analytics.qualifying import sector_dominance, compute_track_evolution
-from cache import cache_get, cache_set, cache_key
+import hashlib
+import json
+import logging
 from collections import defaultdict
+from typing import Any, Optional
+from fastapi import APIRouter, Path, HTTPException
+from connectors.fastf1_connector import laps_to_records
+from connectors.session_loader import fetch_session_laps
+from ingestion.rollups import load_season_rollups
+from ingestion.sessions import load_stored_laps, persist_session_laps
+from analytics.engine import (
+    lap_columns, consistency_per_driver, degradation_slopes, sector_bests, track_evolution_per_driver,
+    clean_air_baseline, traffic_loss,
+)
+from analytics.rollups import season_degradation, consistency_trend
+from analytics.strategy import pit_timing_efficiency
+from analytics.qualifying import merge_track_evolution, sector_dominance_from_bests, qualifying_summary
+from cache import get_or_compute_json, loads_json, cache_key, cache_get_many, cache_set_many
+from responses import json_body
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
+METRICS = (
+    "consistency_per_driver", "degradation_slopes", "clean_air_baseline_ms",
+    "traffic_loss_ms", "sector_dominance", "track_evolution",
+)
+# Metrics keyed by driver, which ?drivers= narrows; the others describe the whole session
+PER_DRIVER_METRICS = {"consistency_per_driver", "degradation_slopes"}
+UNIT_TTL_S = 86400
+# Whole-session results: a day once the session is final; until then a poll interval of
+# the ingestion worker, whose re-ingestion may change the laps (see session_ttl)
+FINAL_SESSION_TTL_S = 86400
+LIVE_SESSION_TTL_S = 900
+MAX_SEASONS = 10
+QUALIFYING_SESSIONS = ("Q", "SQ")
+
+
+# Units computed from one driver's laps alone, cached under a content hash of those laps:
+# when one driver's laps change only that driver's units recompute. Session metrics are
+# assembled from them (sector dominance, track evolution) or, where a metric needs every
+# lap at once (baseline, traffic loss), cached under the hash of all drivers' hashes.
+DRIVER_UNITS = ("consistency", "degradation", "sector_bests", "track_evolution")
+
+
+def _driver_units(laps: list[dict]) -> dict[str, dict[str, Any]]:
+    """Every per-driver unit of the drivers in laps, in one columnar pass: {unit: {driver: value}}."""
+    columns = lap_columns(laps)
+    return {
+        "consistency": consistency_per_driver(columns),
+        "degradation": degradation_slopes(columns),
+        "sector_bests": sector_bests(columns),
+        "track_evolution": track_evolution_per_driver(columns, columns["session_time_s"]),
+    }
+
+
+def _session_pace(laps: list[dict]) -> dict:
+    columns = lap_columns(laps)
+    baseline = clean_air_baseline(columns)
+    return {"baseline": baseline, "traffic_loss": traffic_loss(columns, baseline)}
+
+
+# ─── Season analytics (from lap_rollups, no lap reads) ───────────────────────
+# Registered before /{season}/{round_num}/{session_type}, which would otherwise capture "season"
+
+@router.get("/season/{season}/degradation")
+def get_season_degradation(
+    season: str = Path(..., description="A season, or a range such as 2023-2025"),
+    session_type: str = "R",
+    driver: Optional[str] = None,
+):
+    """Degradation slope (ms per lap of tyre age), lap count and median lap time per compound."""
+    seasons = _parse_seasons(season)
+    rows = _season_rollups(seasons, session_type, driver)
+    return {
+        "seasons": seasons,
+        "session_type": session_type.upper(),
+        "driver": driver.upper() if driver else None,
+        "rounds": len({(row["season"], row["round"]) for row in rows}),
+        "compounds": season_degradation(rows),
+    }
+
+
+@router.get("/season/{season}/consistency")
+def get_season_consistency(
+    season: str = Path(..., description="A season, or a range such as 2023-2025"),
+    session_type: str = "R",
+    driver: Optional[str] = None,
+):
+    """Per driver, consistency and lap-time stats for every stored round, in order."""
+    seasons = _parse_seasons(season)
+    rows = _season_rollups(seasons, session_type, driver)
+    return {
+        "seasons": seasons,
+        "session_type": session_type.upper(),
+        "drivers": consistency_trend(rows),
+    }
+
+
+@router.get("/qualifying/{season}/{round_num}")
+def get_qualifying_analytics(
+    season: int = Path(...),
+    round_num: int = Path(...),
+    session_type: str = "Q",
+):
+    """Peak performance window (session and per driver) and best-lap deltas between every pair of teammates."""
+    session_type = session_type.upper()
+    if session_type not in QUALIFYING_SESSIONS:
+        raise HTTPException(status_code=422, detail=f"session_type must be one of {', '.join(QUALIFYING_SESSIONS)}")
+    ck = cache_key("qualifying", season, round_num, session_type)
+    return json_body(get_or_compute_json(
+        ck,
+        lambda: {
+            "season": season,
+            "round": round_num,
+            "session_type": session_type,
+            **qualifying_summary(_session_laps(season, round_num, session_type)),
+        },
+        ttl_seconds=lambda result: session_ttl(season, round_num, session_type),
+    ))
+
+
+def _parse_seasons(season: str) -> list[int]:
+    try:
+        first, _, last = season.partition("-")
+        seasons = list(range(int(first), int(last or first) + 1))
+    except ValueError:
+        raise HTTPException(status_code=422, detail='Season must be a year or a range such as "2023-2025"')
+    if not 1 <= len(seasons) <= MAX_SEASONS:
+        raise HTTPException(status_code=422, detail=f"Season ranges cover 1 to {MAX_SEASONS} seasons")
+    return seasons
+
+
+def _season_rollups(seasons: list[int], session_type: str, driver: Optional[str]) -> list[dict]:
+    rows = load_season_rollups(seasons, session_type, driver.upper() if driver else None)
+    if rows is None:
+        raise HTTPException(status_code=503, detail="Season rollups unavailable")
+    return rows
+
 
 @router.get("/{season}/{round_num}/{session_type}")
 def get_session_analytics(
     season: int = Path(...),
     round_num: int = Path(...),
     session_type: str = Path(..., description="FP1, FP2, FP3, Q, R, S, SQ"),
+    metrics: Optional[str] = None,
+    drivers: Optional[str] = None,
 ):
+    """
+    Session analytics. metrics: comma-separated subset of METRICS (default all);
+    drivers: comma-separated driver codes, narrowing the per-driver metrics.
+    The full result is cached encoded and served as is; only filtered requests decode it.
+    Ingesting the session's laps drops that cached result, and until the session is final
+    it is kept for LIVE_SESSION_TTL_S only, so a result computed from laps replaced
+    meanwhile does not outlive them; a recompute reuses the units of unchanged drivers.
+    """
+    session_type = session_type.upper()
+    wanted_metrics = _parse_metrics(metrics)
+    wanted_drivers = {d.strip().upper() for d in drivers.split(",") if d.strip()} if drivers else None
     ck = cache_key("analytics", season, round_num, session_type)
-    cached = cache_get(ck)
-    if cached:
-        return cached
+    body = get_or_compute_json(
+        ck,
+        lambda: _compute_session_analytics(season, round_num, session_type),
+        ttl_seconds=lambda result: session_ttl(season, round_num, session_type),
+    )
+    if wanted_metrics is None and wanted_drivers is None:
+        return json_body(body)
+    return _select(loads_json(body), wanted_metrics or METRICS, wanted_drivers)
 
-    session = get_session(season, round_num, session_type)
-    if session is None:
-        raise HTTPException(status_code=404, detail="Session data not available")
 
-    laps = get_laps(session)
-    if not laps:
-        raise HTTPException(status_code=404, detail="No lap data found for session")
+def session_ttl(season: int, round_num: int, session_type: str) -> int:
+    """Cache lifetime of a result derived from a session's whole lap set (see get_session_analytics)."""
+    from http_caching import session_final  # http_caching imports the ingestion worker, which imports this module
+    return FINAL_SESSION_TTL_S if session_final(season, round_num, session_type) else LIVE_SESSION_TTL_S
+
+
+def _parse_metrics(metrics: Optional[str]) -> Optional[list[str]]:
+    if not metrics:
+        return None
+    names = [m.strip() for m in metrics.split(",") if m.strip()]
+    unknown = [m for m in names if m not in METRICS]
+    if unknown:
+        raise HTTPException(
+            status_code=422, detail=f"Unknown metrics: {', '.join(unknown)}. Choose from {', '.join(METRICS)}"
+        )
+    return names
+
+
+def _select(result: dict, metrics, drivers: Optional[set]) -> dict:
+    selected = {k: result[k] for k in ("season", "round", "session_type")}
+    for metric in metrics:
+        value = result[metric]
+        if drivers is not None and metric in PER_DRIVER_METRICS:
+            value = {d: v for d, v in value.items() if d in drivers}
+        selected[metric] = value
+    return selected
+
+
+def _laps_digest(laps: list[dict]) -> str:
+    return hashlib.blake2b(json.dumps(laps, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+def _compute_session_analytics(season: int, round_num: int, session_type: str) -> dict:
+    laps = _session_laps(season, round_num, session_type)
 
-    # Per-driver lap grouping
     driver_laps: dict = defaultdict(list)
     for lap in laps:
-        driver_laps[lap["driver_id"]].append(lap)
-
-    consistency = compute_consistency_per_driver(laps)
-    degradation = compute_degradation_slope(laps)
-    baseline = estimate_clean_air_baseline(laps)
-    traffic_loss = estimate_traffic_loss(laps, baseline)
-    sectors = sector_dominance(laps)
-    track_evolution = compute_track_evolution([
-        {**l, "session_time_s": l.get("lap_number", 0) * 90}  # rough proxy
-        for l in laps
-    ])
-
-    result = {
+        driver_laps[lap.get("driver_id") or ""].append(lap)
+    digests = {driver: _laps_digest(dlaps) for driver, dlaps in driver_laps.items()}
+    session_digest = hashlib.blake2b(
+        "".join(digests[d] for d in sorted(digests)).encode(), digest_size=16
+    ).hexdigest()
+
+    keys = {
+        (unit, driver): cache_key("analytics-unit", unit, digests[driver])
+        for unit in DRIVER_UNITS for driver in driver_laps
+    }
+    pace_key = cache_key("analytics-unit", "pace", session_digest)
+    found = cache_get_many([*keys.values(), pace_key])
+
+    # Recompute only drivers with a missing unit, all of them in one engine pass.
+    # Values are wrapped so that a None result is cached too.
+    computed = {}
+    stale = [driver for driver in driver_laps if any(keys[(unit, driver)] not in found for unit in DRIVER_UNITS)]
+    if stale:
+        fresh = _driver_units([lap for driver in stale for lap in driver_laps[driver]])
+        for driver in stale:
+            for unit in DRIVER_UNITS:
+                computed[keys[(unit, driver)]] = {"value": fresh[unit].get(driver)}
+    if pace_key not in found:
+        computed[pace_key] = {"value": _session_pace(laps)}
+    if computed:
+        cache_set_many(computed, ttl_seconds=UNIT_TTL_S)
+    logger.info(f"Analytics units for {season} R{round_num} {session_type}: {len(found)} cached, {len(computed)} computed")
+    units = {key: entry["value"] for key, entry in {**found, **computed}.items()}
+
+    def per_driver(metric):
+        values = ((driver, units[keys[(metric, driver)]]) for driver in driver_laps)
+        return {driver: value for driver, value in values if value is not None}
+
+    return {
         "season": season,
         "round": round_num,
         "session_type": session_type,
-        "consistency_per_driver": consistency,
-        "degradation_slopes": degradation,
-        "clean_air_baseline_ms": baseline,
-        "traffic_loss_ms": traffic_loss,
-        "sector_dominance": sectors,
-        "track_evolution": track_evolution,
+        "consistency_per_driver": per_driver("consistency"),
+        "degradation_slopes": per_driver("degradation"),
+        "clean_air_baseline_ms": units[pace_key]["baseline"],
+        "traffic_loss_ms": units[pace_key]["traffic_loss"],
+        "sector_dominance": sector_dominance_from_bests(per_driver("sector_bests")),
+        "track_evolution": merge_track_evolution(list(per_driver("track_evolution").values())),
     }
-    cache_set(ck, result, ttl_seconds=86400)
-    return result
+
+
+def _session_laps(season: int, round_num: int, session_type: str) -> list[dict]:
+    """Laps from Postgres if the session was ingested; otherwise load FastF1 (in a loader worker) and ingest it."""
+    laps = load_stored_laps(season, round_num, session_type)
+    if laps:
+        return laps
+
+    loaded = fetch_session_laps(season, round_num, session_type)
+    if loaded is None:
+        raise HTTPException(status_code=404, detail="Session data not available")
+
+    columns = loaded["columns"]
+    if not columns or len(columns["lap_number"]) == 0:
+        raise HTTPException(status_code=404, detail="No lap data found for session")
+
+    persist_session_laps(season, round_num, session_type, loaded)
+    return laps_to_records(columns)
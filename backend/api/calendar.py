@@ -1,22 +1,23 @@
 from fastapi import APIRouter, Query, HTTPException
 from connectors.calendar_connector import get_calendar, ConnectorError
-from cache import cache_get, cache_set, cache_key
+from cache import aget_or_compute, cache_key
 
 router = APIRouter(prefix="/calendar", tags=["Calendar"])
 
 
 @router.get("")
-def get_season_calendar(season: int = Query(default=2025)):
-    ck = cache_key("calendar", season)
-    cached = cache_get(ck)
-    if cached:
-        return cached
-
+async def get_season_calendar(season: int = Query(default=2025)):
     try:
-        events = get_calendar(season)
+        return await season_calendar(season)
     except ConnectorError as e:
         raise HTTPException(status_code=502, detail=str(e))
 
-    result = {"season": season, "events": events}
-    cache_set(ck, result, ttl_seconds=7200)
-    return result
+
+async def season_calendar(season: int) -> dict:
+    """The season's calendar, cached; raises ConnectorError if Jolpica fails, for callers with a fallback."""
+    ck = cache_key("calendar", season)
+    return await aget_or_compute(ck, lambda: _fetch_season_calendar(season), ttl_seconds=7200)
+
+
+async def _fetch_season_calendar(season: int) -> dict:
+    return {"season": season, "events": await get_calendar(season)}
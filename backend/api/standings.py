@@ -1,33 +1,92 @@
+import asyncio
+import logging
 from fastapi import APIRouter, Query, HTTPException
 from connectors.standings_connector import (
-    get_driver_standings, get_constructor_standings, ConnectorError
+    get_driver_standings, get_constructor_standings, get_driver_standings_all_rounds, ConnectorError
 )
-from normalizers.standings_normalizer import normalize_driver_standings, normalize_constructor_standings
-from cache import cache_get, cache_set, cache_key
+from normalizers.standings_normalizer import (
+    normalize_driver_standings, normalize_constructor_standings, normalize_progression_standings
+)
+from storage.standings_store import last_stored_round, save_progression_rounds, load_progression
+from db import SessionLocal
+from api.calendar import season_calendar
+from cache import aget_or_compute, cache_key
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/standings", tags=["Standings"])
 
 
 @router.get("")
-def get_standings(season: int = Query(default=2025, description="F1 season year")):
+async def get_standings(season: int = Query(default=2025, description="F1 season year")):
     """Return driver and constructor standings for the given season."""
     ck = cache_key("standings", season)
-    cached = cache_get(ck)
-    if cached:
-        return cached
+    return await aget_or_compute(ck, lambda: _fetch_standings(season), ttl_seconds=3600)
+
 
+async def _fetch_standings(season: int) -> dict:
     try:
         # get_driver_standings now returns (list, round_num) from one API call
-        raw_drivers, round_num = get_driver_standings(season)
-        raw_constructors = get_constructor_standings(season)
+        (raw_drivers, round_num), raw_constructors = await asyncio.gather(
+            get_driver_standings(season), get_constructor_standings(season)
+        )
     except ConnectorError as e:
         raise HTTPException(status_code=502, detail=str(e))
 
-    result = {
+    return {
         "season": season,
         "round": round_num,
         "drivers": normalize_driver_standings(raw_drivers, season, round_num),
         "constructors": normalize_constructor_standings(raw_constructors, season, round_num),
     }
-    cache_set(ck, result, ttl_seconds=3600)
-    return result
+
+
+@router.get("/progression")
+async def get_championship_progression(season: int = Query(default=2025, description="F1 season year")):
+    """Driver standings after every completed round, for the championship progression chart."""
+    ck = cache_key("progression", season)
+    return await aget_or_compute(ck, lambda: _build_progression(season), ttl_seconds=3600)
+
+
+def _load_stored(season: int) -> tuple[list[dict], int]:
+    try:
+        with SessionLocal() as db:
+            return load_progression(db, season), last_stored_round(db, season)
+    except Exception as e:
+        logger.warning(f"Stored progression unavailable for {season}: {e}")
+        return [], 0
+
+
+def _store_rounds(season: int, rounds: list[dict]) -> None:
+    try:
+        with SessionLocal() as db:
+            save_progression_rounds(db, season, rounds)
+    except Exception as e:
+        logger.warning(f"Could not persist progression rounds for {season}: {e}")
+
+
+async def _build_progression(season: int) -> dict:
+    stored, last_round = await asyncio.to_thread(_load_stored, season)
+    try:
+        calendar = await season_calendar(season)
+        new_rounds = await get_driver_standings_all_rounds(
+            season, after_round=last_round, calendar=calendar["events"]
+        )
+    except ConnectorError as e:
+        if not stored:
+            raise HTTPException(status_code=502, detail=str(e))
+        logger.warning(f"Serving stored progression for {season}, upstream failed: {e}")
+        new_rounds = []
+
+    if new_rounds:
+        await asyncio.to_thread(_store_rounds, season, new_rounds)
+
+    rounds = stored + [
+        {
+            "round": rnd["round"],
+            "race_name": rnd["race_name"],
+            "standings": normalize_progression_standings(rnd["standings"], season, rnd["round"]),
+        }
+        for rnd in new_rounds
+    ]
+    return {"season": season, "rounds": rounds}
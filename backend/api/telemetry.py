@@ -1,38 +1,239 @@
-from fastapi import APIRouter, Path, Query, HTTPException
-from connectors.fastf1_connector import get_session, get_telemetry
-from cache import cache_get, cache_set, cache_key
+from typing import Optional
+from fastapi import APIRouter, Path, Query, HTTPException, Request, Response
+import numpy as np
+from connectors.session_loader import fetch_laps_telemetry
+from ingestion.sessions import load_stored_telemetry_many, persist_lap_telemetry
+from normalizers.telemetry_normalizer import (
+    columns_to_lists, columns_to_records, downsample_columns, align_to_distance, elapsed_time,
+)
+from normalizers.telemetry_codec import JSON_MEDIA_TYPE, negotiate_media_type, encode_columns, decode_lap_blob
+from api.analytics import session_ttl
+from cache import get_or_compute_json, get_or_compute_bytes, cache_key
+from responses import json_body
 
 router = APIRouter(prefix="/telemetry", tags=["Telemetry"])
 
+MAX_COMPARE_LAPS = 20
+LAP_TTL_S = 86400
+LAP_NUMBER_HEADER = "X-Lap-Number"
+
+
+# Registered before /{driver_code}, which would otherwise capture "compare"
+@router.get("/{season}/{round_num}/{session_type}/compare")
+def compare_telemetry(
+    season: int = Path(...),
+    round_num: int = Path(...),
+    session_type: str = Path(...),
+    drivers: str = Query(..., description="Comma-separated driver codes, e.g. VER,NOR,LEC; the first is the delta reference"),
+    laps: str = Query(
+        default="fastest",
+        description='"fastest" for every driver, or one lap number (or "fastest") per driver, comma-separated',
+    ),
+    points: int = Query(default=800, ge=50, le=5000, description="Samples on the shared distance grid"),
+):
+    """
+    Several driver laps resampled onto one shared distance grid, as aligned columnar
+    channels plus each lap's cumulative time delta to the first one. One session load
+    serves every driver.
+    """
+    session_type = session_type.upper()
+    requests = _parse_compare_laps(drivers, laps)
+    ck = cache_key(
+        "telemetry-compare", season, round_num, session_type,
+        ",".join(f"{code}.{lap or 'fastest'}" for code, lap in requests), points,
+    )
+    return json_body(get_or_compute_json(
+        ck,
+        lambda: _compute_comparison(season, round_num, session_type, requests, points),
+        ttl_seconds=lambda result: _telemetry_ttl(season, round_num, session_type, [lap for _, lap in requests]),
+    ))
+
 
 @router.get("/{season}/{round_num}/{session_type}/{driver_code}")
 def get_driver_telemetry(
+    request: Request,
     season: int = Path(...),
     round_num: int = Path(...),
     session_type: str = Path(...),
     driver_code: str = Path(..., description="3-letter driver code, e.g. VER, HAM"),
     lap_number: int = Query(default=None, description="Specific lap number, default = fastest"),
+    response_format: str = Query(
+        default="records", alias="format", pattern="^(records|columnar)$",
+        description="records = one object per sample, columnar = one array per channel",
+    ),
+    points: Optional[int] = Query(
+        default=None, ge=10, le=5000, description="Downsample to ~N samples (LTTB on speed)",
+    ),
 ):
-    ck = cache_key("telemetry", season, round_num, session_type, driver_code, lap_number or "fastest")
-    cached = cache_get(ck)
-    if cached:
-        return cached
+    """
+    Telemetry for one driver lap. JSON by default; send
+    `Accept: application/vnd.apache.arrow.stream` or
+    `Accept: application/vnd.openf1.telemetry+f32` for a binary columnar body.
+    """
+    session_type, driver_code = session_type.upper(), driver_code.upper()
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    if media_type != JSON_MEDIA_TYPE:
+        return _binary_telemetry(season, round_num, session_type, driver_code, lap_number, points, media_type)
+
+    ck = cache_key(
+        "telemetry", season, round_num, session_type, driver_code, lap_number or "fastest",
+        response_format, points or "raw",
+    )
+    return json_body(get_or_compute_json(
+        ck,
+        lambda: _compute_telemetry(season, round_num, session_type, driver_code, lap_number, response_format, points),
+        ttl_seconds=lambda result: _telemetry_ttl(season, round_num, session_type, [lap_number]),
+    ))
+
+
+def _telemetry_ttl(season: int, round_num: int, session_type: str, lap_numbers: list[Optional[int]]) -> int:
+    """A day for given laps; a fastest-lap pick can change with the lap set, so it expires like the session's analytics."""
+    if all(lap is not None for lap in lap_numbers):
+        return LAP_TTL_S
+    return session_ttl(season, round_num, session_type)
+
+
+def _parse_compare_laps(drivers: str, laps: str) -> list[tuple[str, Optional[int]]]:
+    codes = [code.strip().upper() for code in drivers.split(",") if code.strip()]
+    if not 2 <= len(codes) <= MAX_COMPARE_LAPS:
+        raise HTTPException(status_code=422, detail=f"Compare between 2 and {MAX_COMPARE_LAPS} driver laps")
+    picks = [lap.strip().lower() for lap in laps.split(",")]
+    if len(picks) == 1:
+        picks = picks * len(codes)
+    if len(picks) != len(codes):
+        raise HTTPException(status_code=422, detail="Give one lap per driver, or a single value for all")
+    try:
+        lap_numbers = [None if pick == "fastest" else int(pick) for pick in picks]
+    except ValueError:
+        raise HTTPException(status_code=422, detail='Laps must be lap numbers or "fastest"')
+    return list(zip(codes, lap_numbers))
+
+
+def _driver_laps(
+    season: int,
+    round_num: int,
+    session_type: str,
+    requests: list[tuple[str, Optional[int]]],
+) -> list[tuple[int, dict]]:
+    """
+    (lap_number, channel arrays) per requested (driver_code, lap_number). Laps come from
+    the per-lap telemetry store when ingested, all in one read; the rest are loaded
+    together in one session loader job and stored.
+    """
+    found = load_stored_telemetry_many(season, round_num, session_type, requests)
+    missing = [i for i, item in enumerate(found) if item is None]
+    if not missing:
+        return found
 
-    session = get_session(season, round_num, session_type)
-    if session is None:
+    loaded = fetch_laps_telemetry(season, round_num, session_type, [requests[i] for i in missing])
+    if loaded is None:
         raise HTTPException(status_code=404, detail="Session not available")
+    for i, item in zip(missing, loaded):
+        if item["blob"] is None:
+            code, lap = requests[i]
+            raise HTTPException(status_code=404, detail=f"Telemetry not found for {code}" + (f" lap {lap}" if lap else ""))
+    persist_lap_telemetry(
+        season, round_num, session_type,
+        [(requests[i][0], item["lap_number"], item["samples"], item["blob"]) for i, item in zip(missing, loaded)],
+    )
+    for i, item in zip(missing, loaded):
+        # Serve the stored representation, so cold and stored reads return identical values
+        found[i] = (item["lap_number"], decode_lap_blob(item["blob"]))
+    return found
 
-    data = get_telemetry(session, driver_code.upper(), lap_number)
-    if not data:
-        raise HTTPException(status_code=404, detail=f"Telemetry not found for {driver_code}")
 
-    result = {
+def _lap_telemetry(
+    season: int,
+    round_num: int,
+    session_type: str,
+    driver_code: str,
+    lap_number: Optional[int],
+    points: Optional[int],
+) -> tuple[int, dict]:
+    """(lap number, channel arrays) for one driver lap, downsampled here if points is set."""
+    picked, columns = _driver_laps(season, round_num, session_type, [(driver_code.upper(), lap_number)])[0]
+    if points:
+        columns = downsample_columns(columns, points)
+    return picked, columns
+
+
+def _compute_comparison(
+    season: int,
+    round_num: int,
+    session_type: str,
+    requests: list[tuple[str, Optional[int]]],
+    points: int,
+) -> dict:
+    found = _driver_laps(season, round_num, session_type, requests)
+    grid, aligned = align_to_distance([columns for _, columns in found], points)
+    elapsed = elapsed_time(grid, np.vstack([channels["speed"] for channels in aligned]))
+    delta = elapsed - elapsed[0]
+
+    return {
+        "season": season,
+        "round": round_num,
+        "session_type": session_type,
+        "reference": {"driver_code": requests[0][0], "lap_number": found[0][0]},
+        "distance": grid.tolist(),
+        "laps": [
+            {
+                "driver_code": code,
+                "lap_number": lap_number,
+                "channels": columns_to_lists(channels),
+                "delta_s": delta[i].tolist(),
+            }
+            for i, ((code, _), (lap_number, _), channels) in enumerate(zip(requests, found, aligned))
+        ],
+    }
+
+
+def _compute_telemetry(
+    season: int,
+    round_num: int,
+    session_type: str,
+    driver_code: str,
+    lap_number: Optional[int],
+    response_format: str,
+    points: Optional[int],
+) -> dict:
+    picked, columns = _lap_telemetry(season, round_num, session_type, driver_code, lap_number, points)
+    data = columns_to_lists(columns) if response_format == "columnar" else columns_to_records(columns)
+
+    return {
         "season": season,
         "round": round_num,
         "session_type": session_type,
         "driver_code": driver_code.upper(),
-        "lap_number": lap_number,
+        "lap_number": picked,
+        "format": response_format,
         "telemetry": data,
     }
-    cache_set(ck, result, ttl_seconds=86400)
-    return result
+
+
+def _binary_telemetry(
+    season: int,
+    round_num: int,
+    session_type: str,
+    driver_code: str,
+    lap_number: Optional[int],
+    points: Optional[int],
+    media_type: str,
+) -> Response:
+    """
+    Serve telemetry channels as a binary body, with the lap served (the fastest one unless
+    lap_number is given) in the X-Lap-Number header. What gets cached is the encoded body
+    behind a "<lap number>\n" line.
+    """
+    ck = cache_key(
+        "telemetry-lap-bin", season, round_num, session_type, driver_code, lap_number or "fastest",
+        media_type, points or "raw",
+    )
+
+    def compute() -> bytes:
+        picked, columns = _lap_telemetry(season, round_num, session_type, driver_code, lap_number, points)
+        return b"%d\n" % picked + encode_columns(columns, media_type)
+
+    picked, _, body = get_or_compute_bytes(
+        ck, compute, ttl_seconds=lambda body: _telemetry_ttl(season, round_num, session_type, [lap_number])
+    ).partition(b"\n")
+    return Response(content=body, media_type=media_type, headers={LAP_NUMBER_HEADER: picked.decode()})
@@ -0,0 +1,76 @@
+import logging
+from fastapi import APIRouter, Path, Query, HTTPException
+from analytics.testing import merge_testing_days
+from connectors.session_loader import fetch_testing_day
+from storage.testing_store import load_testing_days, save_testing_day
+from db import SessionLocal
+from cache import get_or_compute_json, cache_key
+from responses import json_body
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/testing", tags=["Testing"])
+
+TESTING_DAYS = 3
+
+
+@router.get("/{season}")
+def get_testing_analytics(
+    season: int = Path(...),
+    test_number: int = Query(default=1, ge=1, le=2, description="Pre-season test of the season (1 or 2)"),
+):
+    """
+    Long runs, performance bands, stability index and median pace across a pre-season
+    test's days. Days are loaded one at a time and finished ones stored as mergeable
+    summaries, so only a new day, or one still running, is read from FastF1.
+    """
+    ck = cache_key("testing", season, test_number)
+    # A test still missing days, or with a day still running, is re-checked hourly; a complete one is final
+    return json_body(get_or_compute_json(
+        ck,
+        lambda: _build_testing(season, test_number),
+        ttl_seconds=lambda result: 86400 if result["complete"] else 3600,
+    ))
+
+
+def _load_stored(season: int, test_number: int) -> dict[int, dict]:
+    try:
+        with SessionLocal() as db:
+            return load_testing_days(db, season, test_number)
+    except Exception as e:
+        logger.warning(f"Stored testing days unavailable for {season} test {test_number}: {e}")
+        return {}
+
+
+def _store_day(season: int, test_number: int, day: int, summary: dict) -> None:
+    try:
+        with SessionLocal() as db:
+            save_testing_day(db, season, test_number, day, summary)
+    except Exception as e:
+        logger.warning(f"Could not persist testing day {day} for {season} test {test_number}: {e}")
+
+
+def _build_testing(season: int, test_number: int) -> dict:
+    days = _load_stored(season, test_number)
+    running = False
+    for day in range(1, TESTING_DAYS + 1):
+        if day in days:
+            continue
+        # One day in a worker at a time; only its summary comes back
+        loaded = fetch_testing_day(season, test_number, day)
+        if loaded is None:
+            continue
+        summary, finished = loaded
+        if finished:
+            _store_day(season, test_number, day, summary)
+        else:
+            running = True  # its laps so far are shown, and it is read again until it finishes
+        days[day] = summary
+    if not days:
+        raise HTTPException(status_code=404, detail=f"No testing data for {season} test {test_number}")
+    return {
+        "season": season,
+        "test_number": test_number,
+        "complete": len(days) == TESTING_DAYS and not running,
+        **merge_testing_days(days),
+    }
@@ -0,0 +1,72 @@
+"""
+Benchmark: session analytics over a synthetic 24-race season — the per-metric reference
+functions (each regroups the lap records in Python) vs the columnar engine.
+Both sides start from lap records, as /analytics gets them from Postgres or the loader.
+Run from backend/:  python -m benchmarks.bench_analytics_engine [--races 24]
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from analytics import engine
+from analytics.consistency import compute_consistency_per_driver
+from analytics.degradation import compute_degradation_slope
+from analytics.pace import estimate_clean_air_baseline, estimate_traffic_loss
+from analytics.qualifying import sector_dominance, compute_track_evolution
+from benchmarks.synthetic import make_laps_frame
+from connectors.fastf1_connector import extract_laps_columnar, laps_to_records
+
+LAPS_PER_RACE = 1140  # 20 drivers x 57 laps
+REPEAT = 5
+
+
+def make_season(races: int) -> list[list[dict]]:
+    season = []
+    for r in range(races):
+        columns = extract_laps_columnar(make_laps_frame(LAPS_PER_RACE, seed=r))
+        columns["gap_ahead_s"] = np.random.default_rng(r).uniform(0, 4, LAPS_PER_RACE)
+        season.append(laps_to_records(columns))
+    return season
+
+
+def reference(laps: list[dict]) -> None:
+    compute_consistency_per_driver(laps)
+    compute_degradation_slope(laps)
+    baseline = estimate_clean_air_baseline(laps)
+    estimate_traffic_loss(laps, baseline)
+    sector_dominance(laps)
+    compute_track_evolution(laps)
+
+
+def columnar(laps: list[dict]) -> None:
+    columns = engine.lap_columns(laps)
+    engine.consistency_per_driver(columns)
+    engine.degradation_slopes(columns)
+    baseline = engine.clean_air_baseline(columns)
+    engine.traffic_loss(columns, baseline)
+    engine.sector_bests(columns)
+    engine.track_evolution_per_driver(columns, columns["session_time_s"])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--races", type=int, default=24)
+    args = parser.parse_args()
+    season = make_season(args.races)
+    print(f"{args.races} races x {LAPS_PER_RACE} laps")
+
+    def run(fn):
+        return min(timeit.repeat(lambda: [fn(laps) for laps in season], number=1, repeat=REPEAT)) * 1000
+
+    ref_ms = run(reference)
+    engine_ms = run(columnar)
+    convert_ms = run(engine.lap_columns)
+    print(f"  {'reference functions':22} {ref_ms:8.1f} ms  ({ref_ms / args.races:6.2f} ms/race)")
+    print(f"  {'columnar engine':22} {engine_ms:8.1f} ms  ({engine_ms / args.races:6.2f} ms/race)"
+          f"  of which records→columns {convert_ms:.1f} ms")
+    print(f"  speed-up {ref_ms / engine_ms:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
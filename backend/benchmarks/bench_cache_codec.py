@@ -0,0 +1,86 @@
+"""
+Microbenchmark: cache value codecs — JSON vs msgpack vs msgpack+zstd.
+Payloads are produced by the real route code on synthetic FastF1-shaped data.
+Run from backend/:  python -m benchmarks.bench_cache_codec
+"""
+import json
+import timeit
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import msgpack
+import zstandard
+
+from benchmarks.synthetic import make_laps_frame, make_telemetry_frame
+from config import get_settings
+
+REPEAT = 7
+
+
+@contextmanager
+def _inline_session(session):
+    """Serve `session` from the loader jobs, run in this process."""
+    from connectors.session_loader import session_loader
+    with patch.object(session_loader, "workers", 0), \
+            patch("connectors.session_loader.get_session", return_value=session):
+        yield
+
+
+def analytics_payload() -> dict:
+    from api.analytics import _compute_session_analytics
+    session = SimpleNamespace(laps=make_laps_frame(1200))
+    with _inline_session(session), patch("api.analytics.load_stored_laps", return_value=None), \
+            patch("api.analytics.persist_session_laps"):
+        return _compute_session_analytics(2025, 1, "R")
+
+
+class _Lap(dict):
+    get_telemetry = staticmethod(lambda: make_telemetry_frame(750))
+
+
+def telemetry_payload() -> dict:
+    from api.telemetry import _compute_telemetry
+    lap = _Lap(LapNumber=12)
+    laps = SimpleNamespace(pick_drivers=lambda code: SimpleNamespace(pick_fastest=lambda: lap))
+    with _inline_session(SimpleNamespace(laps=laps)), \
+            patch("api.telemetry.load_stored_telemetry_many", side_effect=lambda s, r, t, laps: [None] * len(laps)), \
+            patch("api.telemetry.persist_lap_telemetry"):
+        return _compute_telemetry(2025, 1, "R", "VER", None, "records", None)
+
+
+def _best(fn) -> float:
+    return min(timeit.repeat(fn, number=20, repeat=REPEAT)) / 20 * 1000
+
+
+def main():
+    level = get_settings().CACHE_ZSTD_LEVEL
+    compressor = zstandard.ZstdCompressor(level=level)
+    decompressor = zstandard.ZstdDecompressor()
+    codecs = {
+        "json": (
+            lambda v: json.dumps(v, default=str).encode(),
+            json.loads,
+        ),
+        "msgpack": (
+            lambda v: msgpack.packb(v, default=str),
+            lambda b: msgpack.unpackb(b, strict_map_key=False),
+        ),
+        f"msgpack+zstd({level})": (
+            lambda v: compressor.compress(msgpack.packb(v, default=str)),
+            lambda b: msgpack.unpackb(decompressor.decompress(b), strict_map_key=False),
+        ),
+    }
+
+    for name, payload in (("analytics (R, 1200 laps)", analytics_payload()),
+                          ("telemetry (records, 750 samples)", telemetry_payload())):
+        print(f"{name}")
+        print(f"  {'codec':20} {'bytes':>9} {'encode ms':>10} {'decode ms':>10}")
+        for codec, (encode, decode) in codecs.items():
+            raw = encode(payload)
+            print(f"  {codec:20} {len(raw):9d} {_best(lambda: encode(payload)):10.3f} "
+                  f"{_best(lambda: decode(raw)):10.3f}")
+
+
+if __name__ == "__main__":
+    main()
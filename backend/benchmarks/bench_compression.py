@@ -0,0 +1,99 @@
+"""
+Benchmark: response compression per codec and level on telemetry JSON — bytes on the wire,
+ratio and CPU per request — then the same request through the app, compressed per
+request and served from the cached variant of an immutable response. The payload is the /telemetry records body for one lap:
+from a real FastF1 session with --season/--round/--session/--driver (network, or a warm
+FastF1 cache), otherwise the route's output on a synthetic lap.
+Run from backend/:  python -m benchmarks.bench_compression [--season 2024 --round 1 --session R --driver VER]
+"""
+import argparse
+import time
+from unittest.mock import patch
+
+from benchmarks.bench_cache_codec import telemetry_payload
+from benchmarks.bench_response_cache import _DictRedis
+from cache import dumps_json, local_cache
+from compression import CODECS, _brotli, _gzip, _zstd, brotli, zstandard
+from http_caching import IMMUTABLE
+
+REPEAT = 20
+LEVELS = {"br": (_brotli, (1, 4, 5, 9, 11)), "zstd": (_zstd, (1, 3, 6, 12, 19)), "gzip": (_gzip, (1, 6, 9))}
+
+
+def _cpu_ms(fn) -> float:
+    """Best-of CPU time of one call (process time, so threads and I/O waits do not count)."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.process_time()
+        fn()
+        best = min(best, time.process_time() - started)
+    return best * 1000
+
+
+def real_payload(season: int, round_num: int, session_type: str, driver: str):
+    from connectors.fastf1_connector import get_session, get_telemetry
+    session = get_session(season, round_num, session_type, telemetry=True)
+    telemetry = get_telemetry(session, driver)
+    if not telemetry:
+        return None
+    return {
+        "season": season, "round": round_num, "session_type": session_type, "driver_code": driver,
+        "lap_number": None, "format": "records", "telemetry": telemetry,
+    }
+
+
+def _through_app(payload: dict) -> None:
+    from fastapi.testclient import TestClient
+    from main import app
+    redis = _DictRedis()
+    path = "/telemetry/2025/1/R/VER"
+    # TestClient runs in this process, so its decoding of the body is in the CPU time too
+    print(f"\nGET {path} through the app, process CPU per request (ms)")
+    print(f"  {'codec':8} {'wire bytes':>10} {'one-off':>8} {'cached variant':>15}")
+    with patch("cache.get_redis_client", return_value=redis), \
+            patch("cache.get_redis_binary_client", return_value=redis), \
+            patch("api.telemetry._compute_telemetry", return_value=payload), \
+            patch("http_caching.cache_policy", return_value=(IMMUTABLE, 86400)):
+        client = TestClient(app)
+        for codec in ("identity", *CODECS):
+            headers = {"Accept-Encoding": codec}
+            # The client decodes bodies; Content-Length is what went over the wire
+            size = int(client.get(path, headers=headers).headers["content-length"])
+            # A weak ETag is never looked up: every request compresses
+            with patch("http_caching.strong_etag", side_effect=lambda body: f'W/"{time.perf_counter_ns()}"'):
+                one_off = _cpu_ms(lambda: client.get(path, headers=headers))
+            local_cache.clear()
+            client.get(path, headers=headers)  # fills the variant
+            cached = _cpu_ms(lambda: client.get(path, headers=headers))
+            print(f"  {codec:8} {size:10d} {one_off:8.2f} {cached:15.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--season", type=int)
+    parser.add_argument("--round", type=int, default=1)
+    parser.add_argument("--session", default="R")
+    parser.add_argument("--driver", default="VER")
+    args = parser.parse_args()
+
+    payload = real_payload(args.season, args.round, args.session, args.driver) if args.season else None
+    source = f"{args.season} R{args.round} {args.session} {args.driver} fastest lap"
+    if payload is None:
+        payload = telemetry_payload()
+        source = "synthetic lap (real route code)"
+    body = dumps_json(payload)
+    print(f"Telemetry records JSON, {source}: {len(body)} bytes, {len(payload['telemetry'])} samples")
+    print(f"  {'codec':12} {'bytes':>8} {'ratio':>6} {'compress ms':>12}")
+    for name, (make, levels) in LEVELS.items():
+        if (name == "br" and brotli is None) or (name == "zstd" and zstandard is None):
+            print(f"  {name:12} not installed")
+            continue
+        for level in levels:
+            compress = make(level)
+            size = len(compress(body))
+            print(f"  {f'{name}-{level}':12} {size:8d} {len(body) / size:6.1f} {_cpu_ms(lambda: compress(body)):12.3f}")
+    _through_app(payload)
+
+
+if __name__ == "__main__":
+    main()
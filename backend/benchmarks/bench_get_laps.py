@@ -0,0 +1,66 @@
+"""
+Benchmark: get_laps row-wise (legacy iterrows) vs vectorized columnar extraction.
+Run from backend/:  python -m benchmarks.bench_get_laps
+"""
+import math
+import timeit
+from types import SimpleNamespace
+
+from benchmarks.synthetic import make_laps_frame
+from connectors.fastf1_connector import get_laps
+
+N_LAPS = 2000
+REPEAT = 5
+
+
+def legacy_get_laps(session) -> list[dict]:
+    """The pre-vectorization implementation, kept here as the baseline."""
+    def is_nan(val):
+        try:
+            return math.isnan(float(val))
+        except Exception:
+            return True
+
+    result = []
+    for _, row in session.laps.iterrows():
+        def ms_or_none(td):
+            try:
+                return td.total_seconds() * 1000
+            except Exception:
+                return None
+
+        result.append({
+            "driver_id": row.get("Driver", ""),
+            "lap_number": int(row.get("LapNumber", 0)),
+            "lap_time_ms": ms_or_none(row.get("LapTime")),
+            "sector1_ms": ms_or_none(row.get("Sector1Time")),
+            "sector2_ms": ms_or_none(row.get("Sector2Time")),
+            "sector3_ms": ms_or_none(row.get("Sector3Time")),
+            "compound": str(row.get("Compound", "")),
+            "stint": int(row.get("Stint", 0)) if not is_nan(row.get("Stint")) else None,
+            "is_personal_best": bool(row.get("IsPersonalBest", False)),
+            "track_status": str(row.get("TrackStatus", "")),
+            "gap_to_leader_s": None,
+            "gap_ahead_s": None,
+        })
+    return result
+
+
+def _best(fn) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=REPEAT)) * 1000
+
+
+def main():
+    session = SimpleNamespace(laps=make_laps_frame(N_LAPS))
+    legacy_ms = _best(lambda: legacy_get_laps(session))
+    records_ms = _best(lambda: get_laps(session))
+    columnar_ms = _best(lambda: get_laps(session, columnar=True))
+
+    print(f"get_laps on {N_LAPS} synthetic laps (best of {REPEAT})")
+    print(f"  legacy iterrows      {legacy_ms:8.2f} ms")
+    print(f"  vectorized records   {records_ms:8.2f} ms   ({legacy_ms / records_ms:5.1f}x)")
+    print(f"  vectorized columnar  {columnar_ms:8.2f} ms   ({legacy_ms / columnar_ms:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: cache-hit latency of GET /telemetry/{season}/{round}/{session}/{driver}, before
+and after caching encoded response bodies. "before" is the previous route: get_or_compute
+returns the decoded dict and FastAPI re-encodes it (jsonable_encoder + json.dumps) on every
+hit, after a msgpack+zstd decode on a Redis hit. "after" is the app's route: the cached
+bytes are the response. Requests go through the ASGI stack with TestClient; Redis is an
+in-process dict, so Redis-tier timings exclude the network round trip.
+Run from backend/:  python -m benchmarks.bench_response_cache
+"""
+import timeit
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from benchmarks.bench_cache_codec import telemetry_payload
+from cache import cache_key, get_or_compute, local_cache, orjson
+
+REPEAT = 7
+NUMBER = 50
+PATH = "/telemetry/2025/1/R/VER"
+
+
+class _DictRedis:
+    """Just enough of a Redis client for cache hits, lease and all (TTLs ignored)."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def ttl(self, key):
+        return 3600 if key in self.data else -2
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def eval(self, script, numkeys, key, token):
+        self.delete(key)
+
+    def pipeline(self, transaction=True):
+        return _DictPipeline(self)
+
+
+class _DictPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def get(self, key):
+        self.calls.append(lambda: self.redis.get(key))
+
+    def ttl(self, key):
+        self.calls.append(lambda: self.redis.ttl(key))
+
+    def execute(self):
+        return [call() for call in self.calls]
+
+
+def _legacy_app(payload: dict) -> FastAPI:
+    """The route as it was: the decoded value is returned and re-encoded by FastAPI."""
+    app = FastAPI()
+
+    @app.get("/telemetry/{season}/{round_num}/{session_type}/{driver_code}")
+    def get_driver_telemetry(season: int, round_num: int, session_type: str, driver_code: str):
+        ck = cache_key("telemetry-legacy", season, round_num, session_type, driver_code, "fastest", "records", "raw")
+        return get_or_compute(ck, lambda: payload, ttl_seconds=86400)
+
+    return app
+
+
+def _hit_ms(client: TestClient, redis_tier: bool) -> float:
+    def request():
+        if redis_tier:
+            local_cache.clear()
+        response = client.get(PATH)
+        assert response.status_code == 200
+
+    request()  # the miss that fills the cache
+    return min(timeit.repeat(request, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+
+
+def main():
+    from main import app
+    payload = telemetry_payload()
+    redis = _DictRedis()
+    with patch("cache.get_redis_client", return_value=redis), \
+            patch("cache.get_redis_binary_client", return_value=redis), \
+            patch("api.telemetry._compute_telemetry", return_value=payload):
+        clients = {"before": TestClient(_legacy_app(payload)), "after": TestClient(app)}
+        size = len(clients["after"].get(PATH).content)
+        print(f"GET {PATH} cache hits, records format, {size / 1024:.0f} KB body "
+              f"(encoder: {'orjson' if orjson is not None else 'json'})")
+        print(f"  {'':8} {'local hit ms':>13} {'Redis hit ms':>13}")
+        for name, client in clients.items():
+            local_cache.clear()
+            print(f"  {name:8} {_hit_ms(client, False):13.3f} {_hit_ms(client, True):13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: latency of a cheap request while a cold session "loads" concurrently,
+with the load running in an API thread (old behaviour) vs a session loader worker process.
+The load is simulated with repeated lap extraction on synthetic data (pure CPU, holds the GIL).
+Run from backend/:  python -m benchmarks.bench_session_loader
+"""
+import json
+import statistics
+import threading
+import time
+from types import SimpleNamespace
+
+from benchmarks.synthetic import make_laps_frame
+from connectors.fastf1_connector import get_laps
+from connectors.session_loader import SessionLoader
+
+LOAD_S = 3.0
+PROBE_INTERVAL_S = 0.01
+CACHED_PAYLOAD = {"standings": [{"position": i, "points": 400 - i * 10, "driver": f"D{i:02d}"} for i in range(20)]}
+
+
+def simulated_load(seconds: float) -> int:
+    session = SimpleNamespace(laps=make_laps_frame(2000))
+    laps = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        laps += len(get_laps(session))
+    return laps
+
+
+def probe(stop: threading.Event) -> list[float]:
+    """
+    Serve a 'cached response' (JSON encode) every PROBE_INTERVAL_S; latency counts from when
+    the request was due, so time spent waiting for the GIL after waking is included.
+    """
+    latencies = []
+    while not stop.is_set():
+        due = time.perf_counter() + PROBE_INTERVAL_S
+        time.sleep(PROBE_INTERVAL_S)
+        json.dumps(CACHED_PAYLOAD)
+        latencies.append((time.perf_counter() - due) * 1000)
+    return latencies
+
+
+def measure(run_load) -> list[float]:
+    stop = threading.Event()
+    loader_thread = threading.Thread(target=lambda: (run_load(), stop.set()))
+    loader_thread.start()
+    latencies = probe(stop)
+    loader_thread.join()
+    return latencies
+
+
+def _summary(name: str, latencies: list[float]) -> None:
+    q = statistics.quantiles(latencies, n=100)
+    print(f"  {name:24} n={len(latencies):4d}  p50={q[49]:7.3f} ms  p99={q[98]:7.3f} ms  max={max(latencies):7.3f} ms")
+
+
+def main():
+    print(f"cached-response latency during a {LOAD_S:.0f}s CPU-bound session load")
+    _summary("idle", measure(lambda: time.sleep(LOAD_S)))
+    _summary("load in API thread", measure(lambda: simulated_load(LOAD_S)))
+
+    loader = SessionLoader(workers=1, max_pending=1)
+    loader.run(time.sleep, 0)  # start the worker process outside the measurement
+    try:
+        _summary("load in loader worker", measure(lambda: loader.run(simulated_load, LOAD_S)))
+    finally:
+        loader.shutdown()
+
+
+if __name__ == "__main__":
+    main()
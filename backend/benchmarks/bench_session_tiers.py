@@ -0,0 +1,107 @@
+"""
+Benchmark: load time and peak RSS of the two session tiers — laps-only (what /analytics
+reads) vs laps + car/position data (what /telemetry needs) — and of upgrading a laps-only
+session in place. Every scenario runs in a fresh process, so peak RSS is that tier's alone.
+Real sessions come from FastF1 (network, or a warm FastF1 cache):
+    python -m benchmarks.bench_session_tiers --season 2024 --round 1 --session R
+Offline, --synthetic builds race-sized frames instead; load times are then meaningless,
+but the memory held by each tier is representative.
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import DRIVERS, make_laps_frame
+from connectors.session_pool import estimate_session_bytes
+
+RACE_S = 5400
+CAR_HZ = 4.0   # car data sample rate FastF1 reports, roughly
+POS_HZ = 4.5
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+
+
+def _synthetic_frame(n: int, channels: list[str], rng) -> pd.DataFrame:
+    clock = pd.to_timedelta(np.linspace(0, RACE_S, n), unit="s")
+    frame = {"Date": pd.Timestamp("2024-03-02 15:00") + clock, "SessionTime": clock, "Time": clock}
+    frame.update({name: rng.normal(0, 1, n) for name in channels})
+    frame["Source"] = np.full(n, "car", dtype=object)
+    return pd.DataFrame(frame)
+
+
+def _synthetic_session(telemetry: bool):
+    session = SimpleNamespace(laps=make_laps_frame(1140))
+    if telemetry:
+        rng = np.random.default_rng(0)
+        session.car_data = {
+            code: _synthetic_frame(int(RACE_S * CAR_HZ), ["RPM", "Speed", "nGear", "Throttle", "Brake", "DRS"], rng)
+            for code in DRIVERS
+        }
+        session.pos_data = {
+            code: _synthetic_frame(int(RACE_S * POS_HZ), ["Status", "X", "Y", "Z"], rng) for code in DRIVERS
+        }
+    return session
+
+
+def _run(scenario: str, args: dict, out) -> None:
+    """One scenario in a child process; sends (timings, estimated MB, peak RSS MB) back."""
+    timings = {}
+    if args["synthetic"]:
+        started = time.perf_counter()
+        session = _synthetic_session(scenario != "laps")
+        timings["build"] = time.perf_counter() - started
+    else:
+        from connectors.fastf1_connector import get_session
+        key = (args["season"], args["round"], args["session"])
+        started = time.perf_counter()
+        session = get_session(*key, telemetry=scenario == "telemetry")
+        timings["load"] = time.perf_counter() - started
+        if scenario == "upgrade":
+            started = time.perf_counter()
+            session = get_session(*key, telemetry=True)
+            timings["upgrade"] = time.perf_counter() - started
+    if session is None:
+        out.send(None)
+        return
+    out.send((timings, estimate_session_bytes(session) / 1048576, _peak_rss_mb()))
+
+
+def measure(scenario: str, args: dict):
+    ctx = multiprocessing.get_context("spawn")
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_run, args=(scenario, args, sender))
+    process.start()
+    result = receiver.recv()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--season", type=int, default=2024)
+    parser.add_argument("--round", type=int, default=1)
+    parser.add_argument("--session", default="R")
+    parser.add_argument("--synthetic", action="store_true", help="race-sized synthetic frames, no FastF1")
+    args = vars(parser.parse_args())
+    scenarios = ("laps", "telemetry") if args["synthetic"] else ("laps", "telemetry", "upgrade")
+    source = "synthetic race" if args["synthetic"] else f"{args['season']} R{args['round']} {args['session']}"
+    print(f"Session tiers, {source} (fresh process per scenario)")
+    for scenario in scenarios:
+        result = measure(scenario, args)
+        if result is None:
+            print(f"  {scenario:10} session could not be loaded")
+            continue
+        timings, estimated_mb, rss_mb = result
+        spent = "  ".join(f"{name} {seconds:6.2f} s" for name, seconds in timings.items())
+        print(f"  {scenario:10} {spent:30} held {estimated_mb:7.1f} MB   peak RSS {rss_mb:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
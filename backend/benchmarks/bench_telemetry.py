@@ -0,0 +1,73 @@
+"""
+Benchmark: telemetry extraction, payload size and JSON encode time.
+Compares the legacy per-row dict path with columnar, LTTB-downsampled and binary output.
+Run from backend/:  python -m benchmarks.bench_telemetry
+"""
+import json
+import timeit
+
+from benchmarks.synthetic import make_telemetry_frame
+from normalizers.telemetry_codec import encode_packed, encode_arrow, arrow_available
+from normalizers.telemetry_normalizer import (
+    extract_telemetry_columns, downsample_columns, columns_to_lists, columns_to_records,
+)
+
+N_SAMPLES = 750
+POINTS = 500
+REPEAT = 7
+
+
+def legacy_records(tel) -> list[dict]:
+    """The pre-vectorization iterrows implementation, kept here as the baseline."""
+    result = []
+    for _, row in tel.iterrows():
+        result.append({
+            "distance": float(row.get("Distance", 0)),
+            "speed": float(row.get("Speed", 0)),
+            "throttle": float(row.get("Throttle", 0)),
+            "brake": float(row.get("Brake", 0)),
+            "gear": int(row.get("nGear", 0)),
+            "rpm": int(row.get("RPM", 0)),
+            "drs": int(row.get("DRS", 0)),
+            "x": float(row.get("X", 0)),
+            "y": float(row.get("Y", 0)),
+        })
+    return result
+
+
+def _best(fn) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=REPEAT)) * 1000
+
+
+def main():
+    tel = make_telemetry_frame(N_SAMPLES)
+    variants = {
+        "legacy records": lambda: legacy_records(tel),
+        "vectorized records": lambda: columns_to_records(extract_telemetry_columns(tel)),
+        "columnar": lambda: columns_to_lists(extract_telemetry_columns(tel)),
+        f"columnar, {POINTS} pts": lambda: columns_to_lists(
+            downsample_columns(extract_telemetry_columns(tel), POINTS)
+        ),
+    }
+
+    print(f"Telemetry for one {N_SAMPLES}-sample lap (best of {REPEAT})")
+    print(f"  {'variant':24} {'extract ms':>10} {'encode ms':>10} {'bytes':>9}")
+    for name, build in variants.items():
+        extract_ms = _best(build)
+        payload = build()
+        encode_ms = _best(lambda: json.dumps(payload))
+        size = len(json.dumps(payload).encode())
+        print(f"  {name:24} {extract_ms:10.2f} {encode_ms:10.2f} {size:9d}")
+
+    # Binary bodies are also the cached form, so size here is Redis bytes per lap
+    encoders = {"packed float32": encode_packed}
+    if arrow_available():
+        encoders["arrow ipc"] = encode_arrow
+    columns = extract_telemetry_columns(tel)
+    for name, encode in encoders.items():
+        encode_ms = _best(lambda: encode(columns))
+        print(f"  {name:24} {'':10} {encode_ms:10.2f} {len(encode(columns)):9d}")
+
+
+if __name__ == "__main__":
+    main()
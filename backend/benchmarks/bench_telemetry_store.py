@@ -0,0 +1,131 @@
+"""
+Benchmark: per-lap telemetry blobs (lap_telemetry) vs one row per sample (the former
+telemetry_points table) — write time, rows written, disk usage and single-lap read latency.
+Runs against an on-disk SQLite file, so absolute numbers differ from PostgreSQL;
+the ratios are what matter.
+Run from backend/:  python -m benchmarks.bench_telemetry_store [--laps 57]
+"""
+import argparse
+import os
+import tempfile
+import time
+import timeit
+
+import numpy as np
+from sqlalchemy import Column, Float, Index, Integer, MetaData, String, Table, create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.synthetic import DRIVERS, make_telemetry_frame
+from models import Base, Driver, LapTelemetry, RaceEvent, SessionRecord
+from normalizers.telemetry_codec import encode_lap_blob, decode_lap_blob
+from normalizers.telemetry_normalizer import extract_telemetry_columns
+
+N_SAMPLES = 700
+REPEAT = 5
+
+# The row-per-sample schema this store replaced, with an index for one-lap reads
+_legacy = MetaData()
+telemetry_points = Table(
+    "telemetry_points", _legacy,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("session_id", Integer), Column("driver_id", String), Column("lap_number", Integer),
+    Column("distance", Float), Column("speed", Float), Column("throttle", Float), Column("brake", Float),
+    Column("gear", Integer), Column("rpm", Integer), Column("drs", Integer),
+    Column("x", Float), Column("y", Float),
+    Index("ix_telemetry_points_lap", "session_id", "driver_id", "lap_number"),
+)
+
+
+def make_laps(n_laps: int) -> list[tuple[str, int, dict]]:
+    laps = []
+    for d, code in enumerate(DRIVERS):
+        for lap in range(1, n_laps + 1):
+            frame = make_telemetry_frame(N_SAMPLES, seed=d * 1000 + lap)
+            laps.append((code, lap, extract_telemetry_columns(frame)))
+    return laps
+
+
+def _engine(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    _legacy.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(RaceEvent(id=1, season=2025, round=1, name="Benchmark GP"))
+        db.add(SessionRecord(id=1, event_id=1, type="R"))
+        db.add_all(Driver(id=code, code=code, full_name=code) for code in DRIVERS)
+        db.commit()
+    return engine
+
+
+def write_rows(engine, laps) -> int:
+    rows = [
+        {"session_id": 1, "driver_id": code, "lap_number": lap, **{k: v[i].item() for k, v in columns.items()}}
+        for code, lap, columns in laps
+        for i in range(len(columns["distance"]))
+    ]
+    with engine.begin() as conn:
+        for start in range(0, len(rows), 5000):
+            conn.execute(insert(telemetry_points), rows[start:start + 5000])
+    return len(rows)
+
+
+def write_blobs(engine, laps) -> int:
+    rows = [
+        {"session_id": 1, "driver_id": code, "lap_number": lap,
+         "samples": len(columns["distance"]), "data": encode_lap_blob(columns)}
+        for code, lap, columns in laps
+    ]
+    with engine.begin() as conn:
+        for start in range(0, len(rows), 200):
+            conn.execute(insert(LapTelemetry), rows[start:start + 200])
+    return len(rows)
+
+
+def read_rows(conn, code: str, lap: int) -> dict:
+    t = telemetry_points.c
+    result = conn.execute(
+        select(t.distance, t.speed, t.throttle, t.brake, t.gear, t.rpm, t.drs, t.x, t.y)
+        .where(t.session_id == 1, t.driver_id == code, t.lap_number == lap)
+        .order_by(t.id)
+    ).all()
+    return {name: np.array(values) for name, values in zip(result[0]._fields, zip(*result))}
+
+
+def read_blob(conn, code: str, lap: int) -> dict:
+    t = LapTelemetry.__table__.c
+    blob = conn.execute(
+        select(t.data).where(t.session_id == 1, t.driver_id == code, t.lap_number == lap)
+    ).scalar()
+    return decode_lap_blob(blob)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--laps", type=int, default=57, help="laps per driver (20 drivers)")
+    args = parser.parse_args()
+    laps = make_laps(args.laps)
+    print(f"{len(DRIVERS)} drivers x {args.laps} laps x {N_SAMPLES} samples")
+    print(f"  {'model':16} {'rows':>9} {'write s':>8} {'disk MB':>8} {'read lap ms':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, write, read in (("row per sample", write_rows, read_rows), ("lap blob", write_blobs, read_blob)):
+            path = os.path.join(tmp, f"{name.replace(' ', '_')}.db")
+            engine = _engine(path)
+            base_size = os.path.getsize(path)
+            t0 = time.perf_counter()
+            rows = write(engine, laps)
+            write_s = time.perf_counter() - t0
+            engine.dispose()
+            disk_mb = (os.path.getsize(path) - base_size) / 1048576
+
+            engine = create_engine(f"sqlite:///{path}")
+            with engine.connect() as conn:
+                lap = args.laps // 2 or 1
+                read(conn, "HAM", lap)  # warm the page cache, as a hot Postgres would be
+                read_ms = min(timeit.repeat(lambda: read(conn, "HAM", lap), number=20, repeat=REPEAT)) / 20 * 1000
+            engine.dispose()
+            print(f"  {name:16} {rows:9d} {write_s:8.2f} {disk_mb:8.1f} {read_ms:12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Synthetic FastF1-shaped data for benchmarks.
+Shapes and dtypes mirror fastf1.core.Laps so the connector code paths are exercised unchanged.
+"""
+import numpy as np
+import pandas as pd
+
+DRIVERS = [
+    "VER", "PER", "HAM", "RUS", "LEC", "SAI", "NOR", "PIA", "ALO", "STR",
+    "GAS", "OCO", "ALB", "SAR", "TSU", "RIC", "BOT", "ZHO", "HUL", "MAG",
+]
+TEAMS = [
+    "Red Bull Racing", "Mercedes", "Ferrari", "McLaren", "Aston Martin",
+    "Alpine", "Williams", "RB", "Kick Sauber", "Haas F1 Team",
+]
+COMPOUNDS = ["SOFT", "MEDIUM", "HARD"]
+
+
+def make_laps_frame(n_laps: int = 2000, n_drivers: int = 20, seed: int = 0) -> pd.DataFrame:
+    """A Laps-like frame with n_laps rows spread evenly over n_drivers."""
+    rng = np.random.default_rng(seed)
+    drivers = DRIVERS[:n_drivers]
+    per_driver = int(np.ceil(n_laps / n_drivers))
+    driver_col = np.repeat(drivers, per_driver)[:n_laps]
+    lap_number = np.tile(np.arange(1, per_driver + 1), n_drivers)[:n_laps].astype(float)
+    stint = np.minimum(lap_number // 20 + 1, 3)
+    lap_s = 90 + 0.05 * (lap_number % 20) + rng.normal(0, 0.4, n_laps)
+    s1 = lap_s * 0.3
+    s2 = lap_s * 0.4
+    s3 = lap_s - s1 - s2
+
+    def td(seconds):
+        out = pd.to_timedelta(seconds, unit="s")
+        mask = rng.random(n_laps) < 0.02  # a few missing timings, as in real data
+        return out.where(~mask, pd.NaT)
+
+    teams = np.repeat(TEAMS, 2)[:n_drivers]
+    team_col = np.repeat(teams, per_driver)[:n_laps]
+    session_s = 3600 + lap_number * 91.0 + rng.normal(0, 1.0, n_laps)
+    return pd.DataFrame({
+        "Time": pd.to_timedelta(session_s, unit="s"),
+        "Driver": driver_col,
+        "Team": team_col,
+        "LapTime": td(lap_s),
+        "LapNumber": lap_number,
+        "Stint": stint,
+        "Sector1Time": td(s1),
+        "Sector2Time": td(s2),
+        "Sector3Time": td(s3),
+        "IsPersonalBest": rng.random(n_laps) < 0.05,
+        "Compound": np.array(COMPOUNDS, dtype=object)[(stint.astype(int) - 1) % 3],
+        "LapStartTime": pd.to_timedelta(session_s - lap_s, unit="s"),
+        "TrackStatus": np.where(rng.random(n_laps) < 0.05, "4", "1"),
+    })
+
+
+def make_telemetry_frame(n_samples: int = 750, lap_length_m: float = 5300.0, seed: int = 0) -> pd.DataFrame:
+    """A Telemetry-like frame for one lap (merged car + position data)."""
+    rng = np.random.default_rng(seed)
+    distance = np.linspace(0, lap_length_m, n_samples)
+    # Straights and corners: speed oscillates between ~90 and ~320 km/h
+    speed = 205 + 115 * np.sin(distance / lap_length_m * 2 * np.pi * 9) + rng.normal(0, 2, n_samples)
+    throttle = np.clip((speed - 120) / 1.8, 0, 100)
+    angle = distance / lap_length_m * 2 * np.pi
+    return pd.DataFrame({
+        "Distance": distance,
+        "Speed": speed,
+        "Throttle": throttle,
+        "Brake": (throttle < 5).astype(bool),
+        "nGear": np.clip((speed // 45).astype(int) + 1, 1, 8),
+        "RPM": (8000 + speed * 15).astype(int),
+        "DRS": np.where(speed > 300, 12, 0),
+        "X": 2500 * np.cos(angle) + rng.normal(0, 1, n_samples),
+        "Y": 1500 * np.sin(angle) + rng.normal(0, 1, n_samples),
+    })
@@ -1,6 +1,12 @@
+import asyncio
 import json
 import logging
-from typing import Optional, Any
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Any, Awaitable, Callable, Union
 import redis as redis_lib
 from config import get_settings
 
@@ -8,6 +14,7 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 _client: Optional[redis_lib.Redis] = None
+_binary_client: Optional[redis_lib.Redis] = None
 
 
 def get_redis_client() -> redis_lib.Redis:
@@ -21,28 +28,654 @@ def get_redis_client() -> redis_lib.Redis:
     return _client
 
 
-def cache_key(*args: Any) -> str:
-    """Build a namespaced cache key string."""
-    return "openf1:" + ":".join(str(a) for a in args)
+def get_redis_binary_client() -> redis_lib.Redis:
+    """Redis client that returns raw bytes (no UTF-8 decoding) for binary payloads."""
+    global _binary_client
+    if _binary_client is None:
+        _binary_client = redis_lib.Redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=False,
+            socket_connect_timeout=5,
+        )
+    return _binary_client
 
 
-def cache_get(key: str) -> Optional[dict]:
-    """Retrieve and JSON-decode a cached value. Returns None on miss or error."""
-    try:
-        client = get_redis_client()
-        raw = client.get(key)
-        if raw is None:
+def cache_key(namespace: str, *args: Any) -> str:
+    """
+    Build a namespaced, versioned cache key string.
+    Bumping CACHE_VERSION invalidates every key; bumping a namespace's entry in
+    CACHE_NAMESPACE_VERSIONS invalidates only that namespace (e.g. "analytics").
+    """
+    ns_version = settings.CACHE_NAMESPACE_VERSIONS.get(namespace, 1)
+    parts = [f"v{settings.CACHE_VERSION}", f"{namespace}.v{ns_version}", *args]
+    return "openf1:" + ":".join(str(a) for a in parts)
+
+
+# ─── Value codec ─────────────────────────────────────────────────────────────
+# Small values are stored as JSON text. Values at or above CACHE_COMPRESS_MIN_BYTES
+# are stored as msgpack + zstd when both packages are installed; a magic prefix
+# tells the reader which encoding it got, so mixed entries decode transparently.
+
+try:
+    import msgpack
+    import zstandard
+except ImportError:  # optional dependencies
+    msgpack = zstandard = None
+
+_MSGPACK_ZSTD_MAGIC = b"\x00MZ1"
+_zstd_local = threading.local()
+
+
+def _zstd():
+    """Per-thread zstd compressor/decompressor pair (they are not thread-safe)."""
+    if not hasattr(_zstd_local, "pair"):
+        _zstd_local.pair = (
+            zstandard.ZstdCompressor(level=settings.CACHE_ZSTD_LEVEL),
+            zstandard.ZstdDecompressor(),
+        )
+    return _zstd_local.pair
+
+
+def compression_available() -> bool:
+    return msgpack is not None and zstandard is not None
+
+
+def encode_value(value: Any) -> bytes:
+    if compression_available():
+        packed = msgpack.packb(value, default=str)
+        if len(packed) >= settings.CACHE_COMPRESS_MIN_BYTES:
+            return _MSGPACK_ZSTD_MAGIC + _zstd()[0].compress(packed)
+    return json.dumps(value, default=str).encode()
+
+
+def decode_value(raw) -> Any:
+    if isinstance(raw, bytes) and raw.startswith(_MSGPACK_ZSTD_MAGIC):
+        packed = _zstd()[1].decompress(raw[len(_MSGPACK_ZSTD_MAGIC):])
+        return msgpack.unpackb(packed, strict_map_key=False)
+    return json.loads(raw)
+
+
+# ─── Response bodies ─────────────────────────────────────────────────────────
+# Route responses are cached as the JSON bytes sent to the client, so a hit is served
+# without decoding or re-encoding. orjson encodes them when installed. Redis holds
+# large bodies zstd-compressed behind their own magic prefix; the local tier holds
+# them ready to send.
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+_ZSTD_JSON_MAGIC = b"\x00ZJ1"
+
+
+def _json_default(value: Any) -> Any:
+    if hasattr(value, "tolist"):
+        return value.tolist()  # numpy scalars and arrays orjson does not take natively
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def dumps_json(value: Any) -> bytes:
+    """Compact UTF-8 JSON; numpy values, non-string keys and sets are accepted."""
+    if orjson is not None:
+        return orjson.dumps(
+            value, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(value, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads_json(body: bytes) -> Any:
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+# ─── In-process tier ─────────────────────────────────────────────────────────
+
+class LocalCache:
+    """
+    Per-process LRU in front of Redis holding encoded bytes, bounded by their total size.
+    Entries expire after their own TTL, capped at max_ttl_seconds so other
+    workers' writes to Redis become visible within that window.
+    """
+
+    def __init__(self, max_bytes: int, max_ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.max_ttl_seconds = max_ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self._drop_locked(key)
+            self.misses += 1
             return None
-        return json.loads(raw)
+
+    def set(self, key: str, value: Any, nbytes: int, ttl_seconds: float) -> None:
+        if nbytes > self.max_bytes:
+            return
+        expires_at = time.monotonic() + min(ttl_seconds, self.max_ttl_seconds)
+        with self._lock:
+            self._drop_locked(key)
+            self._entries[key] = (expires_at, nbytes, value)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop_locked(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._drop_locked(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "mb": round(self._bytes / 1048576, 2),
+                "max_mb": round(self.max_bytes / 1048576, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+
+local_cache = LocalCache(
+    max_bytes=settings.LOCAL_CACHE_MAX_MB * 1024 * 1024,
+    max_ttl_seconds=settings.LOCAL_CACHE_TTL_S,
+)
+_redis_stats = {"hits": 0, "misses": 0, "errors": 0}
+_redis_stats_lock = threading.Lock()
+
+
+def _count_redis(stat: str) -> None:
+    with _redis_stats_lock:
+        _redis_stats[stat] += 1
+
+
+def _redis_get(key: str) -> tuple[Optional[bytes], float]:
+    """GET plus remaining TTL in one round trip; the TTL bounds the local copy."""
+    try:
+        pipe = get_redis_binary_client().pipeline(transaction=False)
+        pipe.get(key)
+        pipe.ttl(key)
+        raw, ttl = pipe.execute()
     except Exception as e:
+        _count_redis("errors")
         logger.warning(f"Cache GET failed for key={key}: {e}")
+        return None, 0
+    _count_redis("hits" if raw is not None else "misses")
+    return raw, ttl if ttl and ttl > 0 else settings.LOCAL_CACHE_TTL_S
+
+
+def _redis_set(key: str, raw: bytes, ttl_seconds: int) -> None:
+    try:
+        get_redis_binary_client().setex(key, ttl_seconds, raw)
+    except Exception as e:
+        _count_redis("errors")
+        logger.warning(f"Cache SET failed for key={key}: {e}")
+
+
+def cache_stats() -> dict:
+    """Per-tier hit/miss counters for this process."""
+    with _redis_stats_lock:
+        redis_stats = dict(_redis_stats)
+    lookups = redis_stats["hits"] + redis_stats["misses"]
+    redis_stats["hit_ratio"] = round(redis_stats["hits"] / lookups, 3) if lookups else None
+    return {"local": local_cache.stats(), "redis": redis_stats}
+
+
+def _decode(key: str, raw: bytes) -> Any:
+    try:
+        return decode_value(raw)
+    except Exception as e:
+        logger.warning(f"Cache decode failed for key={key}: {e}")
         return None
 
 
+def cache_get(key: str) -> Optional[dict]:
+    """
+    Retrieve a cached value from the local tier, then Redis. Returns None on miss or error.
+    Both tiers hold the encoded bytes, so the local budget counts what is really held and
+    every caller gets its own freshly decoded value.
+    """
+    raw = local_cache.get(key)
+    if raw is not None:
+        return _decode(key, raw)
+    raw, ttl = _redis_get(key)
+    if raw is None:
+        return None
+    value = _decode(key, raw)
+    if value is not None:
+        local_cache.set(key, raw, len(raw), ttl)
+    return value
+
+
 def cache_set(key: str, value: Any, ttl_seconds: int = 3600) -> None:
-    """JSON-encode and cache a value with TTL. Silently ignores errors."""
+    """Encode and cache a value with TTL in both tiers. Silently ignores errors."""
     try:
-        client = get_redis_client()
-        client.setex(key, ttl_seconds, json.dumps(value, default=str))
+        raw = encode_value(value)
     except Exception as e:
-        logger.warning(f"Cache SET failed for key={key}: {e}")
+        logger.warning(f"Cache encode failed for key={key}: {e}")
+        return
+    local_cache.set(key, raw, len(raw), ttl_seconds)
+    _redis_set(key, raw, ttl_seconds)
+
+
+def cache_get_many(keys: list[str]) -> dict[str, Any]:
+    """
+    cache_get for several keys: local tier first, then one pipelined Redis round trip
+    for the rest. Returns only the keys that hit.
+    """
+    found = {}
+    missing = []
+    for key in keys:
+        raw = local_cache.get(key)
+        value = _decode(key, raw) if raw is not None else None
+        if value is not None:
+            found[key] = value
+        else:
+            missing.append(key)
+    if not missing:
+        return found
+
+    try:
+        pipe = get_redis_binary_client().pipeline(transaction=False)
+        for key in missing:
+            pipe.get(key)
+            pipe.ttl(key)
+        replies = pipe.execute()
+    except Exception as e:
+        _count_redis("errors")
+        logger.warning(f"Cache GET failed for {len(missing)} keys: {e}")
+        return found
+
+    for key, raw, ttl in zip(missing, replies[::2], replies[1::2]):
+        _count_redis("hits" if raw is not None else "misses")
+        if raw is None:
+            continue
+        value = _decode(key, raw)
+        if value is None:
+            continue
+        local_cache.set(key, raw, len(raw), ttl if ttl and ttl > 0 else settings.LOCAL_CACHE_TTL_S)
+        found[key] = value
+    return found
+
+
+def cache_set_many(values: dict[str, Any], ttl_seconds: int = 3600) -> None:
+    """cache_set for several keys, written to Redis in one pipelined round trip."""
+    encoded = {}
+    for key, value in values.items():
+        try:
+            raw = encode_value(value)
+        except Exception as e:
+            logger.warning(f"Cache encode failed for key={key}: {e}")
+            continue
+        local_cache.set(key, raw, len(raw), ttl_seconds)
+        encoded[key] = raw
+    if not encoded:
+        return
+    try:
+        pipe = get_redis_binary_client().pipeline(transaction=False)
+        for key, raw in encoded.items():
+            pipe.set(key, raw, ex=ttl_seconds)
+        pipe.execute()
+    except Exception as e:
+        _count_redis("errors")
+        logger.warning(f"Cache SET failed for {len(encoded)} keys: {e}")
+
+
+def cache_delete(key: str) -> None:
+    """
+    Drop a key from this process's local tier and from Redis. Other workers' local
+    copies expire within LOCAL_CACHE_TTL_S.
+    """
+    local_cache.delete(key)
+    try:
+        get_redis_binary_client().delete(key)
+    except Exception as e:
+        _count_redis("errors")
+        logger.warning(f"Cache DELETE failed for key={key}: {e}")
+
+
+def cache_get_bytes(key: str) -> Optional[bytes]:
+    """Retrieve a raw binary value from the local tier, then Redis. Returns None on miss or error."""
+    value = local_cache.get(key)
+    if value is not None:
+        return value
+    raw, ttl = _redis_get(key)
+    if raw is not None:
+        local_cache.set(key, raw, len(raw), ttl)
+    return raw
+
+
+def cache_set_bytes(key: str, value: bytes, ttl_seconds: int = 3600) -> None:
+    """Cache a raw binary value with TTL in both tiers. Silently ignores errors."""
+    local_cache.set(key, value, len(value), ttl_seconds)
+    _redis_set(key, value, ttl_seconds)
+
+
+def cache_get_json(key: str) -> Optional[bytes]:
+    """Retrieve a cached JSON response body from the local tier, then Redis. None on miss or error."""
+    body = local_cache.get(key)
+    if body is not None:
+        return None if body.startswith(_MSGPACK_ZSTD_MAGIC) else body
+    raw, ttl = _redis_get(key)
+    if raw is None or raw.startswith(_MSGPACK_ZSTD_MAGIC):
+        return None  # a value cached by cache_set is not a response body
+    if raw.startswith(_ZSTD_JSON_MAGIC):
+        try:
+            body = _zstd()[1].decompress(raw[len(_ZSTD_JSON_MAGIC):])
+        except Exception as e:
+            logger.warning(f"Cache decompress failed for key={key}: {e}")
+            return None
+    else:
+        body = raw
+    local_cache.set(key, body, len(body), ttl)
+    return body
+
+
+def cache_set_json(key: str, body: bytes, ttl_seconds: int = 3600) -> None:
+    """Cache a JSON response body in both tiers; zstd-compressed in Redis when large."""
+    local_cache.set(key, body, len(body), ttl_seconds)
+    raw = body
+    if zstandard is not None and len(body) >= settings.CACHE_COMPRESS_MIN_BYTES:
+        raw = _ZSTD_JSON_MAGIC + _zstd()[0].compress(body)
+    _redis_set(key, raw, ttl_seconds)
+
+
+# ─── Single-flight cache misses ──────────────────────────────────────────────
+# Concurrent misses for one key share a single computation: threads in this
+# process wait on an in-memory flight, other workers wait on a Redis lease
+# (SET NX) and poll for the leader's cached result.
+
+_RELEASE_LEASE = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# A fixed TTL, or a function of the computed value (e.g. shorter TTL for empty results)
+TTL = Union[int, Callable[[Any], int]]
+
+_POLL_INITIAL_S = 0.05
+_POLL_MAX_S = 0.5
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+_flights: dict[str, _Flight] = {}
+_flights_lock = threading.Lock()
+_flight_stats = {
+    "hits": 0,             # served straight from cache
+    "computes": 0,         # misses this process computed itself
+    "local_waiters": 0,    # misses coalesced onto a computation in this process
+    "remote_waiters": 0,   # misses served by another worker's computation
+    "remote_timeouts": 0,  # waited for another worker, gave up and computed
+}
+
+
+def _count(stat: str) -> None:
+    with _flights_lock:
+        _flight_stats[stat] += 1
+
+
+def single_flight_stats() -> dict:
+    with _flights_lock:
+        return {**_flight_stats, "in_flight": len(_flights) + len(_async_flights)}
+
+
+def _acquire_lease(lease_key: str, token: str, ttl_seconds: Optional[int] = None) -> bool:
+    """Try to take the cross-worker compute lease. Fails open if Redis is unavailable."""
+    try:
+        ex = ttl_seconds or settings.SINGLE_FLIGHT_LEASE_S
+        return bool(get_redis_client().set(lease_key, token, nx=True, ex=ex))
+    except Exception as e:
+        logger.warning(f"Lease acquire failed for key={lease_key}: {e}")
+        return True
+
+
+def _release_lease(lease_key: str, token: str) -> None:
+    try:
+        get_redis_client().eval(_RELEASE_LEASE, 1, lease_key, token)
+    except Exception as e:
+        logger.warning(f"Lease release failed for key={lease_key}: {e}")
+
+
+@contextmanager
+def lease(key: str, ttl_seconds: int):
+    """
+    Cross-worker lease on key (SET NX on key:lease) for work that is not a cached value,
+    such as ingestion. Yields whether this worker holds it; fails open like the compute lease.
+    """
+    lease_key = f"{key}:lease"
+    token = uuid.uuid4().hex
+    held = _acquire_lease(lease_key, token, ttl_seconds)
+    try:
+        yield held
+    finally:
+        if held:
+            _release_lease(lease_key, token)
+
+
+def _lease_held(lease_key: str) -> bool:
+    try:
+        return bool(get_redis_client().exists(lease_key))
+    except Exception:
+        return False
+
+
+def _wait_for_remote(key: str, lease_key: str, getter: Callable, deadline: float) -> Any:
+    """Poll until another worker caches key, drops its lease, or the deadline passes."""
+    delay = _POLL_INITIAL_S
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        value = getter(key)
+        if value is not None:
+            return value
+        if not _lease_held(lease_key):
+            return None  # leader gave up without a result; caller may take over
+        delay = min(delay * 2, _POLL_MAX_S)
+    return None
+
+
+def _resolve_ttl(ttl_seconds: TTL, value: Any) -> int:
+    return ttl_seconds(value) if callable(ttl_seconds) else ttl_seconds
+
+
+def _compute_as_leader(key: str, compute: Callable[[], Any], ttl_seconds: TTL, getter: Callable, setter: Callable):
+    lease_key = f"{key}:lease"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_S
+    waited = False
+    while not _acquire_lease(lease_key, token):
+        waited = True
+        value = _wait_for_remote(key, lease_key, getter, deadline)
+        if value is not None:
+            _count("remote_waiters")
+            return value
+        if time.monotonic() >= deadline:
+            _count("remote_timeouts")
+            logger.warning(f"Gave up waiting for remote compute of key={key}")
+            break
+    try:
+        if waited:
+            # The previous lease holder may have finished between our polls
+            value = getter(key)
+            if value is not None:
+                _count("remote_waiters")
+                return value
+        _count("computes")
+        result = compute()
+        setter(key, result, _resolve_ttl(ttl_seconds, result))
+        return result
+    finally:
+        _release_lease(lease_key, token)
+
+
+def _single_flight(key: str, compute: Callable[[], Any], ttl_seconds: TTL, getter: Callable, setter: Callable):
+    cached = getter(key)
+    if cached is not None:
+        _count("hits")
+        return cached
+
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+        else:
+            _flight_stats["local_waiters"] += 1
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _compute_as_leader(key, compute, ttl_seconds, getter, setter)
+        return flight.result
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+
+
+def get_or_compute(key: str, compute: Callable[[], Any], ttl_seconds: TTL = 3600) -> Any:
+    """
+    Return the cached JSON value for key, or compute and cache it.
+    Concurrent misses for the same key — in this process or other workers —
+    wait for one computation instead of repeating it. Exceptions raised by
+    compute propagate to every waiter in this process and nothing is cached.
+    """
+    return _single_flight(key, compute, ttl_seconds, cache_get, cache_set)
+
+
+def get_or_compute_bytes(key: str, compute: Callable[[], bytes], ttl_seconds: TTL = 3600) -> bytes:
+    """Binary counterpart of get_or_compute (see cache_get_bytes)."""
+    return _single_flight(key, compute, ttl_seconds, cache_get_bytes, cache_set_bytes)
+
+
+def get_or_compute_json(key: str, compute: Callable[[], Any], ttl_seconds: TTL = 3600) -> bytes:
+    """
+    get_or_compute for route responses: caches the encoded JSON body (see cache_get_json)
+    and returns it, on a hit without decoding anything. A callable ttl_seconds is still
+    given the computed value, not its bytes.
+    """
+    ttl = {}
+
+    def encode() -> bytes:
+        value = compute()
+        ttl["seconds"] = _resolve_ttl(ttl_seconds, value)
+        return dumps_json(value)
+
+    return _single_flight(key, encode, lambda body: ttl["seconds"], cache_get_json, cache_set_json)
+
+
+# Async routes coalesce on asyncio futures instead of blocking the event loop on
+# thread events; Redis calls run in the default executor.
+
+_async_flights: dict[str, asyncio.Future] = {}
+
+
+async def _acompute_as_leader(key: str, compute: Callable[[], Awaitable[Any]], ttl_seconds: TTL) -> Any:
+    lease_key = f"{key}:lease"
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + settings.SINGLE_FLIGHT_WAIT_S
+    waited = False
+    while not await asyncio.to_thread(_acquire_lease, lease_key, token):
+        waited = True
+        value = None
+        delay = _POLL_INITIAL_S
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            value = await asyncio.to_thread(cache_get, key)
+            if value is not None or not await asyncio.to_thread(_lease_held, lease_key):
+                break
+            delay = min(delay * 2, _POLL_MAX_S)
+        if value is not None:
+            _count("remote_waiters")
+            return value
+        if time.monotonic() >= deadline:
+            _count("remote_timeouts")
+            logger.warning(f"Gave up waiting for remote compute of key={key}")
+            break
+    try:
+        if waited:
+            value = await asyncio.to_thread(cache_get, key)
+            if value is not None:
+                _count("remote_waiters")
+                return value
+        _count("computes")
+        result = await compute()
+        await asyncio.to_thread(cache_set, key, result, _resolve_ttl(ttl_seconds, result))
+        return result
+    finally:
+        await asyncio.to_thread(_release_lease, lease_key, token)
+
+
+async def aget_or_compute(key: str, compute: Callable[[], Awaitable[Any]], ttl_seconds: TTL = 3600) -> Any:
+    """Async counterpart of get_or_compute for routes whose compute step is a coroutine."""
+    cached = await asyncio.to_thread(cache_get, key)
+    if cached is not None:
+        _count("hits")
+        return cached
+
+    flight = _async_flights.get(key)
+    if flight is not None:
+        _count("local_waiters")
+        try:
+            return await asyncio.shield(flight)
+        except asyncio.CancelledError:
+            # Only the leader was cancelled (client gone, shutdown): retry, one waiter leading
+            if not flight.cancelled() or asyncio.current_task().cancelling():
+                raise
+        return await aget_or_compute(key, compute, ttl_seconds)
+
+    flight = asyncio.get_running_loop().create_future()
+    _async_flights[key] = flight
+    try:
+        result = await _acompute_as_leader(key, compute, ttl_seconds)
+        flight.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        flight.cancel()
+        raise
+    except BaseException as e:
+        flight.set_exception(e)
+        flight.exception()  # mark retrieved so an unwaited flight doesn't log a warning
+        raise
+    finally:
+        _async_flights.pop(key, None)
@@ -0,0 +1,143 @@
+"""
+Response compression: brotli, zstd or gzip, negotiated from Accept-Encoding, for text and
+JSON bodies of at least HTTP_COMPRESS_MIN_BYTES.
+
+Every body is compressed at a moderate level, cheap enough for the request path. Immutable
+responses (final sessions, see http_caching) are the same bytes for good, so their
+compressed variants are also cached by ETag and codec (namespace "encoded") and a hot
+endpoint compresses them once. A compressed response's ETag is sent weak, as nginx does: it still revalidates against
+the identity body's tag, and Vary: Accept-Encoding keeps shared caches apart.
+"""
+import asyncio
+import gzip
+import logging
+from typing import Callable, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from cache import cache_key, cache_get_bytes, cache_set_bytes
+from config import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+ENCODED_TTL_S = 86400  # the ETag index's lifetime for final responses (http_caching.FINAL_ETAG_TTL_S)
+
+
+def _brotli(level: int) -> Callable[[bytes], bytes]:
+    return lambda body: brotli.compress(body, quality=level, mode=brotli.MODE_TEXT)
+
+
+def _zstd(level: int) -> Callable[[bytes], bytes]:
+    # A compressor per call: they are not thread-safe, and compression runs in worker threads
+    return lambda body: zstandard.ZstdCompressor(level=level).compress(body)
+
+
+def _gzip(level: int) -> Callable[[bytes], bytes]:
+    return lambda body: gzip.compress(body, compresslevel=level, mtime=0)
+
+
+# Content-coding → compressor, in server preference order. Levels from
+# benchmarks/bench_compression.py: a few ms at most for a 120 KB body; the highest levels
+# shave a few more percent for 50-200 ms, more than sending the body uncompressed costs.
+CODECS: dict[str, Callable[[bytes], bytes]] = {}
+if brotli is not None:
+    CODECS["br"] = _brotli(5)
+if zstandard is not None:
+    CODECS["zstd"] = _zstd(3)
+CODECS["gzip"] = _gzip(6)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The acceptable codec with the highest q-value, ties going to CODECS order; None for identity."""
+    if not accept_encoding:
+        return None
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        offered[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for codec in CODECS:
+        q = offered.get(codec, offered.get("*", 0.0))
+        if q > best_q:
+            best, best_q = codec, q
+    return best
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+async def compress_body(body: bytes, encoding: str, etag: Optional[str], cache_control: str = "") -> bytes:
+    """Compressed body; for an immutable response with a strong ETag, the cached variant."""
+    compress = CODECS[encoding]
+    if not etag or etag.startswith("W/") or "immutable" not in cache_control:
+        return await asyncio.to_thread(compress, body)
+    key = cache_key("encoded", encoding, etag.strip('"'))
+    encoded = await asyncio.to_thread(cache_get_bytes, key)
+    if encoded is None:
+        encoded = await asyncio.to_thread(compress, body)
+        await asyncio.to_thread(cache_set_bytes, key, encoded, ENCODED_TTL_S)
+    return encoded
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing buffered text and JSON responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        start = None
+        chunks = []
+
+        async def compress_response(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if not _compressible(headers):
+                    start = False
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                start = message
+                return
+            if start is False or message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            if encoding is not None and len(body) >= settings.HTTP_COMPRESS_MIN_BYTES:
+                headers = MutableHeaders(scope=start)
+                etag = headers.get("etag")
+                body = await compress_body(body, encoding, etag, headers.get("cache-control", ""))
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compress_response)
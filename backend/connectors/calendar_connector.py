@@ -1,39 +1,35 @@
 import logging
-import httpx
-import time
-from typing import Optional
+from connectors.http_transport import BASE_URL, ConnectorError, fetch_json
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://api.jolpi.ca/ergast/f1"
-TIMEOUT = 15.0
-MAX_RETRIES = 3
-
-
-class ConnectorError(Exception):
-    pass
-
-
-def _fetch(url: str) -> dict:
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            with httpx.Client(timeout=TIMEOUT) as client:
-                resp = client.get(url)
-                resp.raise_for_status()
-                return resp.json()
-        except httpx.HTTPStatusError as e:
-            logger.warning(f"HTTP {e.response.status_code} attempt {attempt}: {url}")
-        except Exception as e:
-            logger.warning(f"Request error attempt {attempt}: {e}")
-        if attempt < MAX_RETRIES:
-            time.sleep(2 ** attempt)
-    raise ConnectorError(f"Failed to fetch {url}")
-
-
-def get_calendar(season: int) -> list[dict]:
+# Ergast schedule keys → API session codes (the race itself is the top-level date/time)
+SCHEDULE_SESSIONS = {
+    "FirstPractice":    "FP1",
+    "SecondPractice":   "FP2",
+    "ThirdPractice":    "FP3",
+    "SprintQualifying": "SQ",
+    "SprintShootout":   "SQ",
+    "Sprint":           "S",
+    "Qualifying":       "Q",
+}
+
+
+def _session_starts(race: dict) -> dict:
+    """Session code → "YYYY-MM-DDTHH:MM:SSZ" start (or bare date when no time is published)."""
+    starts = {}
+    for key, code in SCHEDULE_SESSIONS.items():
+        slot = race.get(key)
+        if isinstance(slot, dict) and slot.get("date"):
+            starts[code] = f"{slot['date']}T{slot['time']}" if slot.get("time") else slot["date"]
+    starts["R"] = f"{race['date']}T{race['time']}" if race.get("time") else race["date"]
+    return starts
+
+
+async def get_calendar(season: int) -> list[dict]:
     """Returns list of race dicts for the given season."""
     url = f"{BASE_URL}/{season}.json"
-    data = _fetch(url)
+    data = await fetch_json(url)
     try:
         races = data["MRData"]["RaceTable"]["Races"]
     except KeyError as e:
@@ -58,5 +54,6 @@ def get_calendar(season: int) -> list[dict]:
             "time": race.get("time"),
             "is_sprint": is_sprint,
             "sprint_date": sprint_date,
+            "sessions": _session_starts(race),
         })
     return result
@@ -1,113 +1,355 @@
 import logging
-import os
-import math
+import time
+from contextlib import nullcontext
+from datetime import date
 from typing import Optional
-from config import get_settings
+import numpy as np
+import pandas as pd
+from connectors.fastf1_disk_cache import drop_parsed_data, enable_fastf1_cache, loading, record_session
+from connectors.session_pool import session_pool
+from normalizers.telemetry_normalizer import (
+    extract_telemetry_columns, downsample_columns, columns_to_lists, columns_to_records,
+)
 
 logger = logging.getLogger(__name__)
-settings = get_settings()
 
 
-def _enable_cache():
+def get_session(season: int, round_num: int, session_type: str, telemetry: bool = False):
+    """
+    Load a FastF1 session, reusing an already-loaded copy from the session pool.
+    session_type: 'FP1','FP2','FP3','Q','SQ','S','R', or 'Testing'
+    Sessions are opened laps-only; telemetry=True (car and position data) upgrades the
+    pooled session in place the first time a caller needs it.
+    Returns a loaded FastF1 Session object or None on failure.
+    """
+    key = (season, round_num, session_type.upper())
+    session = session_pool.get(key, lambda: load_session(season, round_num, session_type, telemetry))
+    if session is None or not telemetry:
+        return session
+    upgraded = session_pool.upgrade(key, has_telemetry, _load_telemetry)
+    if upgraded is not None or session_pool.peek(key) is session:
+        return upgraded  # upgraded, or the pooled copy failed to upgrade
+    # Evicted since get() by other loads: upgrade the copy in hand, outside the pool
+    return session if has_telemetry(session) or _load_telemetry(session) else None
+
+
+def forget_session(season: int, round_num: int, session_type: str) -> None:
+    """
+    Drop a session's pooled copy and FastF1's parsed data, so the next get_session fetches
+    it again. FastF1's HTTP cache keeps responses for 12 hours at most, so a session that
+    ended longer ago than that is downloaded afresh.
+    """
+    session_pool.discard((season, round_num, session_type.upper()))
     try:
         import fastf1
-        cache_dir = settings.FASTF1_CACHE_DIR
-        os.makedirs(cache_dir, exist_ok=True)
-        fastf1.Cache.enable_cache(cache_dir)
+        enable_fastf1_cache()
+        drop_parsed_data(fastf1.get_session(season, round_num, session_type))
     except Exception as e:
-        logger.warning(f"FastF1 cache setup failed: {e}")
+        logger.warning(f"Could not drop cached data of {season} R{round_num} {session_type}: {e}")
 
 
-def get_session(season: int, round_num: int, session_type: str):
-    """
-    Load a FastF1 session.
-    session_type: 'FP1','FP2','FP3','Q','SQ','S','R', or 'Testing'
-    Returns a loaded FastF1 Session object or None on failure.
-    """
+def has_telemetry(session) -> bool:
+    try:
+        return bool(session.car_data)
+    except Exception:
+        return False  # FastF1 raises DataNotLoadedError until telemetry is loaded
+
+
+def load_session(season: int, round_num: int, session_type: str, telemetry: bool = False):
+    """Load a FastF1 session outside the pool (via the disk cache, whose index it updates). None on failure."""
     try:
         import fastf1
-        _enable_cache()
+        enable_fastf1_cache()
+        started = time.perf_counter()
         session = fastf1.get_session(season, round_num, session_type)
-        session.load(telemetry=True, weather=False, messages=False)
+        with loading(session):
+            session.load(laps=True, telemetry=telemetry, weather=False, messages=False)
+        logger.info(
+            f"Loaded {season} R{round_num} {session_type} ({'telemetry' if telemetry else 'laps'}) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        record_session(session, round_num)
         return session
     except Exception as e:
         logger.error(f"FastF1 get_session failed (season={season} round={round_num} type={session_type}): {e}")
         return None
 
 
-def get_laps(session) -> list[dict]:
+def _load_telemetry(session) -> bool:
+    """Upgrade a laps-only session to car and position data. FastF1 re-reads laps from its disk cache."""
+    try:
+        started = time.perf_counter()
+        with loading(session):
+            session.load(laps=True, telemetry=True, weather=False, messages=False)
+        logger.info(f"Loaded telemetry for {session} in {time.perf_counter() - started:.1f}s")
+        record_session(session)
+        return True
+    except Exception as e:
+        logger.error(f"FastF1 telemetry load failed for {session}: {e}")
+        return False
+
+
+# A testing day runs about nine hours from its scheduled start; an hour more for the data to settle
+TESTING_DAY_END_H = 10
+
+
+def testing_day_finished(session) -> bool:
+    """Whether a testing day has stopped running, TESTING_DAY_END_H after its scheduled start."""
+    start = pd.Timestamp(session.date)
+    if pd.isna(start):
+        return True  # no scheduled date: an old test
+    if start.tzinfo is not None:
+        start = start.tz_convert(None)
+    return start + pd.Timedelta(hours=TESTING_DAY_END_H) <= pd.Timestamp.now("UTC").tz_localize(None)
+
+
+def load_testing_session(season: int, test_number: int, day: int):
+    """
+    Load one pre-season testing day, laps only (no telemetry, weather or messages).
+    Not kept in the session pool: a finished day is summarized once and then never read
+    again. A day still running is loaded past FastF1's cache, which would otherwise keep
+    its partial data for good.
+    Returns a loaded FastF1 Session object or None on failure (e.g. the day has not run yet).
+    """
+    try:
+        import fastf1
+        enable_fastf1_cache()
+        session = fastf1.get_testing_session(season, test_number, day)
+        finished = testing_day_finished(session)
+        with loading(session), (nullcontext() if finished else fastf1.Cache.disabled()):
+            session.load(laps=True, telemetry=False, weather=False, messages=False)
+        if finished:
+            record_session(session)
+        return session
+    except Exception as e:
+        logger.error(f"FastF1 testing session failed (season={season} test={test_number} day={day}): {e}")
+        return None
+
+
+# Output key → FastF1 timedelta column, converted to float milliseconds
+_LAP_TIME_COLUMNS = {
+    "lap_time_ms": "LapTime",
+    "sector1_ms": "Sector1Time",
+    "sector2_ms": "Sector2Time",
+    "sector3_ms": "Sector3Time",
+}
+
+# Key order of the list-of-dicts contract returned by get_laps
+LAP_FIELDS = (
+    "driver_id", "lap_number", "lap_time_ms", "sector1_ms", "sector2_ms", "sector3_ms",
+    "compound", "stint", "is_personal_best", "track_status", "gap_to_leader_s", "gap_ahead_s",
+    "session_time_s", "team",
+)
+
+
+def _column(laps, name: str, default):
+    if name in laps.columns:
+        return laps[name]
+    return pd.Series([default] * len(laps), index=laps.index, dtype=object)
+
+
+def _timedelta_ms(laps, name: str) -> np.ndarray:
+    """Timedelta column → float64 milliseconds; NaT becomes NaN."""
+    if name not in laps.columns:
+        return np.full(len(laps), np.nan)
+    return pd.to_timedelta(laps[name]).dt.total_seconds().to_numpy(dtype=np.float64) * 1000
+
+
+def extract_laps_columnar(laps) -> dict[str, np.ndarray]:
+    """
+    Vectorized extraction of a FastF1 Laps frame into one numpy array per field.
+    Float fields use NaN for missing values; string fields are object arrays.
+    """
+    n = len(laps)
+    columns = {
+        "driver_id": _column(laps, "Driver", "").fillna("").astype(str).to_numpy(dtype=object),
+        "lap_number": pd.to_numeric(_column(laps, "LapNumber", 0)).fillna(0).to_numpy().astype(np.int64),
+    }
+    for key, name in _LAP_TIME_COLUMNS.items():
+        columns[key] = _timedelta_ms(laps, name)
+    columns["compound"] = _column(laps, "Compound", "").astype(str).to_numpy(dtype=object)
+    columns["stint"] = pd.to_numeric(_column(laps, "Stint", np.nan)).to_numpy(dtype=np.float64)
+    columns["is_personal_best"] = _column(laps, "IsPersonalBest", False).fillna(False).to_numpy().astype(bool)
+    columns["track_status"] = _column(laps, "TrackStatus", "").astype(str).to_numpy(dtype=object)
+    columns["gap_to_leader_s"] = np.full(n, np.nan)  # computed separately if needed
+    columns["gap_ahead_s"] = np.full(n, np.nan)
+    # Session clock when the lap was completed (Time); from the lap's start where Time is missing
+    end_ms = _timedelta_ms(laps, "Time")
+    start_ms = _timedelta_ms(laps, "LapStartTime") + columns["lap_time_ms"]
+    columns["session_time_s"] = np.where(np.isnan(end_ms), start_ms, end_ms) / 1000
+    columns["team"] = _column(laps, "Team", "").fillna("").astype(str).to_numpy(dtype=object)
+    return columns
+
+
+def _nan_to_none(values: np.ndarray) -> list:
+    """Float array → Python list with NaN replaced by None."""
+    out = values.astype(object)
+    out[np.isnan(values)] = None
+    return out.tolist()
+
+
+def laps_to_records(columns: dict[str, np.ndarray]) -> list[dict]:
+    """Convert columnar lap arrays into the list-of-dicts contract of get_laps."""
+    lists = []
+    for key in LAP_FIELDS:
+        values = columns[key]
+        if key == "stint":
+            stints = values.astype(object)
+            valid = ~np.isnan(values)
+            stints[valid] = values[valid].astype(np.int64)
+            stints[~valid] = None
+            lists.append(stints.tolist())
+        elif values.dtype.kind == "f":
+            lists.append(_nan_to_none(values))
+        else:
+            lists.append(values.tolist())
+    return [dict(zip(LAP_FIELDS, row)) for row in zip(*lists)]
+
+
+def get_laps(session, columnar: bool = False):
     """
     Extract lap data from a loaded FastF1 session.
-    Returns a list of dicts (one per lap).
+    Returns a list of dicts (one per lap), or with columnar=True a dict of
+    numpy arrays keyed like the lap dicts (NaN for missing floats).
     """
     if session is None:
-        return []
+        return {} if columnar else []
     try:
-        laps = session.laps
-        result = []
-        for _, row in laps.iterrows():
-            def ms_or_none(td):
-                try:
-                    return td.total_seconds() * 1000
-                except Exception:
-                    return None
-
-            result.append({
-                "driver_id": row.get("Driver", ""),
-                "lap_number": int(row.get("LapNumber", 0)),
-                "lap_time_ms": ms_or_none(row.get("LapTime")),
-                "sector1_ms": ms_or_none(row.get("Sector1Time")),
-                "sector2_ms": ms_or_none(row.get("Sector2Time")),
-                "sector3_ms": ms_or_none(row.get("Sector3Time")),
-                "compound": str(row.get("Compound", "")),
-                "stint": int(row.get("Stint", 0)) if not _is_nan(row.get("Stint")) else None,
-                "is_personal_best": bool(row.get("IsPersonalBest", False)),
-                "track_status": str(row.get("TrackStatus", "")),
-                "gap_to_leader_s": None,  # computed separately if needed
-                "gap_ahead_s": None,
-            })
-        return result
+        columns = extract_laps_columnar(session.laps)
+        return columns if columnar else laps_to_records(columns)
     except Exception as e:
         logger.error(f"get_laps failed: {e}")
-        return []
+        return {} if columnar else []
 
 
-def get_telemetry(session, driver_code: str, lap_number: Optional[int] = None) -> list[dict]:
+def get_session_drivers(session, codes) -> list[dict]:
     """
-    Extract telemetry for a specific driver from a loaded session.
-    If lap_number is None, returns fastest lap telemetry.
-    Returns list of dicts (one per telemetry sample).
+    Driver rows for a session from its FastF1 results table (Ergast driver ids).
+    Codes without a results entry fall back to the code itself as id.
     """
-    if session is None:
-        return []
+    drivers = {}
     try:
-        driver_laps = session.laps.pick_drivers(driver_code)
-        if lap_number is not None:
-            lap = driver_laps[driver_laps["LapNumber"] == lap_number].iloc[0]
-        else:
-            lap = driver_laps.pick_fastest()
-        tel = lap.get_telemetry()
-        result = []
-        for _, row in tel.iterrows():
-            result.append({
-                "distance": float(row.get("Distance", 0)),
-                "speed": float(row.get("Speed", 0)),
-                "throttle": float(row.get("Throttle", 0)),
-                "brake": float(row.get("Brake", 0)),
-                "gear": int(row.get("nGear", 0)),
-                "rpm": int(row.get("RPM", 0)),
-                "drs": int(row.get("DRS", 0)),
-                "x": float(row.get("X", 0)),
-                "y": float(row.get("Y", 0)),
-            })
-        return result
+        for _, r in session.results.iterrows():  # ~20 rows
+            code = str(r.get("Abbreviation") or "")
+            if code:
+                drivers[code] = {
+                    "id": str(r.get("DriverId") or code),
+                    "code": code,
+                    "full_name": str(r.get("FullName") or code),
+                    "team_id": str(r.get("TeamId") or "") or None,
+                    "team_name": str(r.get("TeamName") or ""),
+                }
     except Exception as e:
-        logger.error(f"get_telemetry failed for {driver_code}: {e}")
-        return []
+        logger.warning(f"Session results unavailable for driver mapping: {e}")
+    for code in codes:
+        if code and code not in drivers:
+            drivers[code] = {"id": code, "code": code, "full_name": code, "team_id": None}
+    return list(drivers.values())
 
 
-def _is_nan(val) -> bool:
+def get_event_details(session) -> tuple[str, Optional[date]]:
+    """(event name, session date) of a loaded session; ("", None) when unknown."""
     try:
-        return math.isnan(float(val))
+        name = str(session.event["EventName"])
     except Exception:
-        return True
+        name = ""
+    try:
+        session_date = pd.Timestamp(session.date).date()
+    except Exception:
+        session_date = None
+    return name, session_date
+
+
+def extract_session_laps(session, columns: Optional[dict[str, np.ndarray]] = None) -> dict:
+    """
+    Everything lap ingestion needs from a loaded session, as plain picklable data:
+    {columns (get_laps columnar output), drivers, event_name, session_date}.
+    """
+    if columns is None:
+        columns = get_laps(session, columnar=True)
+    codes = set(columns["driver_id"].tolist()) if columns else set()
+    event_name, session_date = get_event_details(session)
+    return {
+        "columns": columns,
+        "drivers": get_session_drivers(session, codes),
+        "event_name": event_name,
+        "session_date": session_date,
+    }
+
+
+def _pick_lap(session, driver_code: str, lap_number: Optional[int]):
+    driver_laps = session.laps.pick_drivers(driver_code)
+    if lap_number is not None:
+        return driver_laps[driver_laps["LapNumber"] == lap_number].iloc[0]
+    return driver_laps.pick_fastest()
+
+
+def get_lap_telemetry(
+    session,
+    driver_code: str,
+    lap_number: Optional[int] = None,
+) -> tuple[Optional[int], dict[str, np.ndarray]]:
+    """
+    Full-resolution telemetry channels for one driver lap, with the lap number actually
+    picked (the fastest lap when lap_number is None). Returns (None, {}) on failure.
+    """
+    if session is None:
+        return None, {}
+    try:
+        lap = _pick_lap(session, driver_code, lap_number)
+        return int(lap["LapNumber"]), extract_telemetry_columns(lap.get_telemetry())
+    except Exception as e:
+        logger.error(f"get_telemetry failed for {driver_code}: {e}")
+        return None, {}
+
+
+def get_session_telemetry(session):
+    """
+    Yield (driver_code, lap_number, channels) for every lap with telemetry.
+    One telemetry merge per lap, so this takes a while; meant for background ingestion.
+    """
+    for _, lap in session.laps.iterlaps():
+        try:
+            columns = extract_telemetry_columns(lap.get_telemetry())
+        except Exception as e:
+            logger.warning(f"No telemetry for {lap.get('Driver')} lap {lap.get('LapNumber')}: {e}")
+            continue
+        if len(columns["distance"]):
+            yield str(lap["Driver"]), int(lap["LapNumber"]), columns
+
+
+def get_telemetry_columns(
+    session,
+    driver_code: str,
+    lap_number: Optional[int] = None,
+    points: Optional[int] = None,
+) -> dict[str, np.ndarray]:
+    """
+    Vectorized telemetry extraction for one driver lap: one numpy array per channel.
+    If lap_number is None, uses the fastest lap. If points is given, the lap is
+    downsampled to that many samples (LTTB on the speed trace).
+    Returns {} on failure.
+    """
+    _, columns = get_lap_telemetry(session, driver_code, lap_number)
+    if columns and points:
+        columns = downsample_columns(columns, points)
+    return columns
+
+
+def get_telemetry(
+    session,
+    driver_code: str,
+    lap_number: Optional[int] = None,
+    columnar: bool = False,
+    points: Optional[int] = None,
+):
+    """
+    Extract telemetry for a specific driver from a loaded session.
+    If lap_number is None, returns fastest lap telemetry.
+    Returns list of dicts (one per telemetry sample), or with columnar=True
+    a dict of lists (one per channel). Empty on failure.
+    """
+    columns = get_telemetry_columns(session, driver_code, lap_number, points)
+    if not columns:
+        return {} if columnar else []
+    return columns_to_lists(columns) if columnar else columns_to_records(columns)
@@ -0,0 +1,414 @@
+"""
+Managed FastF1 disk cache.
+FastF1 stores each session's parsed timing data under FASTF1_CACHE_DIR/<season>/<event>/<session>/.
+This module enables that cache once per process, keeps an index of those session directories
+(size, last access) in index.json beside them, and keeps the directory within
+FASTF1_CACHE_MAX_MB. FastF1's HTTP request cache (fastf1_http_cache.sqlite) counts against
+the budget too and gives way first (expired responses, then those expiring soonest), since
+parsed sessions no longer need it; then least-recently-used sessions are evicted. Sessions
+being loaded, in any process, are marked in loading/ and never evicted. Loader workers
+share the index through a lock file.
+
+    python -m connectors.fastf1_disk_cache warm --season 2025 [--workers 2] [--telemetry]
+    python -m connectors.fastf1_disk_cache index [--rescan]
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, suppress
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+HTTP_CACHE_FILE = "fastf1_http_cache.sqlite"
+LOADING_DIR = "loading"
+LOADING_STALE_S = 3600  # a marker this old was left by a crashed load
+
+# FastF1 schedule session names → API session codes
+SESSION_CODES = {
+    "Practice 1": "FP1", "Practice 2": "FP2", "Practice 3": "FP3", "Qualifying": "Q",
+    "Sprint Qualifying": "SQ", "Sprint Shootout": "SQ", "Sprint": "S", "Race": "R",
+}
+
+_enabled = False
+_lock = threading.Lock()
+
+
+def cache_dir() -> str:
+    return os.path.abspath(os.path.expanduser(settings.FASTF1_CACHE_DIR))
+
+
+def enable_fastf1_cache() -> bool:
+    """
+    Point FastF1 at FASTF1_CACHE_DIR, once per process (each loader worker is its own
+    process and enables it from its initializer). Returns whether the cache is enabled.
+    """
+    global _enabled
+    with _lock:
+        if not _enabled:
+            try:
+                import fastf1
+                os.makedirs(cache_dir(), exist_ok=True)
+                fastf1.Cache.enable_cache(cache_dir())
+                _enabled = True
+            except Exception as e:
+                logger.warning(f"FastF1 cache setup failed: {e}")
+        return _enabled
+
+
+# ─── Index ───────────────────────────────────────────────────────────────────
+
+def _now() -> str:
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat(timespec="milliseconds")
+
+
+@contextmanager
+def _index_lock(root: str):
+    """Exclusive across threads and processes (API process and loader workers)."""
+    os.makedirs(root, exist_ok=True)
+    with _lock, open(os.path.join(root, LOCK_FILE), "a+") as f:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_index(root: str) -> dict:
+    try:
+        with open(os.path.join(root, INDEX_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_index(root: str, index: dict) -> None:
+    path = os.path.join(root, INDEX_FILE)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _dir_bytes(path: str) -> int:
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass  # removed while walking
+    return total
+
+
+def _describe(rel: str) -> dict:
+    """Season, event and session names from a "2024/2024-03-02_Bahrain_Grand_Prix/2024-03-02_Race" path."""
+    season, event, session = rel.split("/")
+    return {
+        "season": int(season),
+        "event": event.split("_", 1)[-1].replace("_", " "),
+        "session": session.split("_", 1)[-1].replace("_", " "),
+    }
+
+
+def _session_dirs(root: str) -> list[str]:
+    """Relative paths of every <season>/<event>/<session> directory in the cache."""
+    found = []
+    for season in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+        season_path = os.path.join(root, season)
+        if not season.isdigit() or not os.path.isdir(season_path):
+            continue
+        for event in sorted(os.listdir(season_path)):
+            event_path = os.path.join(season_path, event)
+            if os.path.isdir(event_path):
+                found.extend(
+                    f"{season}/{event}/{session}"
+                    for session in sorted(os.listdir(event_path))
+                    if os.path.isdir(os.path.join(event_path, session))
+                )
+    return found
+
+
+def _file_bytes(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _session_rel(session) -> str:
+    """A session's directory relative to the cache root, from its API path."""
+    return session.api_path.strip("/").split("/", 1)[1]  # drop the leading "static/"
+
+
+@contextmanager
+def loading(session):
+    """Mark a session as being loaded by this thread, so no process evicts its directory meanwhile."""
+    marker = None
+    try:
+        markers = os.path.join(cache_dir(), LOADING_DIR)
+        os.makedirs(markers, exist_ok=True)
+        marker = os.path.join(
+            markers, f"{_session_rel(session).replace('/', '__')}.{os.getpid()}.{threading.get_ident()}"
+        )
+        open(marker, "w").close()
+    except Exception as e:
+        logger.warning(f"Could not mark {session} as loading: {e}")
+    try:
+        yield
+    finally:
+        if marker is not None:
+            with suppress(OSError):
+                os.remove(marker)
+
+
+def _loading_sessions(root: str) -> set[str]:
+    """Relative paths of sessions some process is loading now; stale markers are removed."""
+    busy = set()
+    markers = os.path.join(root, LOADING_DIR)
+    cutoff = time.time() - LOADING_STALE_S
+    for name in os.listdir(markers) if os.path.isdir(markers) else []:
+        path = os.path.join(markers, name)
+        if os.path.getmtime(path) < cutoff:
+            with suppress(OSError):
+                os.remove(path)
+            continue
+        busy.add(name.rsplit(".", 2)[0].replace("__", "/"))
+    return busy
+
+
+def _trim_http_cache(root: str, max_bytes: int) -> int:
+    """
+    Shrink FastF1's HTTP cache to max_bytes: expired responses first, then those expiring
+    soonest. SQLite locking makes this safe while FastF1 uses the file. Returns its size.
+    """
+    path = os.path.join(root, HTTP_CACHE_FILE)
+    size = before = _file_bytes(path)
+    if size <= max_bytes:
+        return size
+    try:
+        from requests_cache.backends.sqlite import SQLiteCache
+        cache = SQLiteCache(path)
+        try:
+            cache.delete(expired=True)
+            size = _file_bytes(path)
+            if size > max_bytes:
+                count = len(cache.responses)
+                drop = math.ceil(count * (1 - max_bytes / size))
+                cache.delete(*(response.cache_key for response in cache.sorted(key="expires", limit=drop)))
+        finally:
+            cache.close()
+    except Exception as e:
+        logger.warning(f"FastF1 HTTP cache trim failed: {e}")
+    trimmed = _file_bytes(path)
+    logger.info(f"FastF1 HTTP cache trimmed from {before / 1048576:.1f} MB to {trimmed / 1048576:.1f} MB")
+    return trimmed
+
+
+def _evict_locked(root: str, index: dict, keep: Optional[str] = None) -> list[str]:
+    """
+    Fit sessions plus the HTTP cache into the budget: trim the HTTP cache, then remove
+    least-recently-used session directories, never keep or one being loaded.
+    """
+    budget = settings.FASTF1_CACHE_MAX_MB * 1024 * 1024
+    total = sum(entry["bytes"] for entry in index.values())
+    if total + _file_bytes(os.path.join(root, HTTP_CACHE_FILE)) > budget:
+        total += _trim_http_cache(root, max(0, budget - total))
+    busy = _loading_sessions(root)
+    evicted = []
+    for rel, entry in sorted(index.items(), key=lambda item: item[1]["last_access"]):
+        if total <= budget:
+            break
+        if rel == keep or rel in busy:
+            continue
+        path = os.path.join(root, rel)
+        shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.rmdir(os.path.dirname(path))  # the event directory, once its last session is gone
+        except OSError:
+            pass
+        total -= entry["bytes"]
+        del index[rel]
+        evicted.append(rel)
+        logger.info(f"FastF1 cache evicted {rel} ({entry['bytes'] / 1048576:.1f} MB)")
+    return evicted
+
+
+def record_session(session, round_num: Optional[int] = None) -> None:
+    """
+    Note a loaded session in the index (size now, last access now) and evict down to the
+    budget, never evicting this session. Failures are logged, not raised.
+    """
+    try:
+        rel = _session_rel(session)
+        root = cache_dir()
+        path = os.path.join(root, rel)
+        if not os.path.isdir(path):
+            return  # cache not enabled, or nothing written
+        with _index_lock(root):
+            index = _read_index(root)
+            previous = index.get(rel, {})
+            index[rel] = {
+                **_describe(rel),
+                "round": round_num if round_num is not None else previous.get("round"),
+                "bytes": _dir_bytes(path),
+                "last_access": _now(),
+            }
+            _evict_locked(root, index, keep=rel)
+            _write_index(root, index)
+    except Exception as e:
+        logger.warning(f"FastF1 cache index update failed: {e}")
+
+
+def drop_parsed_data(session) -> int:
+    """
+    Delete FastF1's parsed-data files (*.ff1pkl) of a session, which FastF1 would otherwise
+    reuse forever, so its next load parses the data again. Returns files removed.
+    """
+    path = os.path.join(cache_dir(), _session_rel(session))
+    removed = 0
+    for name in os.listdir(path) if os.path.isdir(path) else []:
+        if name.endswith(".ff1pkl"):
+            with suppress(OSError):
+                os.remove(os.path.join(path, name))
+                removed += 1
+    return removed
+
+
+def scan_index() -> dict:
+    """
+    Rebuild the index from the directory tree: sizes re-measured, directories the index
+    did not know about added (last access = directory mtime), vanished ones dropped.
+    Evicts down to the budget. Returns the index.
+    """
+    root = cache_dir()
+    with _index_lock(root):
+        old = _read_index(root)
+        index = {}
+        for rel in _session_dirs(root):
+            path = os.path.join(root, rel)
+            entry = old.get(rel) or {
+                **_describe(rel),
+                "round": None,
+                "last_access": datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+                .replace(tzinfo=None).isoformat(timespec="milliseconds"),
+            }
+            index[rel] = {**entry, "bytes": _dir_bytes(path)}
+        _evict_locked(root, index)
+        _write_index(root, index)
+    return index
+
+
+def cache_index(rescan: bool = False) -> dict:
+    """
+    Index summary for the admin endpoints: totals, budget and sessions, most recently used
+    first. rescan=True rebuilds the index, evicting down to the budget.
+    """
+    root = cache_dir()
+    index = scan_index() if rescan else _read_index(root)
+    return {
+        "enabled": _enabled,
+        "max_mb": settings.FASTF1_CACHE_MAX_MB,
+        "sessions_mb": round(sum(entry["bytes"] for entry in index.values()) / 1048576, 1),
+        "http_cache_mb": round(_file_bytes(os.path.join(root, HTTP_CACHE_FILE)) / 1048576, 1),
+        "sessions": sorted(
+            ({"path": rel, **entry} for rel, entry in index.items()),
+            key=lambda entry: entry["last_access"],
+            reverse=True,
+        ),
+    }
+
+
+# ─── Warm-up ─────────────────────────────────────────────────────────────────
+
+def finished_season_sessions(season: int, session_types: Optional[list[str]] = None) -> list[tuple[int, str]]:
+    """(round, session code) of a season's sessions that finished at least two hours ago, from FastF1's schedule."""
+    import fastf1
+    enable_fastf1_cache()
+    schedule = fastf1.get_event_schedule(season, include_testing=False)
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=2)
+    sessions = []
+    for _, event in schedule.iterrows():
+        for n in range(1, 6):
+            code = SESSION_CODES.get(str(event.get(f"Session{n}") or ""))
+            starts = event.get(f"Session{n}DateUtc")
+            if code is None or starts is None or starts != starts or starts > cutoff:
+                continue
+            if session_types is None or code in session_types:
+                sessions.append((int(event["RoundNumber"]), code))
+    return sessions
+
+
+def _warm_session(season: int, round_num: int, session_type: str, telemetry: bool) -> tuple[bool, float]:
+    """Load one session so FastF1 writes it to the disk cache (runs in a warm-up process)."""
+    from connectors.fastf1_connector import load_session
+    started = time.perf_counter()
+    return load_session(season, round_num, session_type, telemetry) is not None, time.perf_counter() - started
+
+
+def warm_season(season: int, workers: int = 2, telemetry: bool = False, session_types: Optional[list[str]] = None) -> int:
+    """
+    Populate the disk cache with a season's finished sessions, `workers` loads at a time.
+    FastF1's API is rate limited, so a few workers is the useful maximum. Returns sessions cached.
+    """
+    import multiprocessing
+    targets = finished_season_sessions(season, session_types)
+    logger.info(f"Warming {len(targets)} sessions of {season} with {workers} workers")
+    cached = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {
+            pool.submit(_warm_session, season, round_num, session_type, telemetry): (round_num, session_type)
+            for round_num, session_type in targets
+        }
+        for future in as_completed(futures):
+            round_num, session_type = futures[future]
+            try:
+                ok, seconds = future.result()
+            except Exception as e:
+                ok, seconds = False, 0.0
+                logger.warning(f"Warm-up of {season} R{round_num} {session_type} failed: {e}")
+            cached += ok
+            logger.info(f"{season} R{round_num} {session_type}: {'cached' if ok else 'unavailable'} in {seconds:.1f}s")
+    return cached
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the FastF1 disk cache.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    warm = commands.add_parser("warm", help="pre-populate the cache with a season's finished sessions")
+    warm.add_argument("--season", type=int, required=True)
+    warm.add_argument("--workers", type=int, default=2)
+    warm.add_argument("--telemetry", action="store_true", help="also cache car and position data")
+    warm.add_argument("--sessions", help="comma-separated session codes, e.g. Q,R (default: all)")
+    show = commands.add_parser("index", help="print the cache index")
+    show.add_argument("--rescan", action="store_true", help="rebuild the index from the directory tree first")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.command == "warm":
+        codes = [code.strip().upper() for code in args.sessions.split(",")] if args.sessions else None
+        print(f"Cached {warm_season(args.season, args.workers, args.telemetry, codes)} sessions")
+    else:
+        summary = cache_index(args.rescan)
+        print(f"{cache_dir()}: {summary['sessions_mb']} MB in {len(summary['sessions'])} sessions "
+              f"(budget {summary['max_mb']} MB), HTTP cache {summary['http_cache_mb']} MB")
+        for entry in summary["sessions"]:
+            print(f"  {entry['last_access']}  {entry['bytes'] / 1048576:8.1f} MB  {entry['path']}")
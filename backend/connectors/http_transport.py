@@ -0,0 +1,117 @@
+"""
+Shared async HTTP transport for the Jolpica/Ergast connectors.
+One pooled keep-alive httpx.AsyncClient per event loop (HTTP/2 when the h2 package
+is installed), jittered exponential backoff and a cap on concurrent upstream requests.
+"""
+import asyncio
+import importlib.util
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+import httpx
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://api.jolpi.ca/ergast/f1"
+TIMEOUT = 15.0
+MAX_RETRIES = 3
+BACKOFF_BASE_S = 1.0
+MAX_CONCURRENCY = 8
+MAX_CONNECTIONS = 20
+
+# Client errors worth retrying; any other 4xx is final (e.g. 404 for a future round)
+_RETRYABLE_4XX = {408, 425, 429}
+
+
+class ConnectorError(Exception):
+    pass
+
+
+_client: Optional[httpx.AsyncClient] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_transport: Optional[httpx.AsyncBaseTransport] = None
+
+# url → in-flight/completed fetch task, shared by every coroutine in one dedupe_requests() scope
+_request_memo: ContextVar[Optional[dict]] = ContextVar("_request_memo", default=None)
+
+
+def set_transport(transport: Optional[httpx.AsyncBaseTransport]) -> None:
+    """Route all connector traffic through a custom transport (e.g. httpx.MockTransport in tests)."""
+    global _transport, _client
+    _transport = transport
+    _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Pooled client bound to the running event loop; rebuilt if the loop changes."""
+    global _client, _semaphore, _loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _loop is not loop or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=TIMEOUT,
+            http2=_transport is None and importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+            transport=_transport,
+        )
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        _loop = loop
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _backoff_s(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform in [0, base * 2^attempt]."""
+    return random.uniform(0, BACKOFF_BASE_S * 2 ** attempt)
+
+
+@contextmanager
+def dedupe_requests():
+    """
+    Within this scope (including tasks spawned from it), identical URLs are
+    fetched once and the parsed JSON is shared. Callers must not mutate it.
+    """
+    token = _request_memo.set({})
+    try:
+        yield
+    finally:
+        _request_memo.reset(token)
+
+
+async def fetch_json(url: str) -> dict:
+    """GET a URL and return parsed JSON, retrying transient failures. Raises ConnectorError."""
+    memo = _request_memo.get()
+    if memo is None:
+        return await _fetch_json(url)
+    task = memo.get(url)
+    if task is None:
+        task = memo[url] = asyncio.ensure_future(_fetch_json(url))
+    return await asyncio.shield(task)
+
+
+async def _fetch_json(url: str) -> dict:
+    client = get_client()
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            async with _semaphore:
+                resp = await client.get(url)
+            resp.raise_for_status()
+            return resp.json()
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            logger.warning(f"HTTP {status} attempt {attempt}: {url}")
+            if 400 <= status < 500 and status not in _RETRYABLE_4XX:
+                break
+        except Exception as e:
+            logger.warning(f"Request error attempt {attempt}: {e}")
+        if attempt < MAX_RETRIES:
+            await asyncio.sleep(_backoff_s(attempt))
+    raise ConnectorError(f"Failed to fetch {url}")
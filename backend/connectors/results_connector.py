@@ -1,33 +1,8 @@
 import logging
-import httpx
-import time
+from connectors.http_transport import BASE_URL, ConnectorError, fetch_json
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://api.jolpi.ca/ergast/f1"
-TIMEOUT = 15.0
-MAX_RETRIES = 3
-
-
-class ConnectorError(Exception):
-    pass
-
-
-def _fetch(url: str) -> dict:
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            with httpx.Client(timeout=TIMEOUT) as client:
-                resp = client.get(url)
-                resp.raise_for_status()
-                return resp.json()
-        except httpx.HTTPStatusError as e:
-            logger.warning(f"HTTP {e.response.status_code} attempt {attempt}: {url}")
-        except Exception as e:
-            logger.warning(f"Request error attempt {attempt}: {e}")
-        if attempt < MAX_RETRIES:
-            time.sleep(2 ** attempt)
-    raise ConnectorError(f"Failed to fetch {url}")
-
 
 def _parse_driver(d: dict) -> dict:
     return {
@@ -46,9 +21,9 @@ def _parse_constructor(c: dict) -> dict:
     }
 
 
-def get_race_results(season: int, round_num: int) -> list[dict]:
+async def get_race_results(season: int, round_num: int) -> list[dict]:
     url = f"{BASE_URL}/{season}/{round_num}/results.json"
-    data = _fetch(url)
+    data = await fetch_json(url)
     try:
         races = data["MRData"]["RaceTable"]["Races"]
         if not races:
@@ -75,11 +50,11 @@ def get_race_results(season: int, round_num: int) -> list[dict]:
     ]
 
 
-def get_race_info(season: int, round_num: int) -> dict:
+async def get_race_info(season: int, round_num: int) -> dict:
     """Fetch race name, circuit, and date — used for page header."""
     url = f"{BASE_URL}/{season}/{round_num}/results.json"
     try:
-        data = _fetch(url)
+        data = await fetch_json(url)
         races = data["MRData"]["RaceTable"]["Races"]
         if not races:
             return {}
@@ -95,10 +70,10 @@ def get_race_info(season: int, round_num: int) -> dict:
         return {}
 
 
-def get_sprint_results(season: int, round_num: int) -> list[dict]:
+async def get_sprint_results(season: int, round_num: int) -> list[dict]:
     url = f"{BASE_URL}/{season}/{round_num}/sprint.json"
     try:
-        data = _fetch(url)
+        data = await fetch_json(url)
         races = data["MRData"]["RaceTable"]["Races"]
         if not races:
             return []
@@ -122,10 +97,10 @@ def get_sprint_results(season: int, round_num: int) -> list[dict]:
     ]
 
 
-def get_qualifying_results(season: int, round_num: int) -> list[dict]:
+async def get_qualifying_results(season: int, round_num: int) -> list[dict]:
     url = f"{BASE_URL}/{season}/{round_num}/qualifying.json"
     try:
-        data = _fetch(url)
+        data = await fetch_json(url)
         races = data["MRData"]["RaceTable"]["Races"]
         if not races:
             return []
@@ -160,10 +135,10 @@ def get_qualifying_results(season: int, round_num: int) -> list[dict]:
     return output
 
 
-def get_pit_stops(season: int, round_num: int) -> list[dict]:
+async def get_pit_stops(season: int, round_num: int) -> list[dict]:
     url = f"{BASE_URL}/{season}/{round_num}/pitstops.json"
     try:
-        data = _fetch(url)
+        data = await fetch_json(url)
         races = data["MRData"]["RaceTable"]["Races"]
         if not races:
             return []
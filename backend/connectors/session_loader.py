@@ -0,0 +1,236 @@
+"""
+Process-pool loader for FastF1 sessions.
+Loading a session and extracting laps/telemetry are CPU-heavy and hold the GIL, so they
+run in worker processes; the API process only receives parsed numpy arrays or encoded
+lap blobs (pickled).
+Each worker keeps its own session pool, and a session is always routed to the same worker
+so it stays loaded there: laps-only for lap jobs, upgraded in place by the first telemetry
+job. Pending jobs are bounded: once the queue is full new loads are
+rejected with LoaderBusy (served as 503) instead of piling up behind slow loads.
+"""
+import logging
+import math
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Hashable, Optional
+from config import get_settings
+from analytics.testing import summarize_testing_day
+from connectors.fastf1_connector import (
+    forget_session, get_session, get_laps, get_lap_telemetry, get_session_telemetry, extract_session_laps,
+    load_testing_session, testing_day_finished,
+)
+from connectors.fastf1_disk_cache import enable_fastf1_cache
+from connectors.session_pool import session_pool
+from normalizers.telemetry_codec import encode_lap_blob
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class LoaderBusy(Exception):
+    pass
+
+
+# ─── Jobs (run inside a worker process, or inline when workers == 0) ────────
+
+def _init_worker(max_sessions: int, max_bytes: int) -> None:
+    session_pool.max_sessions = max_sessions
+    session_pool.max_bytes = max_bytes
+    enable_fastf1_cache()
+
+
+def load_session_laps(season: int, round_num: int, session_type: str, fresh: bool = False) -> Optional[dict]:
+    """
+    extract_session_laps output for a session, or None if it cannot be loaded.
+    fresh: reload it from FastF1 rather than the pool or FastF1's parsed data (forget_session).
+    """
+    if fresh:
+        forget_session(season, round_num, session_type)
+    session = get_session(season, round_num, session_type)
+    if session is None:
+        return None
+    return extract_session_laps(session)
+
+
+def load_laps_telemetry(
+    season: int,
+    round_num: int,
+    session_type: str,
+    laps: tuple[tuple[str, Optional[int]], ...],
+) -> Optional[list[dict]]:
+    """
+    Driver laps at full resolution, already in stored form — one
+    {lap_number, samples, blob (encode_lap_blob)} per requested (driver_code, lap_number),
+    with lap_number/blob None when that lap has no telemetry. None if the session cannot be loaded.
+    """
+    session = get_session(season, round_num, session_type, telemetry=True)
+    if session is None:
+        return None
+    out = []
+    for driver_code, lap_number in laps:
+        picked, columns = get_lap_telemetry(session, driver_code, lap_number)
+        if columns:
+            out.append({"lap_number": picked, "samples": len(columns["distance"]), "blob": encode_lap_blob(columns)})
+        else:
+            out.append({"lap_number": None, "samples": 0, "blob": None})
+    return out
+
+
+def load_session_telemetry(season: int, round_num: int, session_type: str) -> Optional[list[tuple]]:
+    """Every lap's telemetry as (driver_code, lap_number, samples, blob), or None if the session cannot be loaded."""
+    session = get_session(season, round_num, session_type, telemetry=True)
+    if session is None:
+        return None
+    return [
+        (code, lap_number, len(columns["distance"]), encode_lap_blob(columns))
+        for code, lap_number, columns in get_session_telemetry(session)
+    ]
+
+
+def load_testing_day(season: int, test_number: int, day: int) -> Optional[tuple[dict, bool]]:
+    """
+    (summarize_testing_day, whether the day has finished running) of one testing day, or
+    None if the day cannot be loaded or has no laps. Only the summary leaves the worker;
+    the day's laps are dropped with the session.
+    """
+    session = load_testing_session(season, test_number, day)
+    laps = get_laps(session)
+    if not laps:
+        return None
+    return summarize_testing_day(laps), testing_day_finished(session)
+
+
+# ─── Dispatcher (API process) ───────────────────────────────────────────────
+
+class SessionLoader:
+    """
+    Runs jobs on `workers` single-process executors; a job's affinity key picks the
+    executor. At most workers + max_pending distinct jobs may be queued or running;
+    identical concurrent jobs share one result.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executors: list[Optional[ProcessPoolExecutor]] = [None] * max(workers, 0)
+        self._inflight: dict = {}
+        self._lock = threading.RLock()
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.failures = 0
+        self.restarts = 0
+
+    def _executor(self, slot: int) -> ProcessPoolExecutor:
+        executor = self._executors[slot]
+        if executor is None:
+            # spawn, not fork: the API process has live threads and sockets
+            executor = self._executors[slot] = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(
+                    max(1, math.ceil(settings.SESSION_POOL_MAX_SESSIONS / self.workers)),
+                    settings.SESSION_POOL_MAX_MB * 1024 * 1024 // self.workers,
+                ),
+            )
+        return executor
+
+    def run(self, fn: Callable, *args, affinity: Hashable = None) -> Any:
+        """
+        Run fn(*args) in a worker and block until it returns. fn must be a picklable
+        module-level function. Raises LoaderBusy when the queue is full.
+        """
+        if self.workers <= 0:
+            return fn(*args)
+
+        key = (fn.__module__, fn.__qualname__, args)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                if len(self._inflight) >= self.workers + self.max_pending:
+                    self.rejected += 1
+                    raise LoaderBusy(f"Session loader queue full ({len(self._inflight)} jobs pending)")
+                slot = hash(affinity if affinity is not None else args) % self.workers
+                future = self._executor(slot).submit(fn, *args)
+                self._inflight[key] = future
+                self.submitted += 1
+                future.add_done_callback(lambda f, key=key, slot=slot: self._done(key, slot, f))
+        return future.result()
+
+    def _done(self, key, slot: int, future: Future) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            error = future.exception() if not future.cancelled() else None
+            if error is None:
+                return
+            self.failures += 1
+            if isinstance(error, BrokenProcessPool) and self._executors[slot] is not None:
+                # Worker died (e.g. OOM-killed mid-load); start a fresh one on next use
+                logger.error(f"Session loader worker {slot} died: {error}")
+                self._executors[slot].shutdown(wait=False, cancel_futures=True)
+                self._executors[slot] = None
+                self.restarts += 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            for slot, executor in enumerate(self._executors):
+                if executor is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self._executors[slot] = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": sum(e is not None for e in self._executors),
+                "pending": len(self._inflight),
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "failures": self.failures,
+                "restarts": self.restarts,
+            }
+
+
+session_loader = SessionLoader(
+    workers=settings.SESSION_LOADER_WORKERS,
+    max_pending=settings.SESSION_LOADER_MAX_PENDING,
+)
+
+
+def fetch_session_laps(season: int, round_num: int, session_type: str, fresh: bool = False) -> Optional[dict]:
+    session_type = session_type.upper()
+    return session_loader.run(
+        load_session_laps, season, round_num, session_type, fresh, affinity=(season, round_num, session_type)
+    )
+
+
+def fetch_laps_telemetry(
+    season: int,
+    round_num: int,
+    session_type: str,
+    laps: list[tuple[str, Optional[int]]],
+) -> Optional[list[dict]]:
+    """load_laps_telemetry for several driver laps in one job, against one session load."""
+    session_type = session_type.upper()
+    return session_loader.run(
+        load_laps_telemetry, season, round_num, session_type, tuple(laps),
+        affinity=(season, round_num, session_type),
+    )
+
+
+def fetch_session_telemetry(season: int, round_num: int, session_type: str) -> Optional[list[tuple]]:
+    session_type = session_type.upper()
+    return session_loader.run(
+        load_session_telemetry, season, round_num, session_type, affinity=(season, round_num, session_type)
+    )
+
+
+def fetch_testing_day(season: int, test_number: int, day: int) -> Optional[tuple[dict, bool]]:
+    return session_loader.run(load_testing_day, season, test_number, day, affinity=(season, test_number, day))
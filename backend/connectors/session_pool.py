@@ -0,0 +1,186 @@
+"""
+In-process pool of loaded FastF1 sessions.
+Bounded by session count and estimated memory; least-recently-used sessions are evicted first.
+Concurrent requests for the same session wait on a single load.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def estimate_session_bytes(session) -> int:
+    """Rough in-memory size of a loaded session (laps + car/position data frames)."""
+    total = 0
+    try:
+        total += int(session.laps.memory_usage(deep=True).sum())
+    except Exception:
+        pass
+    for attr in ("car_data", "pos_data"):
+        try:
+            frames = getattr(session, attr)
+        except Exception:
+            continue  # not loaded (laps-only session)
+        for df in (frames or {}).values():
+            try:
+                total += int(df.memory_usage(deep=True).sum())
+            except Exception:
+                pass
+    return total
+
+
+class SessionPool:
+    """Thread-safe LRU pool of loaded sessions keyed by (season, round, session_type)."""
+
+    def __init__(
+        self,
+        max_sessions: int,
+        max_bytes: int,
+        size_fn: Callable[[Any], int] = estimate_session_bytes,
+    ):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._size_fn = size_fn
+        self._entries: "OrderedDict[Hashable, tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.load_failures = 0
+        self.upgrades = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Return the pooled session for key, loading it with loader() on a miss.
+        Only one thread loads a given key; others block until it finishes.
+        Failed loads (loader returns None) are not pooled.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    # Another thread loaded it while we waited
+                    self._entries.move_to_end(key)
+                    self.coalesced += 1
+                    return entry[0]
+                self.misses += 1
+
+            try:
+                session = loader()
+                size = self._size_fn(session) if session is not None else 0
+            except BaseException:
+                with self._lock:
+                    self._load_locks.pop(key, None)
+                raise
+
+            # The entry is stored before the load lock is dropped, in one critical section,
+            # so a request arriving now finds one or the other and never loads again
+            with self._lock:
+                self._load_locks.pop(key, None)
+                if session is None:
+                    self.load_failures += 1
+                    return None
+                self._entries[key] = (session, size)
+                self._bytes += size
+                self._evict_locked()
+            return session
+
+    def upgrade(self, key: Hashable, is_upgraded: Callable[[Any], bool], upgrader: Callable[[Any], bool]) -> Any:
+        """
+        Bring the pooled session for key up to a richer tier in place (e.g. laps-only →
+        with telemetry) unless is_upgraded(session) already holds, then re-measure its size.
+        Only one thread upgrades a given key. Returns the session, or None if key is not
+        pooled or upgrader(session) returns False.
+        """
+        with self._lock:
+            if key not in self._entries:
+                return None
+            upgrade_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with upgrade_lock:
+            session = self.peek(key)
+            if session is None or is_upgraded(session):
+                return session
+            try:
+                upgraded = upgrader(session)
+                size = self._size_fn(session) if upgraded else 0
+            except BaseException:
+                with self._lock:
+                    self._load_locks.pop(key, None)
+                raise
+
+            with self._lock:
+                self._load_locks.pop(key, None)
+                if not upgraded:
+                    return None
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._bytes += size - entry[1]
+                    self._entries[key] = (session, size)
+                    self._entries.move_to_end(key)
+                    self._evict_locked()
+                self.upgrades += 1
+            return session
+
+    def peek(self, key: Hashable) -> Any:
+        """Return the pooled session for key without loading or touching LRU order."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _evict_locked(self) -> None:
+        # Always keep the most recent entry, even if it alone exceeds the byte budget
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            key, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            logger.info(f"Session pool evicted {key} ({size / 1048576:.1f} MB)")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._entries),
+                "estimated_mb": round(self._bytes / 1048576, 1),
+                "max_sessions": self.max_sessions,
+                "max_mb": round(self.max_bytes / 1048576, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "load_failures": self.load_failures,
+                "upgrades": self.upgrades,
+            }
+
+
+session_pool = SessionPool(
+    max_sessions=settings.SESSION_POOL_MAX_SESSIONS,
+    max_bytes=settings.SESSION_POOL_MAX_MB * 1024 * 1024,
+)
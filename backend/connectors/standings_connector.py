@@ -1,39 +1,18 @@
+import asyncio
 import logging
-import httpx
+from datetime import date
 from typing import Optional
+from connectors.http_transport import BASE_URL, ConnectorError, fetch_json
+from connectors.calendar_connector import get_calendar
 
 logger = logging.getLogger(__name__)
 
-BASE_URL = "https://api.jolpi.ca/ergast/f1"
-TIMEOUT = 15.0
-MAX_RETRIES = 3
+ROUND_FETCH_CONCURRENCY = 6
 
 
-class ConnectorError(Exception):
-    pass
-
-
-def _fetch_with_retry(url: str) -> dict:
-    """Fetch a URL with retry/backoff. Returns parsed JSON."""
-    import time
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            with httpx.Client(timeout=TIMEOUT) as client:
-                resp = client.get(url)
-                resp.raise_for_status()
-                return resp.json()
-        except httpx.HTTPStatusError as e:
-            logger.warning(f"HTTP {e.response.status_code} on attempt {attempt}: {url}")
-        except Exception as e:
-            logger.warning(f"Request error on attempt {attempt}: {e}")
-        if attempt < MAX_RETRIES:
-            time.sleep(2 ** attempt)
-    raise ConnectorError(f"Failed to fetch {url} after {MAX_RETRIES} attempts")
-
-
-def get_driver_standings(season: int) -> tuple[list[dict], int]:
+async def get_driver_standings(season: int) -> tuple[list[dict], int]:
     url = f"{BASE_URL}/{season}/driverStandings.json"
-    data = _fetch_with_retry(url)
+    data = await fetch_json(url)
     try:
         standings_list = data["MRData"]["StandingsTable"]["StandingsLists"]
         if not standings_list:
@@ -44,9 +23,9 @@ def get_driver_standings(season: int) -> tuple[list[dict], int]:
         raise ConnectorError(f"Unexpected standings schema: {e}")
 
 
-def get_constructor_standings(season: int) -> list[dict]:
+async def get_constructor_standings(season: int) -> list[dict]:
     url = f"{BASE_URL}/{season}/constructorStandings.json"
-    data = _fetch_with_retry(url)
+    data = await fetch_json(url)
     try:
         standings_list = data["MRData"]["StandingsTable"]["StandingsLists"]
         if not standings_list:
@@ -56,25 +35,47 @@ def get_constructor_standings(season: int) -> list[dict]:
         raise ConnectorError(f"Unexpected constructor standings schema: {e}")
 
 
-def get_driver_standings_all_rounds(season: int) -> list[dict]:
-    """Fetch standings after every round for championship progression chart."""
-    url = f"{BASE_URL}/{season}/driverStandings/{{}}.json"
-    # First get the calendar to know how many rounds
-    cal_url = f"{BASE_URL}/{season}.json"
-    cal_data = _fetch_with_retry(cal_url)
-    races = cal_data["MRData"]["RaceTable"]["Races"]
+async def get_driver_standings_all_rounds(
+    season: int,
+    after_round: int = 0,
+    calendar: Optional[list[dict]] = None,
+) -> list[dict]:
+    """
+    Fetch standings after every completed round for the championship progression chart.
+    Only rounds newer than after_round are requested, at most ROUND_FETCH_CONCURRENCY at a time.
+    calendar: events as returned by get_calendar (fetched if not given).
+    """
+    if calendar is None:
+        calendar = await get_calendar(season)
+
+    today = date.today().isoformat()
+    pending = [
+        event for event in calendar
+        if event["round"] > after_round and (event.get("date") or "") <= today
+    ]
+    limiter = asyncio.Semaphore(ROUND_FETCH_CONCURRENCY)
+
+    async def fetch_round(event: dict) -> Optional[dict]:
+        round_num = event["round"]
+        async with limiter:
+            try:
+                rd = await fetch_json(f"{BASE_URL}/{season}/{round_num}/driverStandings.json")
+            except ConnectorError:
+                return None
+        standings_list = rd.get("MRData", {}).get("StandingsTable", {}).get("StandingsLists", [])
+        if not standings_list:
+            return None
+        return {
+            "round": round_num,
+            "race_name": event["name"],
+            "date": event.get("date"),
+            "standings": standings_list[0]["DriverStandings"],
+        }
+
+    fetched = await asyncio.gather(*(fetch_round(event) for event in pending))
     all_rounds = []
-    for race in races:
-        round_num = int(race["round"])
-        try:
-            rd = _fetch_with_retry(f"{BASE_URL}/{season}/{round_num}/driverStandings.json")
-            standings_list = rd["MRData"]["StandingsTable"]["StandingsLists"]
-            if standings_list:
-                all_rounds.append({
-                    "round": round_num,
-                    "race_name": race["raceName"],
-                    "standings": standings_list[0]["DriverStandings"],
-                })
-        except ConnectorError:
-            break  # stop at current round (future rounds will 404)
+    for item in fetched:
+        if item is None:
+            break  # stop at the first round without published standings
+        all_rounds.append(item)
     return all_rounds
@@ -1,12 +1,22 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 from config import get_settings
 
 settings = get_settings()
 
+
+def _engine_url(url: str) -> str:
+    # psycopg2 is the driver in requirements.txt; SQLAlchemy >= 2.1 would otherwise pick psycopg 3
+    if url.startswith("postgresql://"):
+        return "postgresql+psycopg2://" + url[len("postgresql://"):]
+    return url
+
+
 engine = create_engine(
-    settings.DATABASE_URL,
+    _engine_url(settings.DATABASE_URL),
     pool_pre_ping=True,
     pool_size=5,
     max_overflow=10,
@@ -22,3 +32,33 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def init_db() -> None:
+    """Create any missing tables and columns. No migrations are shipped yet, so this runs at startup."""
+    from models import Base
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine, Base.metadata)
+
+
+def add_missing_columns(bind, metadata) -> list[str]:
+    """
+    Add nullable columns that models gained after their table was created (create_all
+    leaves existing tables alone). Returns the "table.column" names added.
+    """
+    inspector = inspect(bind)
+    added = []
+    with bind.begin() as conn:
+        for table in metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    column_type = column.type.compile(dialect=bind.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                    added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def dialect_insert(db: Session):
+    """INSERT construct with on_conflict_* support for the session's dialect (PostgreSQL, or SQLite in tests)."""
+    return sqlite_insert if db.get_bind().dialect.name == "sqlite" else pg_insert
@@ -0,0 +1,195 @@
+"""
+HTTP caching for the data endpoints: a strong ETag on every 200 GET, 304 for a matching
+If-None-Match, and a Cache-Control policy per resource.
+
+Sessions and rounds are final once ingestion stops revisiting them (INGEST_LOOKBACK_H
+after they end, by the calendar): their responses are `immutable` for a year. Everything
+else that changes during a weekend (standings, calendar, testing, sessions still in the
+lookback window) gets a short max-age plus stale-while-revalidate.
+
+The ETag and Cache-Control sent for each URL are remembered in the cache (namespace
+"etag") for as long as the response stays fresh, so a revalidation within that window is
+answered with 304 before the route — and whatever it would compute — runs.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from urllib.parse import parse_qs
+from starlette.datastructures import Headers, MutableHeaders
+from cache import cache_key, cache_get, cache_get_bytes, cache_set_bytes
+from config import get_settings
+from ingestion.worker import session_end
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# A final response's ETag is remembered for a day; clients keep it far longer
+FINAL_ETAG_TTL_S = 86400
+
+# Path → what it describes: ("session", season, round, session_type), ("round", season, round),
+# ("season", last season) or ("live",). Unlisted paths (health, admin, docs) are left alone.
+_ROUTES = [
+    (re.compile(r"^/analytics/season/(\d{4})(?:-(\d{4}))?/[^/]+$"),
+     lambda m, q: ("season", int(m[2] or m[1]))),
+    (re.compile(r"^/analytics/qualifying/(\d{4})/(\d+)$"),
+     lambda m, q: ("session", int(m[1]), int(m[2]), q.get("session_type", "Q").upper())),
+    (re.compile(r"^/(?:analytics|telemetry)/(\d{4})/(\d+)/([A-Za-z0-9]+)(?:/[^/]+)?$"),
+     lambda m, q: ("session", int(m[1]), int(m[2]), m[3].upper())),
+    (re.compile(r"^/event/(\d+)$"),
+     lambda m, q: ("round", int(q.get("season", 2025)), int(m[1]))),
+    (re.compile(r"^/(?:standings(?:/progression)?|calendar|testing/\d{4})$"),
+     lambda m, q: ("live",)),
+]
+
+
+def classify(path: str, query_string: str) -> Optional[tuple]:
+    query = {k: v[-1] for k, v in parse_qs(query_string).items()}
+    for pattern, describe in _ROUTES:
+        match = pattern.match(path)
+        if match:
+            try:
+                return describe(match, query)
+            except ValueError:
+                return ("live",)
+    return None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _final(start: Optional[str], session_type: str, now: datetime) -> bool:
+    end = session_end(start, session_type) if start else None
+    return end is not None and end + timedelta(hours=settings.INGEST_LOOKBACK_H) <= now
+
+
+def is_final(resource: tuple, events: list[dict], now: datetime) -> bool:
+    """Whether a classified resource can no longer change, from its season's calendar events."""
+    kind = resource[0]
+    if kind == "season":
+        return bool(events) and all(_final(e.get("sessions", {}).get("R"), "R", now) for e in events)
+    if kind not in ("session", "round"):
+        return False
+    event = next((e for e in events if e["round"] == resource[2]), None)
+    if event is None:
+        return False
+    sessions = event.get("sessions", {})
+    if kind == "session" and resource[3] in sessions:
+        return _final(sessions[resource[3]], resource[3], now)
+    return _final(sessions.get("R"), "R", now)  # a round, or a session the calendar does not list
+
+
+def session_final(season: int, round_num: int, session_type: str) -> bool:
+    """
+    is_final for one session, judged from the season calendar already in the cache (no
+    fetch, so sync callers may use it); False when the calendar is not cached.
+    """
+    calendar = cache_get(cache_key("calendar", season))
+    if calendar is None:
+        return False
+    return is_final(("session", season, round_num, session_type.upper()), calendar["events"], _utcnow())
+
+
+async def _season_events(season: int) -> list[dict]:
+    from api.calendar import season_calendar
+    try:
+        return (await season_calendar(season))["events"]
+    except Exception as e:
+        logger.warning(f"Calendar unavailable for cache policy of {season}: {e}")
+        return []
+
+
+async def cache_policy(resource: tuple) -> tuple[str, int]:
+    """(Cache-Control value, seconds the ETag index may answer 304 for it)."""
+    if resource[0] != "live" and is_final(resource, await _season_events(resource[1]), _utcnow()):
+        return IMMUTABLE, FINAL_ETAG_TTL_S
+    return (
+        f"public, max-age={settings.HTTP_MAX_AGE_S}, stale-while-revalidate={settings.HTTP_STALE_WHILE_REVALIDATE_S}",
+        settings.HTTP_MAX_AGE_S,
+    )
+
+
+def strong_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored."""
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+class HTTPCacheMiddleware:
+    """ASGI middleware adding ETag and Cache-Control to the GET endpoints classify() knows."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        resource = classify(scope["path"], query_string)
+        if resource is None:
+            return await self.app(scope, receive, send)
+
+        request_headers = Headers(scope=scope)
+        if_none_match = request_headers.get("if-none-match")
+        # Telemetry negotiates its body on Accept, so the index keeps one entry per Accept value
+        index_key = cache_key("etag", scope["path"], query_string, request_headers.get("accept", ""))
+        if if_none_match:
+            known = await asyncio.to_thread(cache_get_bytes, index_key)
+            if known is not None:
+                etag, cache_control = known.decode().split("\n", 1)
+                if etag_matches(if_none_match, etag):
+                    return await _send_not_modified(send, etag, cache_control)
+
+        start = None
+        chunks = []
+
+        async def buffer_ok_response(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if message["status"] != 200:
+                    start = False  # errors and redirects pass through untouched
+                    await send(message)
+                else:
+                    start = message
+                return
+            if start is False or message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            etag = strong_etag(body)
+            cache_control, ttl = await cache_policy(resource)
+            await asyncio.to_thread(cache_set_bytes, index_key, f"{etag}\n{cache_control}".encode(), ttl)
+            if if_none_match and etag_matches(if_none_match, etag):
+                return await _send_not_modified(send, etag, cache_control)
+            headers = MutableHeaders(scope=start)
+            headers["ETag"] = etag
+            headers.setdefault("Cache-Control", cache_control)
+            headers.add_vary_header("Accept")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, buffer_ok_response)
+
+
+async def _send_not_modified(send, etag: str, cache_control: str) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": 304,
+        "headers": [
+            (b"etag", etag.encode()),
+            (b"cache-control", cache_control.encode()),
+            (b"vary", b"Accept"),
+        ],
+    })
+    await send({"type": "http.response.body", "body": b""})
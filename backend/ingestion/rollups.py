@@ -0,0 +1,56 @@
+"""
+Season rollup refresh — builds lap_rollups for sessions whose laps were stored before
+rollups existed. Sessions ingested since are rolled up as part of ingest_laps.
+    python -m ingestion.rollups --season 2025            # sessions without rollups only
+    python -m ingestion.rollups --season 2025 --rebuild  # every stored session of the season
+"""
+import argparse
+import logging
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from analytics.engine import lap_columns
+from analytics.rollups import session_rollups
+from db import SessionLocal, init_db
+from models import Driver, Lap
+from storage.lap_store import find_session_id, load_laps
+from storage.rollup_store import load_rollups, replace_session_rollups, sessions_missing_rollups
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_season_rollups(db: Session, season: int, rebuild: bool = False) -> int:
+    """Roll up a season's stored sessions that have no rollups yet (all with rebuild). Returns sessions refreshed."""
+    refreshed = 0
+    for round_num, session_type in sessions_missing_rollups(db, season, rebuild):
+        session_id = find_session_id(db, season, round_num, session_type)
+        laps = load_laps(db, season, round_num, session_type) or []
+        driver_ids = dict(db.execute(
+            select(Driver.code, Driver.id).join(Lap, Lap.driver_id == Driver.id).where(Lap.session_id == session_id)
+        ).all())
+        replace_session_rollups(db, session_id, session_rollups(lap_columns(laps)), driver_ids)
+        db.commit()
+        refreshed += 1
+        logger.info(f"Rolled up {season} R{round_num} {session_type}")
+    return refreshed
+
+
+def load_season_rollups(seasons: list[int], session_type: str, driver_code: Optional[str] = None) -> Optional[list[dict]]:
+    """load_rollups with its own DB session, or None if the database is unavailable."""
+    try:
+        with SessionLocal() as db:
+            return load_rollups(db, seasons, session_type, driver_code)
+    except Exception as e:
+        logger.warning(f"Season rollups unavailable for {seasons} {session_type}: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build season rollups from stored laps.")
+    parser.add_argument("--season", type=int, required=True)
+    parser.add_argument("--rebuild", action="store_true", help="recompute sessions that already have rollups")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    init_db()
+    with SessionLocal() as db:
+        print(f"Refreshed {refresh_season_rollups(db, args.season, args.rebuild)} sessions")
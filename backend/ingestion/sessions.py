@@ -0,0 +1,122 @@
+"""
+Session ingestion — writes a loaded FastF1 session's laps (and per-lap telemetry blobs)
+to Postgres once, so later requests read them from the database instead of FastF1.
+"""
+import logging
+from typing import Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from analytics.engine import with_status_flags
+from analytics.rollups import session_rollups
+from cache import cache_key, cache_delete
+from db import SessionLocal
+from connectors.session_loader import fetch_session_laps, fetch_session_telemetry
+from storage.lap_store import ensure_session_record, upsert_drivers, save_laps, delete_laps, load_laps
+from storage.rollup_store import replace_session_rollups
+from storage.telemetry_store import save_lap_telemetry, load_lap_telemetry_many, delete_orphaned_telemetry
+
+logger = logging.getLogger(__name__)
+
+
+def ingest_laps(
+    db: Session, season: int, round_num: int, session_type: str, loaded: dict, replace: bool = False
+) -> int:
+    """
+    Persist laps in the extract_session_laps shape (idempotent) — as returned by the
+    session loader's worker processes — and refresh the session's season rollups.
+    replace: delete the session's stored laps first, so laps FastF1 no longer has go too,
+    with their stored telemetry.
+    Returns the number of laps written.
+    """
+    columns = loaded["columns"]
+    if not columns or len(columns["lap_number"]) == 0:
+        return 0
+    session_id = ensure_session_record(
+        db, season, round_num, session_type, loaded["event_name"], loaded["session_date"]
+    )
+    upsert_drivers(db, loaded["drivers"])
+    driver_ids = {d["code"]: d["id"] for d in loaded["drivers"]}
+    if replace:
+        delete_laps(db, session_id)
+    written = save_laps(db, session_id, columns, driver_ids)
+    if replace:
+        delete_orphaned_telemetry(db, session_id)
+    replace_session_rollups(db, session_id, session_rollups(with_status_flags(columns)), driver_ids)
+    db.commit()
+    # Reassembled on next request; per-driver units whose laps did not change are reused.
+    # Fastest-lap telemetry responses expire on their own (api.analytics.session_ttl)
+    cache_delete(cache_key("analytics", season, round_num, session_type))
+    cache_delete(cache_key("qualifying", season, round_num, session_type))
+    logger.info(f"Ingested {written} laps for {season} R{round_num} {session_type}")
+    return written
+
+
+def persist_session_laps(season: int, round_num: int, session_type: str, loaded: dict) -> int:
+    """ingest_laps with its own DB session; failures are logged, not raised."""
+    try:
+        with SessionLocal() as db:
+            return ingest_laps(db, season, round_num, session_type, loaded)
+    except Exception as e:
+        logger.warning(f"Lap ingestion failed for {season} R{round_num} {session_type}: {e}")
+        return 0
+
+
+def refresh_session_laps(season: int, round_num: int, session_type: str) -> int:
+    """
+    Reload a session from FastF1 past every cached copy and replace its stored laps, picking
+    up corrections published after the first ingestion (deleted laps, penalties). Stored laps
+    are kept if FastF1 has none. Returns the number of laps written.
+    """
+    loaded = fetch_session_laps(season, round_num, session_type, fresh=True)
+    if not loaded:
+        return 0
+    with SessionLocal() as db:
+        return ingest_laps(db, season, round_num, session_type, loaded, replace=True)
+
+
+def load_stored_laps(season: int, round_num: int, session_type: str) -> Optional[list[dict]]:
+    """Laps from Postgres in the get_laps contract, or None if not ingested or DB unavailable."""
+    try:
+        with SessionLocal() as db:
+            return load_laps(db, season, round_num, session_type)
+    except Exception as e:
+        logger.warning(f"Stored laps unavailable for {season} R{round_num} {session_type}: {e}")
+        return None
+
+
+def persist_lap_telemetry(season: int, round_num: int, session_type: str, laps: list[tuple]) -> int:
+    """save_lap_telemetry with its own DB session; failures are logged, not raised."""
+    try:
+        with SessionLocal() as db:
+            return save_lap_telemetry(db, season, round_num, session_type, laps)
+    except Exception as e:
+        logger.warning(f"Telemetry ingestion failed for {season} R{round_num} {session_type}: {e}")
+        return 0
+
+
+def ingest_session_telemetry(season: int, round_num: int, session_type: str) -> int:
+    """Store every lap's telemetry for a session whose laps are already ingested. Returns laps stored."""
+    laps = fetch_session_telemetry(season, round_num, session_type)
+    if not laps:
+        return 0
+    written = persist_lap_telemetry(season, round_num, session_type, laps)
+    logger.info(f"Ingested telemetry for {written} laps of {season} R{round_num} {session_type}")
+    return written
+
+
+def load_stored_telemetry_many(
+    season: int,
+    round_num: int,
+    session_type: str,
+    laps: list[tuple[str, Optional[int]]],
+) -> list[Optional[tuple[int, dict[str, np.ndarray]]]]:
+    """
+    (lap_number, channels) of each stored (driver_code, lap_number), in one read; None
+    for a lap not stored, and for every lap if the DB is unavailable.
+    """
+    try:
+        with SessionLocal() as db:
+            return load_lap_telemetry_many(db, season, round_num, session_type, laps)
+    except Exception as e:
+        logger.warning(f"Stored telemetry unavailable for {season} R{round_num} {session_type}: {e}")
+        return [None] * len(laps)
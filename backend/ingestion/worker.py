@@ -0,0 +1,256 @@
+"""
+Background ingestion worker — pre-warms sessions shortly after they finish, so the
+first /analytics request is served from Redis/Postgres instead of a cold FastF1 load.
+
+Runs inside the API process (lifespan, INGEST_WORKER_ENABLED=true) or standalone:
+    python -m ingestion.worker            # poll forever
+    python -m ingestion.worker --once     # one poll of the lookback window
+    python -m ingestion.worker --season 2025   # backfill every finished session of a season
+Each session is ingested twice: once it settles (INGEST_SETTLE_MIN), then again from fresh
+FastF1 data INGEST_REFRESH_H after it ends, replacing the stored laps with the corrected
+ones. Several API workers may run it at once: a lease per session makes one of them
+ingest, and a marker in the cache records each stage done, so the others skip it.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException
+from api.analytics import get_session_analytics
+from cache import cache_key, cache_get_bytes, cache_set_bytes, lease
+from config import get_settings
+from connectors.calendar_connector import get_calendar
+from connectors.http_transport import ConnectorError, close_client
+from db import SessionLocal, init_db
+from ingestion.sessions import ingest_session_telemetry, refresh_session_laps
+from storage.job_store import record_job
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Scheduled length in minutes, used to estimate when a session ends from its start time
+SESSION_DURATION_MIN = {"FP1": 60, "FP2": 60, "FP3": 60, "SQ": 45, "Q": 60, "S": 60, "R": 120}
+RECENT_JOBS = 20
+INGEST_LEASE_S = 1800  # longer than a session load plus its telemetry ingestion
+STAGES = ("settled", "final")
+
+_warmed: dict = {}  # (season, round, session_type) → last stage warmed by this process or seen done
+_recent_jobs: deque = deque(maxlen=RECENT_JOBS)
+_job_counts = {"succeeded": 0, "unavailable": 0, "failed": 0}
+_last_poll: Optional[datetime] = None
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def session_end(start: str, session_type: str) -> Optional[datetime]:
+    """Estimated end (naive UTC) of a session from its calendar start, "date" or "dateTtimeZ"."""
+    try:
+        if "T" not in start:
+            # No published time: the session has certainly ended by the end of that day
+            return datetime.fromisoformat(start) + timedelta(days=1)
+        begins = datetime.fromisoformat(start.rstrip("Z"))
+    except ValueError:
+        return None
+    return begins + timedelta(minutes=SESSION_DURATION_MIN.get(session_type, 120))
+
+
+def finished_sessions(
+    events: list[dict],
+    now: datetime,
+    lookback_h: Optional[int],
+    settle_min: int,
+    session_types: list[str],
+) -> list[dict]:
+    """
+    Sessions from get_calendar events that ended at least settle_min ago and, unless
+    lookback_h is None, no more than lookback_h ago. Oldest first.
+    """
+    earliest = now - timedelta(hours=lookback_h) if lookback_h is not None else datetime.min
+    latest = now - timedelta(minutes=settle_min)
+    due = []
+    for event in events:
+        for code, start in event.get("sessions", {}).items():
+            if code not in session_types:
+                continue
+            end = session_end(start, code)
+            if end is not None and earliest <= end <= latest:
+                due.append({"season": event["season"], "round": event["round"], "session_type": code, "session_end": end})
+    return sorted(due, key=lambda s: s["session_end"])
+
+
+def _persist_job(job: dict) -> None:
+    try:
+        with SessionLocal() as db:
+            record_job(db, job)
+    except Exception as e:
+        logger.warning(f"Could not record ingestion job: {e}")
+
+
+def session_stage(target: dict, now: datetime) -> str:
+    """The ingestion stage a due session is in: "final" from INGEST_REFRESH_H after its end."""
+    return "final" if target["session_end"] + timedelta(hours=settings.INGEST_REFRESH_H) <= now else "settled"
+
+
+def _stage_done(done: Optional[str], stage: str) -> bool:
+    return done is not None and STAGES.index(done) >= STAGES.index(stage)
+
+
+def _stage_marker(season: int, round_num: int, session_type: str) -> str:
+    return cache_key("ingested", season, round_num, session_type)
+
+
+def _done_stage(marker: str) -> Optional[str]:
+    done = cache_get_bytes(marker)
+    return done.decode() if done is not None else None
+
+
+def _ingest(season: int, round_num: int, session_type: str, stage: str) -> bool:
+    """
+    Ingest a session up to stage under its cross-worker lease: at "final", reload it from
+    FastF1 and replace its stored laps first. Then analyse it through the /analytics path,
+    which ingests its laps if not stored yet and fills the analytics cache, and store its
+    per-lap telemetry (INGEST_TELEMETRY). False if another worker holds the lease or has
+    done the stage already.
+    """
+    marker = _stage_marker(season, round_num, session_type)
+    with lease(marker, INGEST_LEASE_S) as held:
+        if not held or _stage_done(_done_stage(marker), stage):
+            return False
+        if stage == "final" and not refresh_session_laps(season, round_num, session_type):
+            raise HTTPException(status_code=404, detail="Session data not available")
+        get_session_analytics(season, round_num, session_type)
+        if settings.INGEST_TELEMETRY:
+            ingest_session_telemetry(season, round_num, session_type)
+        cache_set_bytes(marker, stage.encode(), settings.INGEST_LOOKBACK_H * 3600)
+    return True
+
+
+async def warm_session(target: dict, stage: str = "settled") -> Optional[dict]:
+    """
+    Ingest one finished session up to stage (see _ingest). Returns the recorded job, or
+    None if another worker is ingesting it or already has.
+    """
+    season, round_num, session_type = target["season"], target["round"], target["session_type"]
+    done = await asyncio.to_thread(_done_stage, _stage_marker(season, round_num, session_type))
+    if _stage_done(done, stage):
+        _warmed[(season, round_num, session_type)] = done
+        return None
+    started_at = _utcnow()
+    t0 = time.perf_counter()
+    status, error = "succeeded", None
+    try:
+        if not await asyncio.to_thread(_ingest, season, round_num, session_type, stage):
+            logger.info(f"{season} R{round_num} {session_type} is being ingested by another worker")
+            return None
+    except HTTPException as e:
+        status, error = "unavailable", str(e.detail)  # FastF1 has no data yet; retried next poll
+    except Exception as e:
+        status, error = "failed", str(e)
+    finished_at = _utcnow()
+
+    job = {
+        "season": season,
+        "round": round_num,
+        "session_type": session_type,
+        "stage": stage,
+        "status": status,
+        "session_end": target["session_end"],
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "duration_s": round(time.perf_counter() - t0, 3),
+        "lag_s": round((finished_at - target["session_end"]).total_seconds(), 1) if status == "succeeded" else None,
+        "error": error,
+    }
+    _job_counts[status] += 1
+    _recent_jobs.append(job)
+    if status == "succeeded":
+        _warmed[(season, round_num, session_type)] = stage
+        logger.info(f"Warmed {season} R{round_num} {session_type} ({stage}) in {job['duration_s']}s, lag {job['lag_s']}s")
+    else:
+        logger.warning(f"Warm-up {status} for {season} R{round_num} {session_type}: {error}")
+    await asyncio.to_thread(_persist_job, job)
+    return job
+
+
+async def run_once(now: Optional[datetime] = None, season: Optional[int] = None) -> list[dict]:
+    """
+    One poll: warm every due session whose current stage this process has not warmed, one
+    at a time (each FastF1 load is CPU- and memory-heavy). Without a season, sessions that
+    ended within INGEST_LOOKBACK_H; with one, every finished session of that season, which
+    reloads them all from FastF1 (their stage is final). Returns the jobs run.
+    """
+    global _last_poll
+    now = now or _utcnow()
+    _last_poll = now
+    if season is not None:
+        seasons, lookback_h = [season], None
+    else:
+        lookback_h = settings.INGEST_LOOKBACK_H
+        # Around New Year the lookback window spans two seasons
+        seasons = sorted({now.year, (now - timedelta(hours=lookback_h)).year})
+
+    events = []
+    for s in seasons:
+        try:
+            events.extend(await get_calendar(s))
+        except ConnectorError as e:
+            logger.warning(f"Calendar unavailable for {s}: {e}")
+
+    due = finished_sessions(events, now, lookback_h, settings.INGEST_SETTLE_MIN, settings.INGEST_SESSION_TYPES)
+    jobs = []
+    for target in due:
+        stage = session_stage(target, now)
+        if not _stage_done(_warmed.get((target["season"], target["round"], target["session_type"])), stage):
+            job = await warm_session(target, stage)
+            if job is not None:
+                jobs.append(job)
+    return jobs
+
+
+async def run_forever() -> None:
+    while True:
+        try:
+            await run_once()
+        except Exception as e:
+            logger.warning(f"Ingestion poll failed: {e}")
+        await asyncio.sleep(settings.INGEST_POLL_INTERVAL_S)
+
+
+def ingestion_stats() -> dict:
+    return {
+        "enabled": settings.INGEST_WORKER_ENABLED,
+        "last_poll": _last_poll,
+        "warmed_sessions": len(_warmed),
+        **_job_counts,
+        "recent_jobs": list(_recent_jobs),
+    }
+
+
+async def _main(args) -> None:
+    try:
+        if args.season is not None:
+            await run_once(season=args.season)
+        elif args.once:
+            await run_once()
+        else:
+            await run_forever()
+    finally:
+        await close_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-warm recently finished F1 sessions.")
+    parser.add_argument("--once", action="store_true", help="run a single poll and exit")
+    parser.add_argument("--season", type=int, help="warm every finished session of this season and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    try:
+        init_db()
+    except Exception as e:
+        logger.warning(f"Database init failed, jobs and laps will not be persisted: {e}")
+    asyncio.run(_main(args))
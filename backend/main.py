@@ -1,10 +1,48 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from api.standings import router as standings_router
 from api.calendar import router as calendar_router
 from api.events import router as events_router
 from api.analytics import router as analytics_router
-from api.telemetry import router as telemetry_router
+from api.telemetry import LAP_NUMBER_HEADER, router as telemetry_router
+from api.testing import router as testing_router
+from api.admin import router as admin_router
+from connectors.fastf1_disk_cache import enable_fastf1_cache
+from connectors.session_pool import session_pool
+from connectors.session_loader import LoaderBusy, session_loader
+from connectors.http_transport import close_client
+from cache import cache_stats, single_flight_stats
+from db import init_db
+from responses import ORJSONResponse
+from http_caching import HTTPCacheMiddleware
+from compression import CompressionMiddleware
+from config import get_settings
+from ingestion.worker import run_forever, ingestion_stats
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await asyncio.to_thread(init_db)
+    except Exception as e:
+        logger.warning(f"Database init failed, persistence disabled until it is reachable: {e}")
+    await asyncio.to_thread(enable_fastf1_cache)
+    worker = asyncio.create_task(run_forever()) if settings.INGEST_WORKER_ENABLED else None
+    yield
+    if worker is not None:
+        worker.cancel()
+        with suppress(asyncio.CancelledError):
+            await worker
+    await close_client()
+    session_loader.shutdown()
+
 
 app = FastAPI(
     title="OpenF1 Analytics 2026",
@@ -12,23 +50,46 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# Added innermost first: ETags are computed on identity bodies, compression wraps them,
+# and CORS headers go on everything, 304s included
+app.add_middleware(HTTPCacheMiddleware)
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[LAP_NUMBER_HEADER],
 )
 
+
+@app.exception_handler(LoaderBusy)
+async def loader_busy_handler(request: Request, exc: LoaderBusy):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "10"})
+
+
 app.include_router(standings_router)
 app.include_router(calendar_router)
 app.include_router(events_router)
 app.include_router(analytics_router)
 app.include_router(telemetry_router)
+app.include_router(testing_router)
+app.include_router(admin_router)
 
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok", "service": "OpenF1 Analytics 2026"}
+    return {
+        "status": "ok",
+        "service": "OpenF1 Analytics 2026",
+        "session_pool": session_pool.stats(),
+        "session_loader": session_loader.stats(),
+        "cache": cache_stats(),
+        "single_flight": single_flight_stats(),
+        "ingestion": ingestion_stats(),
+    }
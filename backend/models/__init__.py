@@ -4,8 +4,11 @@ from models.constructor import Constructor
 from models.race_event import RaceEvent
 from models.session import SessionRecord
 from models.lap import Lap
-from models.telemetry_point import TelemetryPoint
+from models.lap_telemetry import LapTelemetry
+from models.lap_rollup import LapRollup
+from models.testing_day import TestingDaySummary
 from models.standings_snapshot import StandingsSnapshot
+from models.ingestion_job import IngestionJob
 
 __all__ = [
     "Base",
@@ -14,6 +17,9 @@ __all__ = [
     "RaceEvent",
     "SessionRecord",
     "Lap",
-    "TelemetryPoint",
+    "LapTelemetry",
+    "LapRollup",
+    "TestingDaySummary",
     "StandingsSnapshot",
+    "IngestionJob",
 ]
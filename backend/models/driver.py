@@ -14,5 +14,5 @@ class Driver(Base):
 
     constructor = relationship("Constructor", back_populates="drivers")
     laps = relationship("Lap", back_populates="driver")
-    telemetry_points = relationship("TelemetryPoint", back_populates="driver")
+    lap_telemetry = relationship("LapTelemetry", back_populates="driver")
     standings = relationship("StandingsSnapshot", back_populates="driver")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from models.base import Base
+
+
+class IngestionJob(Base):
+    """One background warm-up run for a finished session (see ingestion/worker.py)."""
+    __tablename__ = "ingestion_jobs"
+    __table_args__ = (Index("ix_ingestion_jobs_session", "season", "round", "session_type"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    season = Column(Integer, nullable=False)
+    round = Column(Integer, nullable=False)
+    session_type = Column(String, nullable=False)
+    stage = Column(String, nullable=True)  # settled, or final (re-ingested from fresh FastF1 data)
+    status = Column(String, nullable=False)  # succeeded, unavailable (no FastF1 data yet), failed
+    session_end = Column(DateTime, nullable=True)   # scheduled end of the session (UTC)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=False)
+    duration_s = Column(Float, nullable=False)
+    lag_s = Column(Float, nullable=True)  # session end → warm data ready
+    error = Column(String, nullable=True)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from models.base import Base
 
 
 class Lap(Base):
     __tablename__ = "laps"
+    # Ingestion upserts on this key; its index also serves per-session reads (leading session_id)
+    __table_args__ = (
+        UniqueConstraint("session_id", "driver_id", "lap_number", name="uq_laps_session_driver_lap"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     session_id = Column(Integer, ForeignKey("sessions.id"))
@@ -20,6 +24,8 @@ class Lap(Base):
     gap_to_leader_s = Column(Float, nullable=True)
     gap_ahead_s = Column(Float, nullable=True)
     track_status = Column(String, nullable=True)  # 1=clear, 4=SC, 5=VSC, 6=red flag
+    session_time_s = Column(Float, nullable=True)  # session clock at the end of the lap
+    team = Column(String, nullable=True)  # team name as FastF1 reports it for this session
 
     session = relationship("SessionRecord", back_populates="laps")
     driver = relationship("Driver", back_populates="laps")
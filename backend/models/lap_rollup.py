@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Float, LargeBinary, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from models.base import Base
+
+
+class LapRollup(Base):
+    """
+    Aggregates of one driver's representative laps on one compound in one session
+    (analytics.rollups.session_rollups), for season-wide analytics without reading laps.
+    """
+    __tablename__ = "lap_rollups"
+    __table_args__ = (
+        UniqueConstraint("session_id", "driver_id", "compound", name="uq_lap_rollups_session_driver_compound"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False)
+    driver_id = Column(String, ForeignKey("drivers.id"), nullable=False)
+    compound = Column(String, nullable=True)
+    laps = Column(Integer, nullable=False)
+    sum_ms = Column(Float, nullable=False)
+    sum_sq_ms = Column(Float, nullable=False)
+    sum_x = Column(Float, nullable=False)   # x = lap position within its stint (tyre age)
+    sum_xx = Column(Float, nullable=False)
+    sum_xy = Column(Float, nullable=False)
+    sketch = Column(LargeBinary, nullable=False)  # analytics.sketch.QuantileSketch of the lap times
+
+    session = relationship("SessionRecord", back_populates="lap_rollups")
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, LargeBinary, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from models.base import Base
+
+
+class LapTelemetry(Base):
+    """
+    All telemetry channels of one driver lap in a single row: a compressed, channel-contiguous
+    blob (normalizers.telemetry_codec.encode_lap_blob) instead of one row per sample.
+    """
+    __tablename__ = "lap_telemetry"
+    # One-lap reads go straight through this key's index
+    __table_args__ = (
+        UniqueConstraint("session_id", "driver_id", "lap_number", name="uq_lap_telemetry_session_driver_lap"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False)
+    driver_id = Column(String, ForeignKey("drivers.id"), nullable=False)
+    lap_number = Column(Integer, nullable=False)
+    samples = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)  # distance, speed, throttle, brake, gear, rpm, drs, x, y
+
+    session = relationship("SessionRecord", back_populates="lap_telemetry")
+    driver = relationship("Driver", back_populates="lap_telemetry")
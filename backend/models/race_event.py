@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean
+from sqlalchemy import Column, Integer, String, Date, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from models.base import Base
 
 
 class RaceEvent(Base):
     __tablename__ = "race_events"
+    __table_args__ = (UniqueConstraint("season", "round", name="uq_race_events_season_round"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     season = Column(Integer, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from models.base import Base
 
@@ -6,12 +6,14 @@ from models.base import Base
 class SessionRecord(Base):
     """A session within a race event (Practice1, Qualifying, Race, etc.)"""
     __tablename__ = "sessions"
+    __table_args__ = (UniqueConstraint("event_id", "type", name="uq_sessions_event_type"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     event_id = Column(Integer, ForeignKey("race_events.id"))
-    type = Column(String, nullable=False)  # practice1, practice2, practice3, qualifying, sprint, race, testing
+    type = Column(String, nullable=False)  # API session code: FP1, FP2, FP3, Q, SQ, S, R, TESTING
     date = Column(Date, nullable=True)
 
     event = relationship("RaceEvent", back_populates="sessions")
     laps = relationship("Lap", back_populates="session")
-    telemetry_points = relationship("TelemetryPoint", back_populates="session")
+    lap_telemetry = relationship("LapTelemetry", back_populates="session")
+    lap_rollups = relationship("LapRollup", back_populates="session")
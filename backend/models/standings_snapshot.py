@@ -1,10 +1,11 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from models.base import Base
 
 
 class StandingsSnapshot(Base):
     __tablename__ = "standings_snapshots"
+    __table_args__ = (Index("ix_standings_snapshots_season_type_round", "season", "type", "round"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     season = Column(Integer, nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, JSON, UniqueConstraint
+from models.base import Base
+
+
+class TestingDaySummary(Base):
+    """
+    One pre-season testing day reduced by analytics.testing.summarize_testing_day.
+    Written once per day; the multi-day result is merged from these rows.
+    """
+    __tablename__ = "testing_day_summaries"
+    __table_args__ = (
+        UniqueConstraint("season", "test_number", "day", name="uq_testing_day_summaries_season_test_day"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    season = Column(Integer, nullable=False)
+    test_number = Column(Integer, nullable=False)
+    day = Column(Integer, nullable=False)
+    laps = Column(Integer, nullable=False)
+    summary = Column(JSON, nullable=False)
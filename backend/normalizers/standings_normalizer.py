@@ -52,3 +52,18 @@ def normalize_constructor_standings(raw: list[dict], season: int, round_num: int
             "constructor_nationality": constructor.get("nationality", ""),
         })
     return result
+
+
+def normalize_progression_standings(raw: list[dict], season: int, round_num: int) -> list[dict]:
+    """Compact per-round driver entries for the championship progression chart."""
+    return [
+        {
+            "position": e["position"],
+            "points": e["points"],
+            "wins": e["wins"],
+            "driver_id": e["driver_id"],
+            "driver_code": e["driver_code"],
+            "constructor_id": e["constructor_id"] or None,
+        }
+        for e in normalize_driver_standings(raw, season, round_num)
+    ]
@@ -0,0 +1,189 @@
+"""
+Binary telemetry encodings for the telemetry router.
+
+Packed float32 layout (PACKED_MEDIA_TYPE), all little-endian:
+    4 bytes   magic b"OF1T"
+    uint32    header length H
+    H bytes   UTF-8 JSON header {"channels": [...], "samples": N, "dtype": "<f4"}, space-padded to 4 bytes
+    N * 4     float32 samples for each channel, in header order
+
+Arrow IPC stream (ARROW_MEDIA_TYPE) needs the optional pyarrow package.
+
+Stored lap blobs (encode_lap_blob) keep every channel at a compact dtype, channel-contiguous:
+    4 bytes   magic b"OF1L"
+    uint32    header length H
+    H bytes   UTF-8 JSON header {"channels": [[name, dtype], ...], "samples": N, "codec": "zstd"|"raw"}
+    body      the channel arrays back to back, zstd-compressed when zstandard is installed
+"""
+import json
+import struct
+from typing import Optional
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:  # optional dependency
+    pa = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+PACKED_MEDIA_TYPE = "application/vnd.openf1.telemetry+f32"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+JSON_MEDIA_TYPE = "application/json"
+
+_MAGIC = b"OF1T"
+_LAP_MAGIC = b"OF1L"
+_PREFIX = struct.Struct("<4sI")
+
+# Storage dtype per telemetry channel; unknown channels are stored as float32
+LAP_BLOB_DTYPES = {
+    "distance": "<f4",
+    "speed":    "<f4",
+    "throttle": "<f4",
+    "brake":    "u1",
+    "gear":     "i1",
+    "rpm":      "<u2",
+    "drs":      "u1",
+    "x":        "<f4",
+    "y":        "<f4",
+}
+LAP_BLOB_ZSTD_LEVEL = 9  # written once per lap, read many times
+
+
+class CodecError(Exception):
+    pass
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def binary_media_types() -> list[str]:
+    """Binary media types this server can produce, in preference order."""
+    return ([ARROW_MEDIA_TYPE] if arrow_available() else []) + [PACKED_MEDIA_TYPE]
+
+
+def negotiate_media_type(accept: Optional[str]) -> str:
+    """
+    Pick a response media type from an Accept header.
+    Binary types are only chosen when explicitly listed; anything else gets JSON.
+    """
+    if not accept:
+        return JSON_MEDIA_TYPE
+    offered = binary_media_types()
+    ranked = []
+    for position, part in enumerate(accept.split(",")):
+        fields = [f.strip() for f in part.split(";")]
+        q = 1.0
+        for param in fields[1:]:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        ranked.append((-q, position, fields[0].lower()))
+    for neg_q, _, media_type in sorted(ranked):
+        if neg_q >= 0:
+            break  # q=0 means "not acceptable"
+        if media_type in offered:
+            return media_type
+        if media_type in (JSON_MEDIA_TYPE, "application/*", "*/*"):
+            return JSON_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def encode_packed(columns: dict[str, np.ndarray]) -> bytes:
+    """Pack channels as contiguous little-endian float32 arrays behind a small JSON header."""
+    names = list(columns)
+    samples = len(columns[names[0]]) if names else 0
+    header = json.dumps({"channels": names, "samples": samples, "dtype": "<f4"}).encode()
+    header += b" " * (-len(header) % 4)  # keep the float32 payload 4-byte aligned
+
+    offset = _PREFIX.size + len(header)
+    buf = bytearray(offset + 4 * samples * len(names))
+    _PREFIX.pack_into(buf, 0, _MAGIC, len(header))
+    buf[_PREFIX.size:offset] = header
+    # Write each channel straight into the output buffer — no intermediate bytes objects
+    body = np.frombuffer(buf, dtype="<f4", offset=offset).reshape(len(names), samples)
+    for row, name in enumerate(names):
+        body[row] = columns[name]
+    return bytes(buf)
+
+
+def decode_packed(data: bytes) -> dict[str, np.ndarray]:
+    """Inverse of encode_packed. Returned arrays are read-only views over data."""
+    if len(data) < _PREFIX.size:
+        raise CodecError("Packed telemetry buffer too short")
+    magic, header_len = _PREFIX.unpack_from(data, 0)
+    if magic != _MAGIC:
+        raise CodecError("Not a packed telemetry buffer")
+    header = json.loads(bytes(data[_PREFIX.size:_PREFIX.size + header_len]))
+    names, samples = header["channels"], header["samples"]
+    body = np.frombuffer(data, dtype="<f4", offset=_PREFIX.size + header_len, count=samples * len(names))
+    body = body.reshape(len(names), samples)
+    return {name: body[row] for row, name in enumerate(names)}
+
+
+def encode_arrow(columns: dict[str, np.ndarray]) -> bytes:
+    """Encode channels as a single-batch Arrow IPC stream (float32 / int32 columns)."""
+    if pa is None:
+        raise CodecError("pyarrow is not installed")
+    arrays, names = [], []
+    for name, values in columns.items():
+        dtype = np.int32 if values.dtype.kind in "iu" else np.float32
+        arrays.append(pa.array(values.astype(dtype, copy=False)))
+        names.append(name)
+    batch = pa.RecordBatch.from_arrays(arrays, names=names)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_columns(columns: dict[str, np.ndarray], media_type: str) -> bytes:
+    if media_type == ARROW_MEDIA_TYPE:
+        return encode_arrow(columns)
+    if media_type == PACKED_MEDIA_TYPE:
+        return encode_packed(columns)
+    raise CodecError(f"Unsupported telemetry media type: {media_type}")
+
+
+def encode_lap_blob(columns: dict[str, np.ndarray]) -> bytes:
+    """Pack one lap's channels at their LAP_BLOB_DTYPES storage types, zstd-compressed if available."""
+    names = list(columns)
+    samples = len(columns[names[0]]) if names else 0
+    dtypes = [LAP_BLOB_DTYPES.get(name, "<f4") for name in names]
+    body = b"".join(
+        np.ascontiguousarray(columns[name], dtype=dtype).tobytes() for name, dtype in zip(names, dtypes)
+    )
+    codec = "raw"
+    if zstandard is not None:
+        body = zstandard.ZstdCompressor(level=LAP_BLOB_ZSTD_LEVEL).compress(body)
+        codec = "zstd"
+    header = json.dumps({"channels": [list(c) for c in zip(names, dtypes)], "samples": samples, "codec": codec})
+    header = header.encode()
+    return _PREFIX.pack(_LAP_MAGIC, len(header)) + header + body
+
+
+def decode_lap_blob(data: bytes) -> dict[str, np.ndarray]:
+    """Inverse of encode_lap_blob; channels come back as read-only arrays of their storage dtype."""
+    if len(data) < _PREFIX.size:
+        raise CodecError("Lap blob too short")
+    magic, header_len = _PREFIX.unpack_from(data, 0)
+    if magic != _LAP_MAGIC:
+        raise CodecError("Not a stored lap blob")
+    header = json.loads(bytes(data[_PREFIX.size:_PREFIX.size + header_len]))
+    body = data[_PREFIX.size + header_len:]
+    if header["codec"] == "zstd":
+        if zstandard is None:
+            raise CodecError("Lap blob is zstd-compressed but zstandard is not installed")
+        body = zstandard.ZstdDecompressor().decompress(body)
+
+    columns, offset, samples = {}, 0, header["samples"]
+    for name, dtype in header["channels"]:
+        columns[name] = np.frombuffer(body, dtype=dtype, count=samples, offset=offset)
+        offset += samples * columns[name].itemsize
+    return columns
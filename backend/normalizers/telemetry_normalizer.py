@@ -0,0 +1,134 @@
+"""
+Telemetry normalization — vectorized channel extraction, downsampling, distance alignment
+and output shaping.
+"""
+import numpy as np
+
+# Output channel → (FastF1 telemetry column, numpy dtype)
+TELEMETRY_CHANNELS = {
+    "distance": ("Distance", np.float64),
+    "speed":    ("Speed", np.float64),
+    "throttle": ("Throttle", np.float64),
+    "brake":    ("Brake", np.float64),
+    "gear":     ("nGear", np.int64),
+    "rpm":      ("RPM", np.int64),
+    "drs":      ("DRS", np.int64),
+    "x":        ("X", np.float64),
+    "y":        ("Y", np.float64),
+}
+
+
+def extract_telemetry_columns(tel) -> dict[str, np.ndarray]:
+    """
+    FastF1 Telemetry frame → one numpy array per output channel.
+    Missing columns and missing samples become 0, matching the per-sample defaults.
+    """
+    n = len(tel)
+    columns = {}
+    for channel, (name, dtype) in TELEMETRY_CHANNELS.items():
+        if name in tel.columns:
+            values = tel[name].to_numpy(dtype=np.float64, na_value=np.nan)
+            columns[channel] = np.nan_to_num(values, nan=0.0).astype(dtype)
+        else:
+            columns[channel] = np.zeros(n, dtype=dtype)
+    return columns
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+    Returns the indices of `threshold` samples that best preserve the shape of y(x);
+    first and last samples are always kept.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+    # Bucket i covers samples [edges[i], edges[i + 1]); interior buckets only
+    edges = (np.floor(np.arange(threshold - 1) * every) + 1).astype(np.int64)
+    edges = np.append(edges, n)
+    edges[-2] = n - 1  # last interior bucket ends before the final sample
+
+    # Prefix sums give each bucket's centroid in O(1)
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+
+    out = np.empty(threshold, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        count = next_end - next_start
+        avg_x = (cx[next_end] - cx[next_start]) / count
+        avg_y = (cy[next_end] - cy[next_start]) / count
+        xs = x[start:end]
+        ys = y[start:end]
+        area = np.abs((x[a] - avg_x) * (ys - y[a]) - (x[a] - xs) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample_columns(columns: dict[str, np.ndarray], points: int) -> dict[str, np.ndarray]:
+    """
+    Reduce every channel to ~points samples using LTTB on the speed trace.
+    Real samples are kept (no interpolation), so discrete channels like gear stay valid.
+    """
+    idx = lttb_indices(columns["distance"], columns["speed"], points)
+    return {channel: values[idx] for channel, values in columns.items()}
+
+
+# Discrete-state channels: aligned by holding the last sample, never interpolated
+STEP_CHANNELS = {"brake", "gear", "drs"}
+
+
+def align_to_distance(
+    laps: list[dict[str, np.ndarray]],
+    points: int,
+) -> tuple[np.ndarray, list[dict[str, np.ndarray]]]:
+    """
+    Resample several laps onto one shared distance grid of `points` samples spanning
+    0 … the shortest lap's final distance (no extrapolation). Continuous channels are
+    linearly interpolated; STEP_CHANNELS take the last sample at or before each grid point.
+    Returns (grid, one channel dict per lap without "distance").
+    """
+    end = min(float(lap["distance"][-1]) for lap in laps)
+    grid = np.linspace(0.0, end, points)
+    aligned = []
+    for lap in laps:
+        # Distance is cumulative; flatten any backwards jitter so np.interp sees a sorted axis
+        distance = np.maximum.accumulate(lap["distance"].astype(np.float64))
+        held = np.clip(np.searchsorted(distance, grid, side="right") - 1, 0, len(distance) - 1)
+        aligned.append({
+            channel: values[held] if channel in STEP_CHANNELS else np.interp(grid, distance, values)
+            for channel, values in lap.items()
+            if channel != "distance"
+        })
+    return grid, aligned
+
+
+def elapsed_time(distance: np.ndarray, speed_kph: np.ndarray) -> np.ndarray:
+    """
+    Cumulative time in seconds along a distance grid, integrating 1/speed with the
+    trapezoid rule. speed_kph may be 2-D (one row per lap) to integrate all laps at once.
+    """
+    pace = 3.6 / np.maximum(np.asarray(speed_kph, dtype=np.float64), 1.0)  # s per metre
+    dt = np.diff(distance) * 0.5 * (pace[..., 1:] + pace[..., :-1])
+    zeros = np.zeros(dt.shape[:-1] + (1,))
+    return np.concatenate((zeros, np.cumsum(dt, axis=-1)), axis=-1)
+
+
+def columns_to_lists(columns: dict[str, np.ndarray]) -> dict[str, list]:
+    """Columnar JSON shape: one plain list per channel."""
+    return {channel: values.tolist() for channel, values in columns.items()}
+
+
+def columns_to_records(columns: dict[str, np.ndarray]) -> list[dict]:
+    """Row JSON shape: one dict per sample, keyed like TELEMETRY_CHANNELS."""
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*(columns[k].tolist() for k in keys))]
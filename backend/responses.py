@@ -0,0 +1,21 @@
+"""
+JSON responses. Cached routes return their pre-encoded body as is (json_body); everything
+else goes through ORJSONResponse, the app's default response class.
+"""
+from typing import Any
+from fastapi.responses import JSONResponse, Response
+from cache import dumps_json
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson (the stdlib json module when orjson is not installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+def json_body(body: bytes) -> Response:
+    """Response for JSON that is already encoded, e.g. a get_or_compute_json result."""
+    return Response(content=body, media_type=JSON_MEDIA_TYPE)
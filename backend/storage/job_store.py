@@ -0,0 +1,13 @@
+"""Ingestion job history — one row per background warm-up run."""
+from sqlalchemy.orm import Session
+from models import IngestionJob
+
+_JOB_FIELDS = (
+    "season", "round", "session_type", "stage", "status", "session_end",
+    "started_at", "finished_at", "duration_s", "lag_s", "error",
+)
+
+
+def record_job(db: Session, job: dict) -> None:
+    db.add(IngestionJob(**{k: job.get(k) for k in _JOB_FIELDS}))
+    db.commit()
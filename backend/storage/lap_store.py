@@ -0,0 +1,160 @@
+"""
+Lap persistence — normalized laps in the laps/sessions tables.
+A session is written once after its first FastF1 load; analytics then reads laps
+from Postgres instead of reloading FastF1.
+"""
+import logging
+from datetime import date
+from typing import Optional
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from db import dialect_insert
+from models import Constructor, Driver, Lap, RaceEvent, SessionRecord
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 1000
+
+# Lap columns written from get_laps(columnar=True) output, in insert order
+_LAP_COLUMNS = (
+    "lap_number", "lap_time_ms", "sector1_ms", "sector2_ms", "sector3_ms", "compound",
+    "stint", "is_personal_best", "track_status", "gap_to_leader_s", "gap_ahead_s", "session_time_s", "team",
+)
+
+
+def _normalize_type(session_type: str) -> str:
+    return session_type.upper()
+
+
+def find_session_id(db: Session, season: int, round_num: int, session_type: str) -> Optional[int]:
+    stmt = (
+        select(SessionRecord.id)
+        .join(RaceEvent, RaceEvent.id == SessionRecord.event_id)
+        .where(
+            RaceEvent.season == season,
+            RaceEvent.round == round_num,
+            SessionRecord.type == _normalize_type(session_type),
+        )
+    )
+    return db.execute(stmt).scalar()
+
+
+def ensure_session_record(
+    db: Session,
+    season: int,
+    round_num: int,
+    session_type: str,
+    event_name: str = "",
+    session_date: Optional[date] = None,
+) -> int:
+    """Upsert the race event and session rows; returns the session id."""
+    insert = dialect_insert(db)
+    stmt = insert(RaceEvent).values(season=season, round=round_num, name=event_name or f"Round {round_num}")
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["season", "round"]))
+    event_id = db.execute(
+        select(RaceEvent.id).where(RaceEvent.season == season, RaceEvent.round == round_num)
+    ).scalar_one()
+    stmt = insert(SessionRecord).values(event_id=event_id, type=_normalize_type(session_type), date=session_date)
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["event_id", "type"]))
+    return db.execute(
+        select(SessionRecord.id).where(
+            SessionRecord.event_id == event_id, SessionRecord.type == _normalize_type(session_type)
+        )
+    ).scalar_one()
+
+
+def upsert_drivers(db: Session, drivers: list[dict]) -> None:
+    """drivers: [{id, code, full_name, team_id, team_name}] — e.g. from a FastF1 results table."""
+    if not drivers:
+        return
+    insert = dialect_insert(db)
+    teams = {d["team_id"]: d.get("team_name") or d["team_id"] for d in drivers if d.get("team_id")}
+    if teams:
+        stmt = insert(Constructor).values([{"id": k, "name": v} for k, v in teams.items()])
+        db.execute(stmt.on_conflict_do_nothing(index_elements=["id"]))
+    stmt = insert(Driver).values([
+        {"id": d["id"], "code": d["code"], "full_name": d.get("full_name") or d["code"], "team_id": d.get("team_id")}
+        for d in drivers
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["id"], set_={"code": stmt.excluded.code, "team_id": stmt.excluded.team_id}
+    ))
+
+
+def save_laps(db: Session, session_id: int, columns: dict[str, np.ndarray], driver_ids: dict[str, str]) -> int:
+    """
+    Bulk upsert laps from columnar get_laps output, in executemany batches.
+    Idempotent on (session_id, driver_id, lap_number). driver_ids maps driver code → drivers.id.
+    Returns the number of rows written.
+    """
+    n = len(columns.get("lap_number", ()))
+    if n == 0:
+        return 0
+    lists = {}
+    for key in _LAP_COLUMNS:
+        values = columns[key]
+        if values.dtype.kind == "f":
+            obj = values.astype(object)
+            obj[np.isnan(values)] = None
+            lists[key] = obj.tolist()
+        else:
+            lists[key] = values.tolist()
+    lists["stint"] = [int(s) if s is not None else None for s in lists["stint"]]
+    codes = columns["driver_id"].tolist()
+    rows = [
+        {"session_id": session_id, "driver_id": driver_ids.get(code, code),
+         **{key: lists[key][i] for key in _LAP_COLUMNS}}
+        for i, code in enumerate(codes)
+    ]
+
+    insert = dialect_insert(db)
+    stmt = insert(Lap)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["session_id", "driver_id", "lap_number"],
+        set_={key: stmt.excluded[key] for key in _LAP_COLUMNS if key != "lap_number"},
+    )
+    for start in range(0, n, INSERT_BATCH_SIZE):
+        db.execute(stmt, rows[start:start + INSERT_BATCH_SIZE])
+    return n
+
+
+def delete_laps(db: Session, session_id: int) -> int:
+    """Delete a session's stored laps, before writing a corrected set. Does not commit. Returns rows deleted."""
+    return db.execute(delete(Lap).where(Lap.session_id == session_id)).rowcount
+
+
+def load_laps(db: Session, season: int, round_num: int, session_type: str) -> Optional[list[dict]]:
+    """
+    Stored laps in the get_laps list-of-dicts contract (driver_id is the driver code),
+    or None if the session has not been ingested.
+    """
+    session_id = find_session_id(db, season, round_num, session_type)
+    if session_id is None:
+        return None
+    stmt = (
+        select(Lap, Driver.code)
+        .outerjoin(Driver, Driver.id == Lap.driver_id)
+        .where(Lap.session_id == session_id)
+        .order_by(Lap.driver_id, Lap.lap_number)
+    )
+    laps = [
+        {
+            "driver_id": code or lap.driver_id,
+            "lap_number": lap.lap_number,
+            "lap_time_ms": lap.lap_time_ms,
+            "sector1_ms": lap.sector1_ms,
+            "sector2_ms": lap.sector2_ms,
+            "sector3_ms": lap.sector3_ms,
+            "compound": lap.compound,
+            "stint": lap.stint,
+            "is_personal_best": bool(lap.is_personal_best),
+            "track_status": lap.track_status,
+            "gap_to_leader_s": lap.gap_to_leader_s,
+            "gap_ahead_s": lap.gap_ahead_s,
+            "session_time_s": lap.session_time_s,
+            "team": lap.team or "",
+        }
+        for lap, code in db.execute(stmt)
+    ]
+    return laps or None
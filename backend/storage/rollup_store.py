@@ -0,0 +1,74 @@
+"""
+Season rollup persistence — lap_rollups rows per (session, driver, compound).
+A session's rows are replaced whenever its laps are ingested, so adding a round touches
+only that round's rows.
+"""
+from typing import Optional
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+from analytics.rollups import SUM_FIELDS
+from models import Driver, Lap, LapRollup, RaceEvent, SessionRecord
+
+
+def replace_session_rollups(db: Session, session_id: int, rows: list[dict], driver_ids: dict[str, str]) -> int:
+    """
+    Replace a session's rollups with session_rollups output (driver_id there is the code;
+    driver_ids maps code → drivers.id). Does not commit. Returns the number of rows written.
+    """
+    db.execute(delete(LapRollup).where(LapRollup.session_id == session_id))
+    db.add_all(
+        LapRollup(
+            session_id=session_id,
+            driver_id=driver_ids.get(row["driver_id"], row["driver_id"]),
+            compound=row["compound"],
+            sketch=row["sketch"],
+            **{field: row[field] for field in SUM_FIELDS},
+        )
+        for row in rows
+    )
+    db.flush()
+    return len(rows)
+
+
+def load_rollups(db: Session, seasons: list[int], session_type: str, driver_code: Optional[str] = None) -> list[dict]:
+    """Rollup rows of every stored session of a type in the given seasons, with season, round and driver code."""
+    # Plain column rows rather than ORM entities: a multi-season read returns thousands of rows
+    rollup = LapRollup.__table__.c
+    stmt = (
+        select(
+            RaceEvent.season, RaceEvent.round, Driver.code, rollup.driver_id, rollup.compound, rollup.sketch,
+            *(rollup[field] for field in SUM_FIELDS),
+        )
+        .join(SessionRecord, SessionRecord.id == rollup.session_id)
+        .join(RaceEvent, RaceEvent.id == SessionRecord.event_id)
+        .outerjoin(Driver, Driver.id == rollup.driver_id)
+        .where(RaceEvent.season.in_(seasons), SessionRecord.type == session_type.upper())
+        .order_by(RaceEvent.season, RaceEvent.round)
+    )
+    if driver_code is not None:
+        stmt = stmt.where(Driver.code == driver_code)
+    return [
+        {
+            "season": season,
+            "round": round_num,
+            "driver_id": code or driver_id,
+            "compound": compound,
+            "sketch": sketch,
+            **dict(zip(SUM_FIELDS, sums)),
+        }
+        for season, round_num, code, driver_id, compound, sketch, *sums in db.execute(stmt)
+    ]
+
+
+def sessions_missing_rollups(db: Session, season: int, rebuild: bool = False) -> list[tuple[int, str]]:
+    """(round, session type) of a season's sessions with stored laps but no rollups (all of them with rebuild)."""
+    has_laps = exists().where(Lap.session_id == SessionRecord.id)
+    stmt = (
+        select(RaceEvent.round, SessionRecord.type)
+        .join(RaceEvent, RaceEvent.id == SessionRecord.event_id)
+        .where(RaceEvent.season == season, has_laps)
+        .order_by(RaceEvent.round, SessionRecord.type)
+    )
+    if not rebuild:
+        stmt = stmt.where(~exists().where(LapRollup.session_id == SessionRecord.id))
+    return [(round_num, session_type) for round_num, session_type in db.execute(stmt)]
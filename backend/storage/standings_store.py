@@ -0,0 +1,109 @@
+"""
+Championship progression persistence.
+Standings after a completed round never change, so each round is written once as
+StandingsSnapshot rows and later requests only fetch rounds newer than the last stored one.
+"""
+import logging
+from collections import defaultdict
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from db import dialect_insert
+from models import Constructor, Driver, RaceEvent, StandingsSnapshot
+from normalizers.standings_normalizer import normalize_driver_standings
+
+logger = logging.getLogger(__name__)
+
+
+def last_stored_round(db: Session, season: int) -> int:
+    """Highest round with stored driver standings for the season, or 0."""
+    stmt = select(func.max(StandingsSnapshot.round)).where(
+        StandingsSnapshot.season == season, StandingsSnapshot.type == "driver"
+    )
+    return db.execute(stmt).scalar() or 0
+
+
+def save_progression_rounds(db: Session, season: int, rounds: list[dict]) -> None:
+    """
+    Persist rounds from get_driver_standings_all_rounds.
+    Drivers, constructors and race events are upserted; a round's snapshot rows are replaced,
+    so re-saving a round is idempotent.
+    """
+    if not rounds:
+        return
+    insert = dialect_insert(db)
+
+    constructors, drivers, events, snapshots = {}, {}, [], []
+    for rnd in rounds:
+        entries = normalize_driver_standings(rnd["standings"], season, rnd["round"])
+        events.append({"season": season, "round": rnd["round"], "name": rnd.get("race_name", "")})
+        for e in entries:
+            if e["constructor_id"]:
+                constructors[e["constructor_id"]] = {"id": e["constructor_id"], "name": e["constructor_name"]}
+            drivers[e["driver_id"]] = {
+                "id": e["driver_id"],
+                "code": e["driver_code"],
+                "full_name": e["driver_name"],
+                "nationality": e["driver_nationality"],
+                "team_id": e["constructor_id"] or None,
+            }
+            snapshots.append({
+                "season": season,
+                "round": rnd["round"],
+                "driver_id": e["driver_id"],
+                "constructor_id": e["constructor_id"] or None,
+                "position": e["position"],
+                "points": e["points"],
+                "wins": e["wins"],
+                "type": "driver",
+            })
+
+    if constructors:
+        stmt = insert(Constructor).values(list(constructors.values()))
+        db.execute(stmt.on_conflict_do_update(index_elements=["id"], set_={"name": stmt.excluded.name}))
+    if drivers:
+        stmt = insert(Driver).values(list(drivers.values()))
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={"code": stmt.excluded.code, "full_name": stmt.excluded.full_name, "team_id": stmt.excluded.team_id},
+        ))
+    stmt = insert(RaceEvent).values(events)
+    db.execute(stmt.on_conflict_do_update(index_elements=["season", "round"], set_={"name": stmt.excluded.name}))
+
+    db.execute(delete(StandingsSnapshot).where(
+        StandingsSnapshot.season == season,
+        StandingsSnapshot.type == "driver",
+        StandingsSnapshot.round.in_([r["round"] for r in rounds]),
+    ))
+    if snapshots:
+        db.execute(insert(StandingsSnapshot).values(snapshots))
+    db.commit()
+
+
+def load_progression(db: Session, season: int) -> list[dict]:
+    """Stored driver standings per round: [{round, race_name, standings: [...]}], ordered by round."""
+    stmt = (
+        select(StandingsSnapshot, Driver.code, RaceEvent.name)
+        .outerjoin(Driver, Driver.id == StandingsSnapshot.driver_id)
+        .outerjoin(
+            RaceEvent,
+            (RaceEvent.season == StandingsSnapshot.season) & (RaceEvent.round == StandingsSnapshot.round),
+        )
+        .where(StandingsSnapshot.season == season, StandingsSnapshot.type == "driver")
+        .order_by(StandingsSnapshot.round, StandingsSnapshot.position)
+    )
+    race_names: dict = {}
+    by_round: dict = defaultdict(list)
+    for snap, code, race_name in db.execute(stmt):
+        race_names[snap.round] = race_name or ""
+        by_round[snap.round].append({
+            "position": snap.position,
+            "points": snap.points,
+            "wins": snap.wins,
+            "driver_id": snap.driver_id,
+            "driver_code": code or "",
+            "constructor_id": snap.constructor_id,
+        })
+    return [
+        {"round": rnd, "race_name": race_names[rnd], "standings": standings}
+        for rnd, standings in by_round.items()
+    ]
@@ -0,0 +1,145 @@
+"""
+Per-lap telemetry persistence — one lap_telemetry row per (session, driver, lap) holding
+every channel as a compressed blob, instead of one telemetry_points row per sample.
+Reading a lap is a single indexed row fetch; no other lap is touched, and several laps
+(a comparison) come back from one query.
+"""
+import logging
+from typing import Optional
+import numpy as np
+from sqlalchemy import delete, exists, select, tuple_
+from sqlalchemy.orm import Session
+from db import dialect_insert
+from models import Driver, Lap, LapTelemetry
+from normalizers.telemetry_codec import decode_lap_blob
+from storage.lap_store import find_session_id
+
+logger = logging.getLogger(__name__)
+
+# Blobs are ~10–20 KB each; keep one executemany batch to a few MB
+INSERT_BATCH_SIZE = 200
+
+
+def session_driver_ids(db: Session, session_id: int, driver_codes) -> dict[str, str]:
+    """drivers.id per code within one ingested session (codes are reused across eras); unknown codes are left out."""
+    stmt = (
+        select(Driver.code, Lap.driver_id)
+        .join(Driver, Driver.id == Lap.driver_id)
+        .where(Lap.session_id == session_id, Driver.code.in_(set(driver_codes)))
+        .distinct()
+    )
+    return {code: driver_id for code, driver_id in db.execute(stmt)}
+
+
+def fastest_lap_numbers(db: Session, session_id: int, driver_ids) -> dict[str, int]:
+    """
+    Per driver id, the lap FastF1's pick_fastest() returns: quickest lap flagged as a
+    personal best. Drivers without one are left out.
+    """
+    stmt = (
+        select(Lap.driver_id, Lap.lap_number)
+        .where(
+            Lap.session_id == session_id,
+            Lap.driver_id.in_(set(driver_ids)),
+            Lap.is_personal_best.is_(True),
+            Lap.lap_time_ms.is_not(None),
+        )
+        .order_by(Lap.lap_time_ms.desc())
+    )
+    # Slowest first, so each driver's quickest lap is written last
+    return {driver_id: lap_number for driver_id, lap_number in db.execute(stmt)}
+
+
+def save_lap_telemetry(
+    db: Session,
+    season: int,
+    round_num: int,
+    session_type: str,
+    laps: list[tuple[str, int, int, bytes]],
+) -> int:
+    """
+    Upsert encoded laps, given as (driver_code, lap_number, samples, encode_lap_blob bytes).
+    Needs the session's laps ingested first (driver ids come from them); laps of unknown
+    drivers are skipped. Returns the number of laps written.
+    """
+    session_id = find_session_id(db, season, round_num, session_type)
+    if session_id is None or not laps:
+        return 0
+    driver_ids = session_driver_ids(db, session_id, (lap[0] for lap in laps))
+    rows = [
+        {"session_id": session_id, "driver_id": driver_ids[code], "lap_number": lap_number,
+         "samples": samples, "data": blob}
+        for code, lap_number, samples, blob in laps
+        if code in driver_ids
+    ]
+    if not rows:
+        return 0
+
+    insert = dialect_insert(db)
+    stmt = insert(LapTelemetry)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["session_id", "driver_id", "lap_number"],
+        set_={"samples": stmt.excluded.samples, "data": stmt.excluded.data},
+    )
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.execute(stmt, rows[start:start + INSERT_BATCH_SIZE])
+    db.commit()
+    return len(rows)
+
+
+def delete_orphaned_telemetry(db: Session, session_id: int) -> int:
+    """Delete a session's stored telemetry of laps no longer in its laps. Does not commit. Returns rows deleted."""
+    lap_stored = exists().where(
+        Lap.session_id == LapTelemetry.session_id,
+        Lap.driver_id == LapTelemetry.driver_id,
+        Lap.lap_number == LapTelemetry.lap_number,
+    )
+    stmt = delete(LapTelemetry).where(LapTelemetry.session_id == session_id, ~lap_stored)
+    return db.execute(stmt.execution_options(synchronize_session=False)).rowcount
+
+
+def load_lap_telemetry_many(
+    db: Session,
+    season: int,
+    round_num: int,
+    session_type: str,
+    laps: list[tuple[str, Optional[int]]],
+) -> list[Optional[tuple[int, dict[str, np.ndarray]]]]:
+    """
+    (lap_number, channels) of each stored (driver_code, lap_number) in laps, in order —
+    channels at their storage dtypes (float32 / small ints) — or None for a lap not
+    stored. A lap_number of None resolves the driver's fastest lap from the stored laps.
+    Every blob comes from one query.
+    """
+    session_id = find_session_id(db, season, round_num, session_type)
+    if session_id is None:
+        return [None] * len(laps)
+    driver_ids = session_driver_ids(db, session_id, (code for code, _ in laps))
+    fastest = fastest_lap_numbers(
+        db, session_id, {driver_ids[code] for code, lap in laps if lap is None and code in driver_ids}
+    )
+    keys = [
+        (driver_ids[code], lap if lap is not None else fastest.get(driver_ids[code])) if code in driver_ids else None
+        for code, lap in laps
+    ]
+    wanted = {key for key in keys if key is not None and key[1] is not None}
+    blobs = {}
+    if wanted:
+        stmt = select(LapTelemetry.driver_id, LapTelemetry.lap_number, LapTelemetry.data).where(
+            LapTelemetry.session_id == session_id,
+            tuple_(LapTelemetry.driver_id, LapTelemetry.lap_number).in_(wanted),
+        )
+        blobs = {(driver_id, lap_number): data for driver_id, lap_number, data in db.execute(stmt)}
+    return [(key[1], decode_lap_blob(blobs[key])) if key in blobs else None for key in keys]
+
+
+def load_lap_telemetry(
+    db: Session,
+    season: int,
+    round_num: int,
+    session_type: str,
+    driver_code: str,
+    lap_number: Optional[int] = None,
+) -> Optional[tuple[int, dict[str, np.ndarray]]]:
+    """load_lap_telemetry_many for a single lap."""
+    return load_lap_telemetry_many(db, season, round_num, session_type, [(driver_code, lap_number)])[0]
@@ -0,0 +1,32 @@
+"""
+Pre-season testing persistence — one summary row per (season, test, day), so a test's
+days are each loaded from FastF1 once and later days merge with the stored ones.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from db import dialect_insert
+from models import TestingDaySummary
+
+
+def load_testing_days(db: Session, season: int, test_number: int) -> dict[int, dict]:
+    """Stored day summaries of a test, keyed by day number."""
+    stmt = select(TestingDaySummary.day, TestingDaySummary.summary).where(
+        TestingDaySummary.season == season, TestingDaySummary.test_number == test_number
+    )
+    return {day: summary for day, summary in db.execute(stmt)}
+
+
+def save_testing_day(db: Session, season: int, test_number: int, day: int, summary: dict) -> None:
+    """Upsert a day's summarize_testing_day output and commit."""
+    stmt = dialect_insert(db)(TestingDaySummary).values(
+        season=season,
+        test_number=test_number,
+        day=day,
+        laps=sum(driver["laps"] for driver in summary["drivers"].values()),
+        summary=summary,
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["season", "test_number", "day"],
+        set_={"laps": stmt.excluded.laps, "summary": stmt.excluded.summary},
+    ))
+    db.commit()
@@ -85,6 +85,25 @@ class TestTeammateDelta(unittest.TestCase):
         self.assertFalse(result["driver_faster"])
         self.assertAlmostEqual(result["delta_ms"], 300.0, delta=0.1)
 
+    def test_qualifying_summary_pairs_every_teammate(self):
+        from analytics.qualifying import qualifying_summary, compute_peak_performance_window
+        entries = [("VER", "Red Bull Racing", 89800.0), ("PER", "Red Bull Racing", 90100.0),
+                   ("HAM", "Mercedes", 90000.0), ("RUS", "Mercedes", 89900.0), ("ALB", "Williams", 90500.0)]
+        laps = [
+            {"driver_id": code, "team": team, "lap_number": i + 1,
+             "lap_time_ms": best + 400 * (2 - i), "session_time_s": 600.0 * (i + 1) + n}
+            for n, (code, team, best) in enumerate(entries)
+            for i in range(3)
+        ]
+        result = qualifying_summary(laps)
+        self.assertEqual(result["peak_window"], compute_peak_performance_window(laps))
+        self.assertEqual(result["drivers"]["VER"]["best_lap_ms"], 89800.0)
+        self.assertEqual(result["drivers"]["HAM"]["peak_window"]["window_start_s"], 1802)
+        self.assertEqual(
+            [(d["team"], d["driver_id"], d["teammate_id"], d["delta_ms"]) for d in result["teammate_deltas"]],
+            [("Mercedes", "HAM", "RUS", 100.0), ("Red Bull Racing", "PER", "VER", 300.0)],
+        )
+
 
 class TestStrategyMetrics(unittest.TestCase):
     def test_pit_timing_efficiency_parses_durations(self):
@@ -100,3 +119,368 @@ class TestStrategyMetrics(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+def _session_laps(drivers=("VER", "NOR", "LEC"), n_laps=12):
+    laps = []
+    for d, driver in enumerate(drivers):
+        for i in range(n_laps):
+            laps.append({
+                "driver_id": driver,
+                "lap_number": i + 1,
+                "lap_time_ms": 90000.0 + d * 150 + i * 40 + (i % 3) * 25,
+                "sector1_ms": 28000.0 + d * 30 - i,
+                "sector2_ms": 31000.0 - d * 40 + i,
+                "sector3_ms": 31000.0 + (i % 4) * 10 - d,
+                "stint": 1 if i < 6 else 2,
+                "compound": "MEDIUM" if i < 6 else "HARD",
+                "track_status": "1",
+                "gap_ahead_s": 0.5 + (i % 5) + d,
+                "session_time_s": 3600.0 + (i + 1) * 91.0 + d * 7,
+                "team": ("Red Bull Racing", "McLaren", "Ferrari")[d % 3],
+            })
+    return laps
+
+
+class TestIncrementalAnalytics(unittest.TestCase):
+    def setUp(self):
+        from cache import local_cache
+        local_cache.clear()
+
+    def _compute(self, laps):
+        from unittest.mock import patch
+        import cache
+        from api.analytics import _compute_session_analytics
+        with patch("api.analytics._session_laps", return_value=laps), \
+                patch("api.analytics.cache_set_many", wraps=cache.cache_set_many) as cache_set:
+            result = _compute_session_analytics(2025, 1, "R")
+        computed = set(cache_set.call_args[0][0]) if cache_set.called else set()
+        return result, computed
+
+    def test_matches_whole_session_functions(self):
+        from analytics.consistency import compute_consistency_per_driver
+        from analytics.degradation import compute_degradation_slope
+        from analytics.pace import estimate_clean_air_baseline, estimate_traffic_loss
+        from analytics.qualifying import sector_dominance, compute_track_evolution
+        laps = _session_laps()
+        result, _ = self._compute(laps)
+        baseline = estimate_clean_air_baseline(laps)
+        self.assertEqual(result["consistency_per_driver"], compute_consistency_per_driver(laps))
+        self.assertEqual(result["degradation_slopes"], compute_degradation_slope(laps))
+        self.assertEqual(result["clean_air_baseline_ms"], baseline)
+        self.assertEqual(result["traffic_loss_ms"], estimate_traffic_loss(laps, baseline))
+        self.assertEqual(result["sector_dominance"], sector_dominance(laps))
+        self.assertEqual(
+            result["track_evolution"],
+            compute_track_evolution(laps),
+        )
+
+    def test_only_changed_driver_recomputes(self):
+        laps = _session_laps()
+        first, computed = self._compute(laps)
+        self.assertEqual(len(computed), 3 * 4 + 1)  # 4 units per driver + session pace
+
+        # A late lap deletion for one driver
+        changed = [l for l in laps if not (l["driver_id"] == "NOR" and l["lap_number"] == 7)]
+        second, computed = self._compute(changed)
+        self.assertEqual(len(computed), 4 + 1)
+        self.assertEqual(second["consistency_per_driver"]["VER"], first["consistency_per_driver"]["VER"])
+        self.assertNotEqual(second["degradation_slopes"]["NOR"], first["degradation_slopes"]["NOR"])
+
+        _, computed = self._compute(changed)
+        self.assertEqual(computed, set())
+
+    def test_session_result_kept_briefly_until_final(self):
+        from unittest.mock import patch
+        from api.analytics import FINAL_SESSION_TTL_S, LIVE_SESSION_TTL_S, get_session_analytics
+        from cache import cache_key, cache_set
+        laps = _session_laps()
+
+        def cached_ttl():
+            with patch("api.analytics._session_laps", return_value=laps), \
+                    patch("cache.cache_set_json") as cache_set_json:
+                get_session_analytics(2025, 1, "R")
+            return cache_set_json.call_args[0][2]
+
+        self.assertEqual(cached_ttl(), LIVE_SESSION_TTL_S)  # calendar not cached: not known to be final
+        calendar = {"season": 2025, "events": [{"round": 1, "sessions": {"R": "2025-03-16T04:00:00Z"}}]}
+        cache_set(cache_key("calendar", 2025), calendar)
+        self.assertEqual(cached_ttl(), FINAL_SESSION_TTL_S)
+
+    def test_session_type_case_shares_one_cache_entry(self):
+        from unittest.mock import patch
+        from api.analytics import get_session_analytics
+        from cache import cache_key
+        with patch("api.analytics.get_or_compute_json", return_value=b"{}") as cached:
+            get_session_analytics(2025, 5, "r")
+        self.assertEqual(cached.call_args[0][0], cache_key("analytics", 2025, 5, "R"))
+
+    def test_metric_and_driver_filters(self):
+        from unittest.mock import patch
+        from fastapi import HTTPException
+        from api.analytics import get_session_analytics
+        from cache import dumps_json
+        result, _ = self._compute(_session_laps())
+        body = dumps_json(result)
+        with patch("api.analytics.get_or_compute_json", return_value=body):
+            selected = get_session_analytics(2025, 1, "R", metrics="consistency_per_driver,sector_dominance", drivers="ver")
+            self.assertEqual(set(selected), {"season", "round", "session_type", "consistency_per_driver", "sector_dominance"})
+            self.assertEqual(list(selected["consistency_per_driver"]), ["VER"])
+            self.assertEqual(selected["sector_dominance"], result["sector_dominance"])
+            self.assertIs(get_session_analytics(2025, 1, "R").body, body)
+            with self.assertRaises(HTTPException):
+                get_session_analytics(2025, 1, "R", metrics="top_speed")
+
+
+def _random_laps(seed, n_drivers=6, n_laps=40):
+    """Lap records with the gaps real sessions have: missing times, neutralised laps, unknown stints."""
+    import random
+    rng = random.Random(seed)
+    laps = []
+    for d in range(n_drivers):
+        driver = f"D{d:02d}" if d else ""
+        for i in range(n_laps):
+            stint = 1 + i // 15
+            lap = {
+                "driver_id": driver,
+                "lap_number": i + 1,
+                "lap_time_ms": round(90000 + i * 35 + rng.gauss(0, 400), 3) if rng.random() > 0.05 else None,
+                "sector1_ms": round(28000 + rng.gauss(0, 150), 3) if rng.random() > 0.05 else None,
+                "sector2_ms": round(31000 + rng.gauss(0, 150), 3),
+                "sector3_ms": None if rng.random() < 0.1 else round(31000 + rng.gauss(0, 150), 3),
+                "stint": stint if rng.random() > 0.03 else None,
+                "compound": ["SOFT", "MEDIUM", "HARD"][stint % 3] if rng.random() > 0.05 else None,
+                "track_status": rng.choice(["1", "1", "1", "12", "4", "", "26", None]),
+                "gap_ahead_s": round(rng.uniform(0, 4), 3) if rng.random() > 0.1 else None,
+                "session_time_s": round(3600 + i * 91 + rng.uniform(0, 30), 3) if rng.random() > 0.05 else None,
+            }
+            if rng.random() < 0.02:
+                lap["lap_time_ms"] = 30000.0  # outlier
+            laps.append(lap)
+    rng.shuffle(laps)
+    return laps
+
+
+class TestAnalyticsEngine(unittest.TestCase):
+    """The columnar engine against the per-metric reference functions."""
+
+    def test_per_driver_metrics_match(self):
+        from analytics import engine
+        from analytics.consistency import compute_consistency_per_driver
+        from analytics.degradation import compute_degradation_slope
+        from analytics.qualifying import driver_sector_bests, compute_track_evolution
+        for seed in range(5):
+            laps = _random_laps(seed)
+            columns = engine.lap_columns(laps)
+            self.assertEqual(engine.consistency_per_driver(columns), compute_consistency_per_driver(laps))
+            self.assertEqual(engine.sector_bests(columns), driver_sector_bests(laps))
+
+            expected = compute_degradation_slope(laps)
+            actual = engine.degradation_slopes(columns)
+            self.assertEqual(list(actual), list(expected))
+            for driver, stints in expected.items():
+                self.assertEqual(len(actual[driver]), len(stints))
+                for got, want in zip(actual[driver], stints):
+                    self.assertEqual({k: got[k] for k in ("stint", "compound", "lap_count", "median_time_ms")},
+                                     {k: want[k] for k in ("stint", "compound", "lap_count", "median_time_ms")})
+                    if want["slope_ms_per_lap"] is None:
+                        self.assertIsNone(got["slope_ms_per_lap"])
+                    else:
+                        self.assertAlmostEqual(got["slope_ms_per_lap"], want["slope_ms_per_lap"], delta=0.002)
+
+            curves = engine.track_evolution_per_driver(columns, columns["session_time_s"])
+            for driver in {lap["driver_id"] for lap in laps}:
+                driver_laps = [l for l in laps if l["driver_id"] == driver]
+                self.assertEqual(curves[driver], compute_track_evolution(driver_laps))
+
+    def test_session_metrics_match(self):
+        from analytics import engine
+        from analytics.pace import estimate_clean_air_baseline, estimate_traffic_loss
+        for seed in range(5):
+            laps = _random_laps(seed)
+            columns = engine.lap_columns(laps)
+            baseline = estimate_clean_air_baseline(laps)
+            self.assertEqual(engine.clean_air_baseline(columns), baseline)
+            self.assertEqual(engine.traffic_loss(columns, baseline), estimate_traffic_loss(laps, baseline))
+
+    def test_empty_laps(self):
+        from analytics import engine
+        columns = engine.lap_columns([])
+        self.assertEqual(engine.consistency_per_driver(columns), {})
+        self.assertEqual(engine.degradation_slopes(columns), {})
+        self.assertIsNone(engine.clean_air_baseline(columns))
+
+
+class TestSeasonEndpoints(unittest.TestCase):
+    def test_season_range_and_rollup_answers(self):
+        from unittest.mock import patch
+        from fastapi import HTTPException
+        from analytics.rollups import encode_sketch
+        from api.analytics import get_season_degradation, get_season_consistency, _parse_seasons
+        self.assertEqual(_parse_seasons("2023-2025"), [2023, 2024, 2025])
+        for bad in ("2025-2023", "twenty", "2000-2025"):
+            with self.assertRaises(HTTPException):
+                _parse_seasons(bad)
+
+        # One driver, two rounds: 5 laps at tyre age 0..4, +40 ms per lap on top of a per-round offset
+        rows = []
+        for round_num, offset in ((1, 0.0), (2, 1500.0)):
+            times = [90000.0 + offset + 40 * x for x in range(5)]
+            rows.append({
+                "season": 2025, "round": round_num, "driver_id": "VER", "compound": "HARD",
+                "laps": 5, "sum_ms": sum(times), "sum_sq_ms": sum(t * t for t in times),
+                "sum_x": 10.0, "sum_xx": 30.0, "sum_xy": sum(x * t for x, t in enumerate(times)),
+                "sketch": encode_sketch(times),
+            })
+        with patch("api.analytics.load_season_rollups", return_value=rows) as load:
+            degradation = get_season_degradation("2025", session_type="r", driver="ver")
+            consistency = get_season_consistency("2024-2025")
+        load.assert_called_with([2024, 2025], "R", None)
+        hard = degradation["compounds"][0]
+        self.assertAlmostEqual(hard["slope_ms_per_lap"], 40.0, places=3)  # round offsets do not leak in
+        self.assertEqual((hard["laps"], hard["rounds"], degradation["rounds"]), (10, 2, 2))
+        points = consistency["drivers"]["VER"]
+        self.assertEqual([p["round"] for p in points], [1, 2])
+        self.assertEqual(points[1]["median_time_ms"], 91580.0)
+
+
+class TestQuantileSketch(unittest.TestCase):
+    def _rank_error(self, sketch, ordered):
+        import numpy as np
+        worst = 0.0
+        for q in np.linspace(0.01, 0.99, 99):
+            rank = np.searchsorted(ordered, sketch.quantile(q), side="right") / len(ordered)
+            worst = max(worst, abs(rank - q))
+        return worst
+
+    def test_exact_below_capacity(self):
+        import statistics
+        from analytics.sketch import QuantileSketch
+        times = [90512.0, 90100.5, 91877.25, 90333.0, 95000.0, 90250.0]
+        sketch = QuantileSketch()
+        sketch.update_many(times + [None, float("nan")])
+        self.assertTrue(sketch.exact)
+        self.assertEqual(sketch.n, 6)
+        self.assertEqual(sketch.median(), statistics.median(times))
+        self.assertEqual((sketch.quantile(0), sketch.quantile(1)), (min(times), max(times)))
+        self.assertIsNone(QuantileSketch().median())
+
+    def test_merged_sketches_within_documented_bound(self):
+        """A season's worth of laps in 200 per-session sketches, merged: rank error ≤ 2%."""
+        import numpy as np
+        from analytics.sketch import QuantileSketch
+        data = np.random.default_rng(7).lognormal(np.log(90000), 0.04, 100_000)
+        parts = []
+        for i in range(200):
+            part = QuantileSketch(seed=i)
+            part.update_many(data[i * 500:(i + 1) * 500])
+            parts.append(QuantileSketch.from_bytes(part.to_bytes()))
+        merged = QuantileSketch.merged(parts, seed=0)
+        self.assertEqual(merged.n, len(data))
+        self.assertFalse(merged.exact)
+        self.assertLessEqual(self._rank_error(merged, np.sort(data)), 0.02)
+        self.assertLess(sum(map(len, merged.levels)), 3 * merged.k + 100)  # bounded memory
+
+        streamed = QuantileSketch(seed=1)
+        for chunk in np.array_split(data, 50):
+            streamed.update_many(chunk)
+        self.assertLessEqual(self._rank_error(streamed, np.sort(data)), 0.02)
+
+    def test_serialization_roundtrip(self):
+        from analytics.sketch import QuantileSketch
+        sketch = QuantileSketch(k=64, seed=3)
+        sketch.update_many(float(i % 997) for i in range(20_000))
+        restored = QuantileSketch.from_bytes(sketch.to_bytes())
+        self.assertEqual((restored.k, restored.n, restored.min, restored.max), (64, 20_000, 0.0, 996.0))
+        self.assertEqual(restored.quantiles((0.1, 0.5, 0.9)), sketch.quantiles((0.1, 0.5, 0.9)))
+        self.assertLess(len(sketch.to_bytes()), 4096)
+        with self.assertRaises(ValueError):
+            QuantileSketch.from_bytes(b"XXXX" + sketch.to_bytes()[4:])
+
+
+class TestTestingAnalytics(unittest.TestCase):
+    def test_merged_days_match_whole_test(self):
+        from analytics.testing import (
+            summarize_testing_day, merge_testing_days, cluster_long_runs, compute_stability_index,
+        )
+        days = {day: _random_laps(day) for day in (1, 2, 3)}
+        merged = merge_testing_days({day: summarize_testing_day(laps) for day, laps in days.items()})
+        self.assertEqual(merged["days"], [1, 2, 3])
+        self.assertEqual(
+            [{k: v for k, v in c.items() if k != "day"} for c in merged["long_runs"]],
+            [c for laps in days.values() for c in cluster_long_runs(laps)],
+        )
+
+        by_driver: dict = {}
+        for laps in days.values():
+            for lap in laps:
+                by_driver.setdefault(lap["driver_id"], []).append(lap)
+        stability = compute_stability_index(by_driver)
+        self.assertEqual(set(merged["stability_index"]), set(stability) - {""})  # unnamed laps are skipped
+        for driver in merged["stability_index"]:
+            self.assertAlmostEqual(merged["stability_index"][driver], stability[driver], delta=0.11)  # both rounded to 0.1
+        self.assertEqual(merged["drivers"]["D01"]["laps"], sum(1 for l in by_driver["D01"] if l["lap_time_ms"]))
+
+    def test_new_day_does_not_reload_stored_days(self):
+        from unittest.mock import patch
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from models import Base
+        from analytics.testing import summarize_testing_day
+        from api.testing import get_testing_analytics
+        from cache import local_cache, loads_json
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        summaries = {day: summarize_testing_day(_random_laps(day)) for day in (1, 2, 3)}
+        available = {1: (summaries[1], True), 2: (summaries[2], True)}
+
+        with patch("api.testing.SessionLocal", sessionmaker(bind=engine)), \
+                patch("api.testing.fetch_testing_day", side_effect=lambda s, t, d: available.get(d)) as fetch:
+            local_cache.clear()
+            self.assertEqual(loads_json(get_testing_analytics(2025, test_number=1).body)["days"], [1, 2])
+            self.assertEqual([c.args[2] for c in fetch.call_args_list], [1, 2, 3])
+
+            available[3] = (summaries[3], True)
+            fetch.reset_mock()
+            local_cache.clear()
+            result = loads_json(get_testing_analytics(2025, test_number=1).body)
+        self.assertEqual([c.args[2] for c in fetch.call_args_list], [3])
+        self.assertEqual(result["days"], [1, 2, 3])
+        self.assertTrue(result["complete"])
+        self.assertEqual({c["day"] for c in result["long_runs"]}, {1, 2, 3})
+
+    def test_running_day_is_shown_but_not_stored(self):
+        from unittest.mock import patch
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from models import Base
+        from analytics.testing import summarize_testing_day
+        from api.testing import get_testing_analytics
+        from cache import local_cache, loads_json
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        morning = summarize_testing_day(_random_laps(1)[:40])
+        available = {1: (morning, False)}
+
+        with patch("api.testing.SessionLocal", sessionmaker(bind=engine)), \
+                patch("api.testing.fetch_testing_day", side_effect=lambda s, t, d: available.get(d)) as fetch:
+            local_cache.clear()
+            result = loads_json(get_testing_analytics(2025, test_number=1).body)
+            self.assertEqual((result["days"], result["complete"]), ([1], False))
+
+            # Day 1 finishes: it is read again, now in full, and stored
+            whole_day = summarize_testing_day(_random_laps(1))
+            available[1] = (whole_day, True)
+            fetch.reset_mock()
+            local_cache.clear()
+            result = loads_json(get_testing_analytics(2025, test_number=1).body)
+            self.assertEqual([c.args[2] for c in fetch.call_args_list], [1, 2, 3])
+            self.assertEqual(
+                sum(d["laps"] for d in result["drivers"].values()),
+                sum(d["laps"] for d in whole_day["drivers"].values()),
+            )
+
+            fetch.reset_mock()
+            local_cache.clear()
+            get_testing_analytics(2025, test_number=1)
+        self.assertEqual([c.args[2] for c in fetch.call_args_list], [2, 3])
@@ -0,0 +1,407 @@
+"""Backend unit tests — cache layer."""
+import json
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis commands the cache layer uses (TTLs ignored)."""
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        with self.lock:
+            self.data[key] = value
+
+    def set(self, key, value, nx=False, ex=None):
+        with self.lock:
+            if nx and key in self.data:
+                return None
+            self.data[key] = value
+            return True
+
+    def ttl(self, key):
+        return -1 if key in self.data else -2
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def exists(self, key):
+        with self.lock:
+            return int(key in self.data)
+
+    def delete(self, key):
+        with self.lock:
+            return int(self.data.pop(key, None) is not None)
+
+    def eval(self, script, numkeys, key, token):
+        # Only the compare-and-delete lease release script is used
+        with self.lock:
+            if self.data.get(key) == token:
+                del self.data[key]
+                return 1
+            return 0
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class RedisTestCase(unittest.TestCase):
+    """Routes both cache clients to one FakeRedis and starts with an empty local tier."""
+
+    def setUp(self):
+        from cache import local_cache
+        self.redis = FakeRedis()
+        for target in ("cache.get_redis_client", "cache.get_redis_binary_client"):
+            patcher = patch(target, return_value=self.redis)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        local_cache.clear()
+
+
+class TestSingleFlight(RedisTestCase):
+    def test_hit_skips_compute(self):
+        from cache import get_or_compute
+        self.redis.data["k-hit"] = json.dumps({"v": 1})
+        compute = MagicMock()
+        self.assertEqual(get_or_compute("k-hit", compute), {"v": 1})
+        compute.assert_not_called()
+
+    def test_concurrent_misses_compute_once(self):
+        from cache import get_or_compute
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"v": 42}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get_or_compute("k-herd", compute)))
+            for _ in range(10)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"v": 42}] * 10)
+        self.assertNotIn("k-herd:lease", self.redis.data)
+
+    def test_error_propagates_to_waiters_and_is_not_cached(self):
+        from cache import get_or_compute
+
+        def compute():
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        errors = []
+
+        def call():
+            try:
+                get_or_compute("k-err", compute)
+            except ValueError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(errors), 4)
+        self.assertNotIn("k-err", self.redis.data)
+
+    def test_waits_for_other_worker_lease(self):
+        from cache import get_or_compute
+        self.redis.data["k-remote:lease"] = "other-worker"
+
+        def other_worker_finishes():
+            time.sleep(0.1)
+            self.redis.data["k-remote"] = json.dumps({"from": "other"})
+            self.redis.delete("k-remote:lease")
+
+        threading.Thread(target=other_worker_finishes).start()
+        compute = MagicMock(return_value={"from": "me"})
+        self.assertEqual(get_or_compute("k-remote", compute), {"from": "other"})
+        compute.assert_not_called()
+
+    def test_takes_over_when_other_worker_drops_lease(self):
+        from cache import get_or_compute
+        self.redis.data["k-dropped:lease"] = "other-worker"
+
+        def other_worker_fails():
+            time.sleep(0.1)
+            self.redis.delete("k-dropped:lease")
+
+        threading.Thread(target=other_worker_fails).start()
+        self.assertEqual(get_or_compute("k-dropped", lambda: {"from": "me"}), {"from": "me"})
+
+
+class TestJsonBodies(RedisTestCase):
+    def test_hit_returns_cached_bytes_without_compute(self):
+        from cache import get_or_compute_json, local_cache, loads_json
+        import numpy as np
+        value = {"speed": np.arange(3, dtype=np.float32), "laps": {1: "a"}, "n": np.int64(7)}
+        compute = MagicMock(return_value=value)
+        with patch.object(self.redis, "setex", wraps=self.redis.setex) as setex:
+            body = get_or_compute_json("k-json", compute, ttl_seconds=lambda v: 60 if v["n"] == 7 else 1)
+        self.assertEqual(loads_json(body), {"speed": [0.0, 1.0, 2.0], "laps": {"1": "a"}, "n": 7})
+        self.assertEqual(setex.call_args.args[:2], ("k-json", 60))
+
+        local_cache.clear()  # served from Redis, byte for byte
+        self.assertEqual(get_or_compute_json("k-json", compute), body)
+        compute.assert_called_once()
+
+    def test_large_bodies_compressed_in_redis_only(self):
+        from cache import cache_get_json, cache_set_json, local_cache, compression_available
+        body = b'{"telemetry":[' + b",".join(b"123.5" for _ in range(5000)) + b"]}"
+        cache_set_json("k-big", body, 60)
+        self.assertIs(cache_get_json("k-big"), body)
+        if compression_available():
+            self.assertLess(len(self.redis.data["k-big"]), len(body))
+        local_cache.clear()
+        self.assertEqual(cache_get_json("k-big"), body)
+
+    def test_value_cached_by_cache_set_is_a_miss(self):
+        from cache import cache_set, cache_get_json, local_cache, compression_available
+        if not compression_available():
+            self.skipTest("msgpack/zstandard not installed")
+        cache_set("k-old", {"x": list(range(5000))}, 60)
+        local_cache.clear()
+        self.assertIsNone(cache_get_json("k-old"))
+
+
+class TestAsyncSingleFlight(RedisTestCase):
+    def test_concurrent_async_misses_compute_once(self):
+        import asyncio
+        from cache import aget_or_compute
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"v": 1}
+
+        async def herd():
+            return await asyncio.gather(*(aget_or_compute("k-async", compute) for _ in range(10)))
+
+        self.assertEqual(asyncio.run(herd()), [{"v": 1}] * 10)
+        self.assertEqual(len(calls), 1)
+
+    def test_waiters_recompute_when_the_leader_is_cancelled(self):
+        import asyncio
+        from cache import aget_or_compute
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return {"v": len(calls)}
+
+        async def herd():
+            leader = asyncio.create_task(aget_or_compute("k-cancelled", compute))
+            await asyncio.sleep(0.01)
+            waiters = [asyncio.create_task(aget_or_compute("k-cancelled", compute)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()  # e.g. its client disconnected
+            with self.assertRaises(asyncio.CancelledError):
+                await leader
+            return await asyncio.gather(*waiters)
+
+        self.assertEqual(asyncio.run(herd()), [{"v": 2}] * 3)
+        self.assertEqual(len(calls), 2)  # one waiter took over, the others waited on it
+
+
+class TestHTTPCaching(RedisTestCase):
+    EVENTS = [
+        {"round": 1, "sessions": {"Q": "2025-03-15T05:00:00Z", "R": "2025-03-16T04:00:00Z"}},
+        {"round": 2, "sessions": {"R": "2025-03-23T07:00:00Z"}},
+    ]
+
+    def _client(self, calls):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from http_caching import HTTPCacheMiddleware
+        app = FastAPI()
+        app.add_middleware(HTTPCacheMiddleware)
+
+        @app.get("/analytics/{season}/{round_num}/{session_type}")
+        def analytics(season: int, round_num: int, session_type: str):
+            calls.append(round_num)
+            return {"round": round_num}
+
+        @app.get("/standings")
+        def standings():
+            return {"drivers": []}
+
+        return TestClient(app)
+
+    def test_final_session_is_immutable_and_revalidates_without_the_route(self):
+        from datetime import datetime
+        calls = []
+        client = self._client(calls)
+        with patch("http_caching._season_events", return_value=self.EVENTS), \
+                patch("http_caching._utcnow", return_value=datetime(2025, 3, 21)):
+            first = client.get("/analytics/2025/1/R")
+            self.assertEqual(first.headers["cache-control"], "public, max-age=31536000, immutable")
+            etag = first.headers["etag"]
+            again = client.get("/analytics/2025/1/R", headers={"If-None-Match": etag})
+            # Round 2 has not been raced yet: short-lived
+            upcoming = client.get("/analytics/2025/2/R")
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(again.headers["etag"], etag)
+        self.assertEqual(calls, [1, 2])
+        self.assertIn("stale-while-revalidate=", upcoming.headers["cache-control"])
+
+    def test_live_resource_and_changed_body(self):
+        client = self._client([])
+        response = client.get("/standings")
+        self.assertIn("max-age=60", response.headers["cache-control"])
+        stale = client.get("/standings", headers={"If-None-Match": '"0000"'})
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(client.get("/standings", headers={"If-None-Match": f"W/{response.headers['etag']}"}).status_code, 304)
+        self.assertNotIn("etag", client.get("/docs").headers)
+
+
+class TestCompression(RedisTestCase):
+    def test_negotiation(self):
+        from compression import negotiate_encoding, CODECS
+        self.assertEqual(negotiate_encoding("gzip, deflate"), "gzip")
+        self.assertEqual(negotiate_encoding("gzip;q=1.0, identity; q=0.5, *;q=0"), "gzip")
+        self.assertEqual(negotiate_encoding("*"), next(iter(CODECS)))
+        self.assertIsNone(negotiate_encoding("deflate, gzip;q=0"))
+        self.assertIsNone(negotiate_encoding(None))
+
+    def test_large_json_compressed_and_immutable_variants_cached(self):
+        import gzip
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from compression import CompressionMiddleware
+        from http_caching import HTTPCacheMiddleware
+        from responses import ORJSONResponse
+        app = FastAPI(default_response_class=ORJSONResponse)
+        app.add_middleware(HTTPCacheMiddleware)
+        app.add_middleware(CompressionMiddleware)
+        payload = {"telemetry": [{"distance": i, "throttle": 100, "gear": 8} for i in range(500)]}
+        app.get("/standings")(lambda: payload)
+        app.get("/calendar")(lambda: {"season": 2025})
+        client = TestClient(app)
+
+        with patch("compression.gzip.compress", wraps=gzip.compress) as compress:
+            first = client.get("/standings", headers={"Accept-Encoding": "gzip"})
+            second = client.get("/standings", headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(compress.call_count, 2)  # live: no variant is kept
+            with patch("http_caching.cache_policy", return_value=("public, max-age=31536000, immutable", 60)):
+                for _ in range(2):
+                    client.get("/standings", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(compress.call_count, 3)
+        self.assertEqual(first.headers["content-encoding"], "gzip")
+        self.assertLess(int(first.headers["content-length"]), len(first.content) // 4)
+        self.assertEqual(second.json(), payload)
+        self.assertTrue(first.headers["etag"].startswith('W/"'))
+        self.assertIn("Accept-Encoding", first.headers["vary"])
+
+        revalidated = client.get("/standings", headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["etag"]})
+        self.assertEqual(revalidated.status_code, 304)
+        small = client.get("/calendar", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("content-encoding", small.headers)
+        self.assertNotIn("content-encoding", client.get("/standings", headers={"Accept-Encoding": "identity"}).headers)
+
+
+class TestLocalCache(unittest.TestCase):
+    def test_lru_eviction_by_bytes(self):
+        from cache import LocalCache
+        lc = LocalCache(max_bytes=100, max_ttl_seconds=60)
+        lc.set("a", "A", 40, 60)
+        lc.set("b", "B", 40, 60)
+        lc.get("a")  # a is now most recent
+        lc.set("c", "C", 40, 60)
+        self.assertEqual(lc.get("a"), "A")
+        self.assertIsNone(lc.get("b"))
+        self.assertEqual(lc.stats()["evictions"], 1)
+
+    def test_entries_expire(self):
+        from cache import LocalCache
+        lc = LocalCache(max_bytes=100, max_ttl_seconds=60)
+        lc.set("a", "A", 1, 0.05)
+        self.assertEqual(lc.get("a"), "A")
+        time.sleep(0.06)
+        self.assertIsNone(lc.get("a"))
+
+    def test_oversized_value_not_stored(self):
+        from cache import LocalCache
+        lc = LocalCache(max_bytes=10, max_ttl_seconds=60)
+        lc.set("a", "A", 11, 60)
+        self.assertIsNone(lc.get("a"))
+
+
+class TestTwoTierCache(RedisTestCase):
+    def test_large_values_roundtrip_compressed(self):
+        from cache import encode_value, decode_value, compression_available
+        value = {"telemetry": [{"speed": 280.5 + i, "gear": 7} for i in range(2000)]}
+        raw = encode_value(value)
+        if compression_available():
+            self.assertLess(len(raw), len(json.dumps(value)) // 4)
+        self.assertEqual(decode_value(raw), value)
+
+    def test_small_values_stay_json(self):
+        from cache import encode_value
+        self.assertEqual(json.loads(encode_value({"a": 1})), {"a": 1})
+
+    def test_redis_hit_fills_local_tier(self):
+        from cache import cache_get, cache_stats
+        self.redis.data["k-tier"] = json.dumps({"v": 1}).encode()
+        self.assertEqual(cache_get("k-tier"), {"v": 1})
+        del self.redis.data["k-tier"]
+        self.assertEqual(cache_get("k-tier"), {"v": 1})  # served locally
+        self.assertGreaterEqual(cache_stats()["local"]["hits"], 1)
+
+    def test_set_writes_both_tiers(self):
+        from cache import cache_set, decode_value, local_cache
+        cache_set("k-both", {"v": 2})
+        self.assertEqual(decode_value(self.redis.data["k-both"]), {"v": 2})
+        self.assertEqual(decode_value(local_cache.get("k-both")), {"v": 2})
+
+    def test_local_hits_are_independent_copies(self):
+        from cache import cache_set, cache_get, local_cache
+        value = {"laps": list(range(3000))}
+        cache_set("k-copy", value)
+        self.assertEqual(local_cache.stats()["mb"], round(len(self.redis.data["k-copy"]) / 1048576, 2))
+        first = cache_get("k-copy")
+        first["laps"].clear()
+        self.assertEqual(cache_get("k-copy"), value)
+
+    def test_namespace_version_changes_key(self):
+        from cache import cache_key, settings
+        before = cache_key("analytics", 2024, 1, "R")
+        with patch.dict(settings.CACHE_NAMESPACE_VERSIONS, {"analytics": 7}):
+            after = cache_key("analytics", 2024, 1, "R")
+            self.assertEqual(cache_key("standings", 2024), cache_key("standings", 2024))
+        self.assertNotEqual(before, after)
+        self.assertIn("analytics.v7", after)
+
+
+if __name__ == "__main__":
+    unittest.main()
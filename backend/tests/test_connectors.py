@@ -1,5 +1,4 @@
 """Backend unit tests — connectors."""
-import json
 import unittest
 from unittest.mock import patch, MagicMock
 
@@ -58,42 +57,65 @@ MOCK_CONSTRUCTOR_STANDINGS_RESPONSE = {
 }
 
 
-class TestStandingsConnector(unittest.TestCase):
-    @patch("connectors.standings_connector.httpx.Client")
-    def test_get_driver_standings_parses_correctly(self, mock_client_class):
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = MOCK_DRIVER_STANDINGS_RESPONSE
-        mock_resp.raise_for_status.return_value = None
-        mock_client = MagicMock()
-        mock_client.__enter__.return_value.get.return_value = mock_resp
-        mock_client_class.return_value = mock_client
+class MockUpstream:
+    """Routes connector traffic through httpx.MockTransport; records requested URLs."""
 
+    def __init__(self, responses):
+        import httpx
+        self.responses = responses  # url suffix → JSON body, status code, or list of either
+        self.requests = []
+        self.transport = httpx.MockTransport(self._handle)
+
+    def _handle(self, request):
+        import httpx
+        url = str(request.url)
+        self.requests.append(url)
+        for suffix, reply in self.responses.items():
+            if url.endswith(suffix):
+                if isinstance(reply, list):
+                    reply = reply.pop(0) if len(reply) > 1 else reply[0]
+                if isinstance(reply, int):
+                    return httpx.Response(reply)
+                return httpx.Response(200, json=reply)
+        return httpx.Response(404)
+
+
+class ConnectorTestCase(unittest.IsolatedAsyncioTestCase):
+    def use_upstream(self, responses) -> MockUpstream:
+        from connectors import http_transport
+        upstream = MockUpstream(responses)
+        http_transport.set_transport(upstream.transport)
+        self.addCleanup(http_transport.set_transport, None)
+        patcher = patch.object(http_transport, "BACKOFF_BASE_S", 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return upstream
+
+    async def asyncTearDown(self):
+        from connectors.http_transport import close_client
+        await close_client()
+
+
+class TestStandingsConnector(ConnectorTestCase):
+    async def test_get_driver_standings_parses_correctly(self):
+        self.use_upstream({"/2024/driverStandings.json": MOCK_DRIVER_STANDINGS_RESPONSE})
         from connectors.standings_connector import get_driver_standings
-        result = get_driver_standings(2024)
+        result, round_num = await get_driver_standings(2024)
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0]["Driver"]["driverId"], "verstappen")
         self.assertEqual(result[0]["points"], "331")
 
-    @patch("connectors.standings_connector.httpx.Client")
-    def test_get_constructor_standings_parses_correctly(self, mock_client_class):
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = MOCK_CONSTRUCTOR_STANDINGS_RESPONSE
-        mock_resp.raise_for_status.return_value = None
-        mock_client = MagicMock()
-        mock_client.__enter__.return_value.get.return_value = mock_resp
-        mock_client_class.return_value = mock_client
-
+    async def test_get_constructor_standings_parses_correctly(self):
+        self.use_upstream({"/2024/constructorStandings.json": MOCK_CONSTRUCTOR_STANDINGS_RESPONSE})
         from connectors.standings_connector import get_constructor_standings
-        result = get_constructor_standings(2024)
+        result = await get_constructor_standings(2024)
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0]["Constructor"]["constructorId"], "red_bull")
 
 
-class TestCalendarConnector(unittest.TestCase):
-    @patch("connectors.calendar_connector.httpx.Client")
-    def test_sprint_detection(self, mock_client_class):
-        mock_resp = MagicMock()
-        mock_resp.json.return_value = {
+class TestCalendarConnector(ConnectorTestCase):
+    async def test_sprint_detection(self):
+        self.use_upstream({"/2024.json": {
             "MRData": {
                 "RaceTable": {
                     "Races": [
@@ -107,22 +129,630 @@ class TestCalendarConnector(unittest.TestCase):
                                 "Location": {"locality": "Miami", "country": "USA"},
                             },
                             "date": "2024-05-05",
-                            "Sprint": {"date": "2024-05-04"},  # sprint weekend flag
+                            "time": "20:00:00Z",
+                            "Sprint": {"date": "2024-05-04", "time": "16:00:00Z"},  # sprint weekend flag
+                            "Qualifying": {"date": "2024-05-04", "time": "20:00:00Z"},
                         }
                     ]
                 }
             }
-        }
-        mock_resp.raise_for_status.return_value = None
-        mock_client = MagicMock()
-        mock_client.__enter__.return_value.get.return_value = mock_resp
-        mock_client_class.return_value = mock_client
-
+        }})
         from connectors.calendar_connector import get_calendar
-        events = get_calendar(2024)
+        events = await get_calendar(2024)
         self.assertEqual(len(events), 1)
         self.assertTrue(events[0]["is_sprint"])
         self.assertEqual(events[0]["name"], "Miami Grand Prix")
+        self.assertEqual(events[0]["sessions"], {
+            "S": "2024-05-04T16:00:00Z", "Q": "2024-05-04T20:00:00Z", "R": "2024-05-05T20:00:00Z",
+        })
+
+
+class TestHttpTransport(ConnectorTestCase):
+    async def test_retries_server_errors(self):
+        upstream = self.use_upstream({"/x.json": [503, {"ok": True}]})
+        from connectors.http_transport import fetch_json, BASE_URL
+        self.assertEqual(await fetch_json(f"{BASE_URL}/x.json"), {"ok": True})
+        self.assertEqual(len(upstream.requests), 2)
+
+    async def test_does_not_retry_not_found(self):
+        upstream = self.use_upstream({})
+        from connectors.http_transport import fetch_json, BASE_URL, ConnectorError
+        with self.assertRaises(ConnectorError):
+            await fetch_json(f"{BASE_URL}/missing.json")
+        self.assertEqual(len(upstream.requests), 1)
+
+    async def test_connectors_share_error_type(self):
+        from connectors import calendar_connector, results_connector, standings_connector
+        self.assertIs(calendar_connector.ConnectorError, standings_connector.ConnectorError)
+        self.assertIs(results_connector.ConnectorError, standings_connector.ConnectorError)
+
+
+class TestStandingsProgression(ConnectorTestCase):
+    def _calendar(self):
+        return [
+            {"round": 1, "name": "Bahrain Grand Prix", "date": "2024-03-02"},
+            {"round": 2, "name": "Saudi Arabian Grand Prix", "date": "2024-03-09"},
+            {"round": 3, "name": "Australian Grand Prix", "date": "2024-03-24"},
+            {"round": 4, "name": "Future Grand Prix", "date": "2999-01-01"},
+        ]
+
+    async def test_fetches_only_new_completed_rounds(self):
+        upstream = self.use_upstream({
+            "/2024/2/driverStandings.json": MOCK_DRIVER_STANDINGS_RESPONSE,
+            "/2024/3/driverStandings.json": MOCK_DRIVER_STANDINGS_RESPONSE,
+        })
+        from connectors.standings_connector import get_driver_standings_all_rounds
+        rounds = await get_driver_standings_all_rounds(2024, after_round=1, calendar=self._calendar())
+        self.assertEqual([r["round"] for r in rounds], [2, 3])
+        self.assertEqual(rounds[0]["race_name"], "Saudi Arabian Grand Prix")
+        self.assertEqual(len(upstream.requests), 2)  # round 1 stored, round 4 in the future
+
+    async def test_stops_at_first_unpublished_round(self):
+        self.use_upstream({"/2024/1/driverStandings.json": MOCK_DRIVER_STANDINGS_RESPONSE,
+                           "/2024/3/driverStandings.json": MOCK_DRIVER_STANDINGS_RESPONSE})
+        from connectors.standings_connector import get_driver_standings_all_rounds
+        rounds = await get_driver_standings_all_rounds(2024, calendar=self._calendar())
+        self.assertEqual([r["round"] for r in rounds], [1])
+
+    async def test_progression_falls_back_to_stored_rounds_when_calendar_fails(self):
+        upstream = self.use_upstream({"/2024.json": 503})
+        from api.standings import get_championship_progression
+        from cache import local_cache
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+        stored = [{"round": 1, "race_name": "Bahrain Grand Prix", "standings": []}]
+        with patch("api.standings._load_stored", return_value=(stored, 1)):
+            result = await get_championship_progression(2024)
+        self.assertEqual(result, {"season": 2024, "rounds": stored})
+        self.assertTrue(all(url.endswith("/2024.json") for url in upstream.requests))
+
+
+class TestEventFanOut(ConnectorTestCase):
+    async def test_event_sections_fetch_each_url_once(self):
+        results = {"MRData": {"RaceTable": {"Races": [{
+            "raceName": "Bahrain Grand Prix",
+            "date": "2024-03-02",
+            "Circuit": {"circuitName": "Bahrain International Circuit", "Location": {}},
+            "Results": [],
+        }]}}}
+        empty = {"MRData": {"RaceTable": {"Races": []}}}
+        upstream = self.use_upstream({
+            "/2024/1/results.json": results,
+            "/2024/1/qualifying.json": empty,
+            "/2024/1/sprint.json": empty,
+            "/2024/1/pitstops.json": empty,
+        })
+
+        async def no_cache(key, compute, ttl_seconds):
+            return await compute()
+
+        from api.events import get_event
+        with patch("api.events.aget_or_compute", no_cache):
+            event = await get_event(round_num=1, season=2024)
+        self.assertEqual(event["race_info"]["race_name"], "Bahrain Grand Prix")
+        self.assertEqual(event["race_results"], [])
+        self.assertEqual(sorted(upstream.requests), sorted(set(upstream.requests)))
+        self.assertEqual(len(upstream.requests), 4)
+
+    def test_empty_sections_expire_sooner(self):
+        from api.events import _section_ttl, SECTION_TTL_S, EMPTY_SECTION_TTL_S
+        self.assertEqual(_section_ttl([]), EMPTY_SECTION_TTL_S)
+        self.assertEqual(_section_ttl([{"stop": 1}]), SECTION_TTL_S)
+
+
+# ─── FastF1 Session Pool ─────────────────────────────────────────────────────
+
+class TestSessionPool(unittest.TestCase):
+    def _pool(self, max_sessions=2, max_bytes=1000):
+        from connectors.session_pool import SessionPool
+        return SessionPool(max_sessions=max_sessions, max_bytes=max_bytes, size_fn=lambda s: s["size"])
+
+    def test_hit_after_load(self):
+        pool = self._pool()
+        loader = MagicMock(return_value={"size": 10})
+        first = pool.get(("2024", 1, "R"), loader)
+        second = pool.get(("2024", 1, "R"), loader)
+        self.assertIs(first, second)
+        loader.assert_called_once()
+        self.assertEqual(pool.stats()["hits"], 1)
+        self.assertEqual(pool.stats()["misses"], 1)
+
+    def test_lru_eviction_by_count(self):
+        pool = self._pool(max_sessions=2)
+        pool.get("a", lambda: {"size": 1})
+        pool.get("b", lambda: {"size": 1})
+        pool.get("a", lambda: {"size": 1})  # touch a → b is now least recent
+        pool.get("c", lambda: {"size": 1})
+        self.assertIsNotNone(pool.peek("a"))
+        self.assertIsNone(pool.peek("b"))
+        self.assertEqual(pool.stats()["evictions"], 1)
+
+    def test_eviction_by_bytes(self):
+        pool = self._pool(max_sessions=10, max_bytes=100)
+        pool.get("a", lambda: {"size": 60})
+        pool.get("b", lambda: {"size": 60})
+        self.assertIsNone(pool.peek("a"))
+        self.assertIsNotNone(pool.peek("b"))
+
+    def test_failed_load_not_pooled(self):
+        pool = self._pool()
+        self.assertIsNone(pool.get("a", lambda: None))
+        self.assertEqual(pool.stats()["sessions"], 0)
+        self.assertEqual(pool.stats()["load_failures"], 1)
+
+    def test_concurrent_requests_share_one_load(self):
+        import threading
+        import time
+        pool = self._pool()
+        calls = []
+
+        def slow_loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return {"size": 1}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(pool.get("a", slow_loader)))
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(r is results[0] for r in results))
+
+    def test_request_during_sizing_does_not_load_again(self):
+        import threading
+        from connectors.session_pool import SessionPool
+        sizing, release = threading.Event(), threading.Event()
+
+        def slow_size(session):
+            sizing.set()
+            release.wait(1)
+            return 1
+
+        pool = SessionPool(max_sessions=4, max_bytes=100, size_fn=slow_size)
+        loader = MagicMock(return_value={"size": 1})
+        first = threading.Thread(target=pool.get, args=("a", loader))
+        first.start()
+        sizing.wait(1)
+        late = threading.Thread(target=pool.get, args=("a", loader))
+        late.start()
+        release.set()
+        first.join()
+        late.join()
+        loader.assert_called_once()
+
+    def test_get_session_upgrades_a_copy_evicted_before_upgrade(self):
+        from connectors import fastf1_connector
+        from connectors.session_pool import SessionPool
+        pool = SessionPool(max_sessions=1, max_bytes=10 ** 9, size_fn=lambda s: 1)
+        loaded = {"telemetry": False}
+        pooled_get = pool.get
+
+        def get(key, loader):
+            session = pooled_get(key, loader)
+            pooled_get("other", lambda: {})  # a concurrent load of another session evicts it
+            return session
+
+        with patch.object(fastf1_connector, "session_pool", pool), \
+                patch.object(pool, "get", side_effect=get), \
+                patch.object(fastf1_connector, "load_session", return_value=loaded), \
+                patch.object(fastf1_connector, "has_telemetry", side_effect=lambda s: s.get("telemetry", False)), \
+                patch.object(fastf1_connector, "_load_telemetry", side_effect=lambda s: s.update(telemetry=True) or True):
+            self.assertIs(fastf1_connector.get_session(2024, 1, "R", telemetry=True), loaded)
+        self.assertTrue(loaded["telemetry"])
+
+    def test_upgrade_in_place_resizes_and_evicts(self):
+        pool = self._pool(max_sessions=10, max_bytes=100)
+        upgrader = MagicMock(side_effect=lambda s: s.update(size=95, telemetry=True) or True)
+        is_upgraded = lambda s: s.get("telemetry", False)
+        pool.get("a", lambda: {"size": 10})
+        laps_only = pool.get("b", lambda: {"size": 10})
+        self.assertIs(pool.upgrade("b", is_upgraded, upgrader), laps_only)
+        self.assertIs(pool.upgrade("b", is_upgraded, upgrader), laps_only)
+        upgrader.assert_called_once()
+        self.assertEqual(pool.stats()["upgrades"], 1)
+        self.assertIsNone(pool.peek("a"))  # b grew to 95 bytes: 105 is over budget, LRU a goes
+        self.assertIsNone(pool.upgrade("missing", is_upgraded, upgrader))
+
+
+class TestFastF1DiskCache(unittest.TestCase):
+    def test_index_evicts_least_recently_used(self):
+        import os
+        import tempfile
+        from types import SimpleNamespace
+        from connectors import fastf1_disk_cache as disk
+        root = tempfile.mkdtemp()
+        self.addCleanup(__import__("shutil").rmtree, root, True)
+        paths = [f"2024/2024-03-0{r}_Grand_Prix_{r}/2024-03-0{r}_Race" for r in (1, 2, 3)]
+        for age, rel in zip((3, 2, 1), paths):
+            os.makedirs(os.path.join(root, rel))
+            with open(os.path.join(root, rel, "laps.ff1pkl"), "wb") as f:
+                f.write(b"x" * 400_000)
+            os.utime(os.path.join(root, rel), (0, 1_700_000_000 - age * 3600))  # round 1 is the oldest
+
+        with patch.object(disk.settings, "FASTF1_CACHE_DIR", root), patch.object(disk.settings, "FASTF1_CACHE_MAX_MB", 10):
+            index = disk.scan_index()  # picks up directories nobody recorded
+            self.assertEqual(len(index), 3)
+            self.assertEqual((index[paths[0]]["event"], index[paths[0]]["session"]), ("Grand Prix 1", "Race"))
+            disk.settings.FASTF1_CACHE_MAX_MB = 1
+            disk.record_session(SimpleNamespace(api_path=f"/static/{paths[2]}/"), round_num=3)
+            summary = disk.cache_index()
+        # 1.2 MB over a 1 MB budget: the least recently used session (round 1) goes
+        self.assertFalse(os.path.exists(os.path.join(root, paths[0])))
+        self.assertEqual([e["path"] for e in summary["sessions"]], [paths[2], paths[1]])
+        self.assertEqual(summary["sessions"][0]["round"], 3)
+        self.assertLessEqual(summary["sessions_mb"], 1)
+
+    def test_http_cache_trimmed_first_and_loading_sessions_kept(self):
+        import os
+        import tempfile
+        from datetime import datetime, timedelta, timezone
+        from types import SimpleNamespace
+        from requests_cache.backends.sqlite import SQLiteCache
+        from requests_cache.models.response import CachedResponse
+        from connectors import fastf1_disk_cache as disk
+        root = tempfile.mkdtemp()
+        self.addCleanup(__import__("shutil").rmtree, root, True)
+        paths = [f"2024/2024-03-0{r}_Grand_Prix_{r}/2024-03-0{r}_Race" for r in (1, 2)]
+        for rel in paths:
+            os.makedirs(os.path.join(root, rel))
+            with open(os.path.join(root, rel, "laps.ff1pkl"), "wb") as f:
+                f.write(b"x" * 400_000)
+        http = SQLiteCache(os.path.join(root, disk.HTTP_CACHE_FILE))
+        now = datetime.now(timezone.utc)
+        for i in range(200):
+            response = CachedResponse(status_code=200, url=f"https://example.test/{i}", expires=now + timedelta(hours=i - 100))
+            response._content = os.urandom(5000)
+            http.responses[f"k{i}"] = response
+        http.close()
+
+        with patch.object(disk.settings, "FASTF1_CACHE_DIR", root), patch.object(disk.settings, "FASTF1_CACHE_MAX_MB", 10):
+            disk.scan_index()
+            disk.settings.FASTF1_CACHE_MAX_MB = 1
+            loading = SimpleNamespace(api_path=f"/static/{paths[0]}/")
+            with disk.loading(loading):
+                disk.record_session(SimpleNamespace(api_path=f"/static/{paths[1]}/"))
+            summary = disk.cache_index()
+        # Sessions alone are 0.8 MB: the HTTP cache shrinks to the remaining 0.2 MB and the
+        # least recently used session survives because it is being loaded
+        self.assertTrue(all(os.path.exists(os.path.join(root, rel)) for rel in paths))
+        self.assertLessEqual(summary["http_cache_mb"], 0.3)
+        self.assertNotIn("dir", summary)
+        self.assertEqual(os.listdir(os.path.join(root, disk.LOADING_DIR)), [])
+
+    def test_rescan_needs_admin_token(self):
+        from fastapi.testclient import TestClient
+        from main import app
+        from api import admin
+        client = TestClient(app)
+        with patch("api.admin.cache_index", return_value={"sessions": []}) as index:
+            with patch.object(admin.settings, "ADMIN_TOKEN", ""):
+                self.assertEqual(client.post("/admin/fastf1-cache/rescan").status_code, 403)
+            with patch.object(admin.settings, "ADMIN_TOKEN", "s3cret"):
+                self.assertEqual(client.post("/admin/fastf1-cache/rescan", headers={"X-Admin-Token": "nope"}).status_code, 401)
+                self.assertEqual(client.post("/admin/fastf1-cache/rescan", headers={"X-Admin-Token": "s3cret"}).status_code, 200)
+            self.assertEqual(client.get("/admin/fastf1-cache?rescan=true").status_code, 200)
+        self.assertEqual([c.kwargs for c in index.call_args_list], [{"rescan": True}, {}])
+
+
+# ─── FastF1 Lap Extraction ───────────────────────────────────────────────────
+
+class TestSessionLoader(unittest.TestCase):
+    def test_inline_when_no_workers(self):
+        from connectors.session_loader import SessionLoader
+        loader = SessionLoader(workers=0, max_pending=0)
+        self.assertEqual(loader.run(divmod, 7, 2), (3, 1))
+        self.assertEqual(loader.stats()["submitted"], 0)
+
+    def test_worker_process_coalescing_and_back_pressure(self):
+        import os
+        import threading
+        import time
+        from connectors.session_loader import SessionLoader, LoaderBusy
+        loader = SessionLoader(workers=1, max_pending=1)
+        self.addCleanup(loader.shutdown)
+        self.assertNotEqual(loader.run(os.getpid), os.getpid())  # ran in the worker process
+
+        threads = [threading.Thread(target=loader.run, args=(time.sleep, 0.5)) for _ in range(3)]
+        threads.append(threading.Thread(target=loader.run, args=(time.sleep, 0.4)))
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        with self.assertRaises(LoaderBusy):
+            loader.run(time.sleep, 0.3)  # 2 distinct jobs already queued/running
+        for t in threads:
+            t.join()
+
+        stats = loader.stats()
+        self.assertEqual(stats["submitted"], 3)
+        self.assertEqual(stats["coalesced"], 2)
+        self.assertEqual(stats["rejected"], 1)
+        self.assertEqual(stats["pending"], 0)
+
+
+class TestGetLaps(unittest.TestCase):
+    def _session(self):
+        import pandas as pd
+        from types import SimpleNamespace
+        laps = pd.DataFrame({
+            "Driver": ["VER", "VER", "HAM"],
+            "LapNumber": [1.0, 2.0, 1.0],
+            "LapTime": pd.to_timedelta([91.5, None, 92.25], unit="s"),
+            "Sector1Time": pd.to_timedelta([30.0, 30.5, None], unit="s"),
+            "Sector2Time": pd.to_timedelta([31.0, 31.5, 31.25], unit="s"),
+            "Sector3Time": pd.to_timedelta([30.5, None, 30.0], unit="s"),
+            "Compound": ["SOFT", "SOFT", "HARD"],
+            "Stint": [1.0, 1.0, float("nan")],
+            "IsPersonalBest": [True, False, False],
+            "TrackStatus": ["1", "4", "1"],
+            "Time": pd.to_timedelta([3691.5, 3783.0, None], unit="s"),
+            "LapStartTime": pd.to_timedelta([3600.0, 3691.5, 3607.75], unit="s"),
+            "Team": ["Red Bull Racing", "Red Bull Racing", "Mercedes"],
+        })
+        return SimpleNamespace(laps=laps)
+
+    def test_records_contract(self):
+        from connectors.fastf1_connector import get_laps
+        laps = get_laps(self._session())
+        self.assertEqual(len(laps), 3)
+        self.assertEqual(laps[0], {
+            "driver_id": "VER",
+            "lap_number": 1,
+            "lap_time_ms": 91500.0,
+            "sector1_ms": 30000.0,
+            "sector2_ms": 31000.0,
+            "sector3_ms": 30500.0,
+            "compound": "SOFT",
+            "stint": 1,
+            "is_personal_best": True,
+            "track_status": "1",
+            "gap_to_leader_s": None,
+            "gap_ahead_s": None,
+            "session_time_s": 3691.5,
+            "team": "Red Bull Racing",
+        })
+        self.assertEqual(laps[2]["session_time_s"], 3700.0)  # no Time: lap start + lap time
+        self.assertIsInstance(laps[0]["lap_number"], int)
+        self.assertIsInstance(laps[0]["stint"], int)
+        self.assertIsNone(laps[1]["lap_time_ms"])
+        self.assertIsNone(laps[2]["sector1_ms"])
+        self.assertIsNone(laps[2]["stint"])
+
+    def test_columnar_arrays(self):
+        import numpy as np
+        from connectors.fastf1_connector import get_laps
+        cols = get_laps(self._session(), columnar=True)
+        np.testing.assert_allclose(cols["lap_time_ms"], [91500.0, np.nan, 92250.0])
+        self.assertEqual(list(cols["driver_id"]), ["VER", "VER", "HAM"])
+        self.assertEqual(cols["lap_number"].dtype, np.int64)
+
+    def test_none_session(self):
+        from connectors.fastf1_connector import get_laps
+        self.assertEqual(get_laps(None), [])
+        self.assertEqual(get_laps(None, columnar=True), {})
+
+
+# ─── Telemetry Normalizer ────────────────────────────────────────────────────
+
+class TestTelemetryNormalizer(unittest.TestCase):
+    def _frame(self, n=800):
+        import numpy as np
+        import pandas as pd
+        distance = np.linspace(0, 5000, n)
+        return pd.DataFrame({
+            "Distance": distance,
+            "Speed": 200 + 100 * np.sin(distance / 300),
+            "Throttle": np.full(n, 100.0),
+            "Brake": np.zeros(n, dtype=bool),
+            "nGear": np.full(n, 7),
+            "RPM": np.full(n, 11000.0),
+            "DRS": np.zeros(n),
+            "X": distance,
+            "Y": -distance,
+        })
+
+    def test_records_match_row_contract(self):
+        from normalizers.telemetry_normalizer import extract_telemetry_columns, columns_to_records
+        records = columns_to_records(extract_telemetry_columns(self._frame(3)))
+        self.assertEqual(len(records), 3)
+        self.assertEqual(
+            list(records[0]), ["distance", "speed", "throttle", "brake", "gear", "rpm", "drs", "x", "y"]
+        )
+        self.assertIsInstance(records[0]["gear"], int)
+        self.assertIsInstance(records[0]["rpm"], int)
+        self.assertEqual(records[0]["brake"], 0.0)
+
+    def test_missing_channel_defaults_to_zero(self):
+        from normalizers.telemetry_normalizer import extract_telemetry_columns
+        columns = extract_telemetry_columns(self._frame(5).drop(columns=["RPM"]))
+        self.assertEqual(columns["rpm"].tolist(), [0] * 5)
+
+    def test_lttb_keeps_endpoints_and_count(self):
+        import numpy as np
+        from normalizers.telemetry_normalizer import extract_telemetry_columns, downsample_columns
+        columns = extract_telemetry_columns(self._frame(800))
+        small = downsample_columns(columns, 500)
+        self.assertEqual(len(small["speed"]), 500)
+        self.assertEqual(small["distance"][0], columns["distance"][0])
+        self.assertEqual(small["distance"][-1], columns["distance"][-1])
+        self.assertTrue(np.all(np.diff(small["distance"]) > 0))
+        # Extremes of the speed trace survive downsampling
+        self.assertAlmostEqual(small["speed"].max(), columns["speed"].max(), delta=1.0)
+        self.assertAlmostEqual(small["speed"].min(), columns["speed"].min(), delta=1.0)
+
+    def test_lttb_noop_when_below_threshold(self):
+        from normalizers.telemetry_normalizer import lttb_indices
+        self.assertEqual(lttb_indices([0, 1, 2], [5, 6, 7], 10).tolist(), [0, 1, 2])
+
+
+class TestTelemetryComparison(unittest.TestCase):
+    def _lap(self, n, speed_kph, gear_change_at):
+        import numpy as np
+        distance = np.linspace(0, 1000 + n, n)  # laps end at slightly different distances
+        return {
+            "distance": distance,
+            "speed": np.full(n, float(speed_kph)),
+            "gear": np.where(distance < gear_change_at, 6, 7),
+        }
+
+    def test_alignment_and_delta(self):
+        import numpy as np
+        from normalizers.telemetry_normalizer import align_to_distance, elapsed_time
+        laps = [self._lap(300, 180, 500.0), self._lap(420, 200, 600.0)]
+        grid, aligned = align_to_distance(laps, 101)
+        self.assertEqual(grid[-1], 1300.0)  # shortest lap's end
+        self.assertEqual(set(aligned[0]), {"speed", "gear"})
+        self.assertTrue(set(np.unique(aligned[1]["gear"])) <= {6, 7})  # held, not interpolated
+        self.assertEqual(aligned[1]["gear"][grid < 590].max(), 6)
+
+        elapsed = elapsed_time(grid, np.vstack([a["speed"] for a in aligned]))
+        self.assertAlmostEqual(elapsed[0, -1], 1300 / 50.0)  # 180 km/h = 50 m/s
+        delta = elapsed[1] - elapsed[0]
+        self.assertAlmostEqual(delta[-1], 1300 / (200 / 3.6) - 1300 / 50.0)
+        self.assertTrue(np.all(np.diff(delta) <= 1e-12))  # the faster lap keeps gaining
+
+    def test_compare_loads_session_once(self):
+        from types import SimpleNamespace
+        from connectors.session_loader import session_loader
+        from api.telemetry import _compute_comparison
+        import pandas as pd
+
+        class Lap(dict):
+            def get_telemetry(self):
+                return pd.DataFrame({"Distance": [0.0, 500.0, 1000.0], "Speed": [self["speed"]] * 3})
+
+        fastest = {"VER": Lap(LapNumber=12, speed=300.0), "NOR": Lap(LapNumber=14, speed=295.0),
+                   "LEC": Lap(LapNumber=9, speed=290.0)}
+        laps = SimpleNamespace(pick_drivers=lambda code: SimpleNamespace(pick_fastest=lambda: fastest[code]))
+        with patch.object(session_loader, "workers", 0), \
+                patch("connectors.session_loader.get_session", return_value=SimpleNamespace(laps=laps)) as load, \
+                patch("api.telemetry.load_stored_telemetry_many", side_effect=lambda s, r, t, laps: [None] * len(laps)), \
+                patch("api.telemetry.persist_lap_telemetry") as persist:
+            result = _compute_comparison(2024, 1, "Q", [("VER", None), ("NOR", None), ("LEC", None)], 50)
+        load.assert_called_once()
+        self.assertEqual(len(persist.call_args.args[3]), 3)
+        self.assertEqual(result["reference"], {"driver_code": "VER", "lap_number": 12})
+        self.assertEqual([lap["lap_number"] for lap in result["laps"]], [12, 14, 9])
+        self.assertEqual(len(result["distance"]), 50)
+        self.assertEqual(result["laps"][0]["delta_s"], [0.0] * 50)
+        nor, lec = result["laps"][1]["delta_s"][-1], result["laps"][2]["delta_s"][-1]
+        self.assertGreater(nor, 0)
+        self.assertGreater(lec, nor)
+
+
+class TestTelemetryCodec(unittest.TestCase):
+    def _columns(self):
+        import numpy as np
+        return {
+            "distance": np.array([0.0, 10.5, 21.0]),
+            "speed": np.array([280.25, 281.5, 283.0]),
+            "gear": np.array([7, 7, 8]),
+        }
+
+    def test_packed_roundtrip(self):
+        from normalizers.telemetry_codec import encode_packed, decode_packed
+        body = encode_packed(self._columns())
+        decoded = decode_packed(body)
+        self.assertEqual(list(decoded), ["distance", "speed", "gear"])
+        self.assertEqual(decoded["speed"].tolist(), [280.25, 281.5, 283.0])
+        self.assertEqual(decoded["gear"].tolist(), [7.0, 7.0, 8.0])
+
+    def test_packed_rejects_foreign_buffer(self):
+        from normalizers.telemetry_codec import decode_packed, CodecError
+        with self.assertRaises(CodecError):
+            decode_packed(b"not telemetry at all")
+
+    def test_lap_blob_roundtrip_and_size(self):
+        import numpy as np
+        from normalizers.telemetry_codec import encode_lap_blob, decode_lap_blob, zstandard
+        n = 750
+        distance = np.linspace(0, 5400, n)
+        columns = {
+            "distance": distance,
+            "speed": 200 + 100 * np.sin(distance / 400),
+            "throttle": np.where(np.sin(distance / 400) > 0, 100.0, 20.0),
+            "brake": (np.sin(distance / 400) < -0.8).astype(np.float64),
+            "gear": (5 + 3 * np.sin(distance / 400)).astype(np.int64),
+            "rpm": (10500 + 1500 * np.sin(distance / 90)).astype(np.int64),
+            "drs": np.zeros(n, dtype=np.int64),
+            "x": 3000 * np.cos(distance / 860),
+            "y": 3000 * np.sin(distance / 860),
+        }
+        blob = encode_lap_blob(columns)
+        decoded = decode_lap_blob(blob)
+        self.assertEqual(list(decoded), list(columns))
+        for name in columns:
+            np.testing.assert_allclose(decoded[name], columns[name], rtol=1e-6)
+        self.assertEqual(decoded["gear"].dtype, np.int8)
+        raw_float64 = n * len(columns) * 8
+        self.assertLess(len(blob), raw_float64 // (3 if zstandard is not None else 2))
+
+    def test_negotiation(self):
+        from normalizers.telemetry_codec import (
+            negotiate_media_type, PACKED_MEDIA_TYPE, JSON_MEDIA_TYPE,
+        )
+        self.assertEqual(negotiate_media_type(None), JSON_MEDIA_TYPE)
+        self.assertEqual(negotiate_media_type("*/*"), JSON_MEDIA_TYPE)
+        self.assertEqual(negotiate_media_type(PACKED_MEDIA_TYPE), PACKED_MEDIA_TYPE)
+        self.assertEqual(
+            negotiate_media_type(f"application/json;q=0.5, {PACKED_MEDIA_TYPE}"), PACKED_MEDIA_TYPE
+        )
+        self.assertEqual(
+            negotiate_media_type(f"{PACKED_MEDIA_TYPE};q=0, application/json"), JSON_MEDIA_TYPE
+        )
+
+    def test_binary_response_names_its_lap(self):
+        from types import SimpleNamespace
+        from api.telemetry import LAP_NUMBER_HEADER, get_driver_telemetry
+        from cache import local_cache
+        from normalizers.telemetry_codec import PACKED_MEDIA_TYPE, decode_packed
+        request = SimpleNamespace(headers={"accept": PACKED_MEDIA_TYPE})
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+        with patch("api.telemetry._driver_laps", return_value=[(23, self._columns())]) as laps:
+            for _ in range(2):  # computed, then from the cache
+                response = get_driver_telemetry(request, 2024, 1, "Q", "VER", None, "records", None)
+                self.assertEqual(response.headers[LAP_NUMBER_HEADER], "23")
+                self.assertEqual(list(decode_packed(response.body)), ["distance", "speed", "gear"])
+        laps.assert_called_once()
+
+    def test_keys_normalise_session_type_and_driver(self):
+        from types import SimpleNamespace
+        from api.telemetry import get_driver_telemetry
+        from cache import cache_key
+        request = SimpleNamespace(headers={})
+        with patch("api.telemetry.get_or_compute_json", return_value=b"{}") as cached:
+            get_driver_telemetry(request, 2024, 1, "q", "ver", None, "records", None)
+        self.assertEqual(cached.call_args[0][0], cache_key("telemetry", 2024, 1, "Q", "VER", "fastest", "records", "raw"))
+
+    def test_fastest_lap_expires_like_session_analytics(self):
+        from types import SimpleNamespace
+        from api.telemetry import LAP_TTL_S, get_driver_telemetry
+        from cache import local_cache
+        from normalizers.telemetry_codec import PACKED_MEDIA_TYPE
+        request = SimpleNamespace(headers={"accept": PACKED_MEDIA_TYPE})
+        self.addCleanup(local_cache.clear)
+        for lap_number, ttl in ((None, 900), (23, LAP_TTL_S)):
+            local_cache.clear()
+            with patch("api.telemetry._driver_laps", return_value=[(23, self._columns())]), \
+                    patch("api.telemetry.session_ttl", return_value=900), \
+                    patch("cache.cache_set_bytes") as cache_set:
+                get_driver_telemetry(request, 2024, 1, "Q", "VER", lap_number, "records", None)
+            self.assertEqual(cache_set.call_args[0][2], ttl)
+
+    def test_arrow_roundtrip(self):
+        from normalizers.telemetry_codec import encode_arrow, arrow_available
+        if not arrow_available():
+            self.skipTest("pyarrow not installed")
+        import pyarrow as pa
+        table = pa.ipc.open_stream(encode_arrow(self._columns())).read_all()
+        self.assertEqual(table.column("gear").to_pylist(), [7, 7, 8])
+        self.assertEqual(table.num_rows, 3)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+"""Backend unit tests — background ingestion worker."""
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+CALENDAR = [
+    {"season": 2024, "round": 5, "sessions": {"Q": "2024-04-20T07:00:00Z", "R": "2024-04-21T07:00:00Z"}},
+    {"season": 2024, "round": 6, "sessions": {
+        "FP1": "2024-05-03T16:30:00Z", "S": "2024-05-04T16:00:00Z",
+        "Q": "2024-05-04T20:00:00Z", "R": "2024-05-05T20:00:00Z",
+    }},
+]
+
+
+class TestFinishedSessions(unittest.TestCase):
+    def test_window_and_types(self):
+        from ingestion.worker import finished_sessions
+        # Sunday 22:40 UTC: the race ended at 22:00, so it is still settling
+        now = datetime(2024, 5, 5, 22, 40)
+        due = finished_sessions(CALENDAR, now, lookback_h=72, settle_min=60, session_types=["Q", "S", "R"])
+        self.assertEqual([(s["round"], s["session_type"]) for s in due], [(6, "S"), (6, "Q")])
+        self.assertEqual(due[0]["session_end"], datetime(2024, 5, 4, 17, 0))
+
+    def test_no_lookback_covers_whole_season(self):
+        from ingestion.worker import finished_sessions
+        now = datetime(2024, 5, 6)
+        due = finished_sessions(CALENDAR, now, lookback_h=None, settle_min=60, session_types=["R"])
+        self.assertEqual([s["round"] for s in due], [5, 6])
+
+
+class TestWorker(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        from cache import local_cache
+        from ingestion import worker
+        worker._warmed.clear()
+        local_cache.clear()
+        self.addCleanup(local_cache.clear)
+        self.persisted = []
+        for target, kwargs in (
+            ("ingestion.worker.get_calendar", {"return_value": CALENDAR}),
+            ("ingestion.worker._persist_job", {"side_effect": self.persisted.append}),
+            ("ingestion.worker.ingest_session_telemetry", {"return_value": 0}),
+        ):
+            patcher = patch(target, **kwargs)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(worker._warmed.clear)
+
+    async def test_warms_due_sessions_once_and_records_jobs(self):
+        from fastapi import HTTPException
+        from ingestion.worker import run_once
+
+        def analytics(season, round_num, session_type):
+            if session_type == "S":
+                raise HTTPException(status_code=404, detail="Session data not available")
+            return {}
+
+        now = datetime(2024, 5, 6, 12, 0)
+        with patch("ingestion.worker.get_session_analytics", side_effect=analytics) as compute:
+            jobs = await run_once(now=now)
+            self.assertEqual(compute.call_count, 3)  # S, Q, R of round 6
+            self.assertEqual([j["status"] for j in jobs], ["unavailable", "succeeded", "succeeded"])
+            self.assertEqual(jobs[2]["session_type"], "R")
+            self.assertGreater(jobs[2]["lag_s"], 0)
+            self.assertEqual(len(self.persisted), 3)
+
+            # Only the unavailable sprint is retried on the next poll
+            jobs = await run_once(now=now)
+            self.assertEqual([(j["session_type"], j["status"]) for j in jobs], [("S", "unavailable")])
+
+    async def test_final_stage_replaces_laps_once(self):
+        from ingestion import worker
+        # Tuesday: the sprint, qualifying and race of round 6 ended 48 h or more ago, the race not
+        now = datetime(2024, 5, 7, 0, 0)
+        with patch("ingestion.worker.get_session_analytics", return_value={}), \
+                patch("ingestion.worker.refresh_session_laps", return_value=20) as refresh:
+            jobs = await worker.run_once(now=now)
+            self.assertEqual([(j["session_type"], j["stage"]) for j in jobs],
+                             [("S", "final"), ("Q", "final"), ("R", "settled")])
+            self.assertEqual([c.args[2] for c in refresh.call_args_list], ["S", "Q"])
+
+            # Another worker (a fresh _warmed) sees the stage markers and skips every session
+            worker._warmed.clear()
+            self.assertEqual(await worker.run_once(now=now), [])
+            self.assertEqual(refresh.call_count, 2)
+
+            # Later the race reaches its final stage too
+            jobs = await worker.run_once(now=datetime(2024, 5, 8, 0, 0))
+            self.assertEqual([(j["session_type"], j["stage"]) for j in jobs], [("R", "final")])
+
+    async def test_session_leased_by_another_worker_is_skipped(self):
+        from ingestion import worker
+        with patch("cache._acquire_lease", return_value=False), \
+                patch("ingestion.worker.get_session_analytics") as compute:
+            jobs = await worker.run_once(now=datetime(2024, 5, 6, 12, 0))
+        self.assertEqual(jobs, [])
+        compute.assert_not_called()
+        self.assertEqual(worker._warmed, {})  # retried next poll, when the holder's marker shows it done
+
+
+if __name__ == "__main__":
+    unittest.main()
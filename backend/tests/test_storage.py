@@ -0,0 +1,279 @@
+"""Backend unit tests — persistence (SQLite in-memory stand-in for PostgreSQL)."""
+import unittest
+
+
+def make_db():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from models import Base
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def standings_entry(driver_id, code, position, points, team="red_bull"):
+    return {
+        "position": str(position),
+        "points": str(points),
+        "wins": "0",
+        "Driver": {"driverId": driver_id, "code": code, "givenName": code, "familyName": driver_id},
+        "Constructors": [{"constructorId": team, "name": team.title()}],
+    }
+
+
+def lap_session():
+    import pandas as pd
+    from types import SimpleNamespace
+    laps = pd.DataFrame({
+        "Driver": ["VER", "VER", "HAM"],
+        "LapNumber": [1.0, 2.0, 1.0],
+        "LapTime": pd.to_timedelta([91.5, None, 92.25], unit="s"),
+        "Sector1Time": pd.to_timedelta([30.0, 30.5, None], unit="s"),
+        "Sector2Time": pd.to_timedelta([31.0, 31.5, 31.25], unit="s"),
+        "Sector3Time": pd.to_timedelta([30.5, None, 30.0], unit="s"),
+        "Compound": ["SOFT", "SOFT", "HARD"],
+        "Stint": [1.0, 1.0, float("nan")],
+        "IsPersonalBest": [True, False, False],
+        "TrackStatus": ["1", "4", "1"],
+        "Time": pd.to_timedelta([3691.5, 3783.0, 3700.0], unit="s"),
+        "Team": ["Red Bull Racing", "Red Bull Racing", "Mercedes"],
+    })
+    results = pd.DataFrame({
+        "Abbreviation": ["VER"],
+        "DriverId": ["max_verstappen"],
+        "FullName": ["Max Verstappen"],
+        "TeamId": ["red_bull"],
+        "TeamName": ["Red Bull Racing"],
+    })
+    return SimpleNamespace(laps=laps, results=results, event={"EventName": "Bahrain Grand Prix"},
+                           date=pd.Timestamp("2024-03-02 15:00"))
+
+
+class TestStandingsStore(unittest.TestCase):
+    def setUp(self):
+        self.db = make_db()
+        self.addCleanup(self.db.close)
+
+    def _rounds(self):
+        return [
+            {"round": 1, "race_name": "Bahrain Grand Prix", "standings": [
+                standings_entry("max_verstappen", "VER", 1, 26),
+                standings_entry("norris", "NOR", 2, 18, team="mclaren"),
+            ]},
+            {"round": 2, "race_name": "Saudi Arabian Grand Prix", "standings": [
+                standings_entry("max_verstappen", "VER", 1, 51),
+                standings_entry("norris", "NOR", 2, 30, team="mclaren"),
+            ]},
+        ]
+
+    def test_roundtrip(self):
+        from storage.standings_store import save_progression_rounds, load_progression, last_stored_round
+        save_progression_rounds(self.db, 2024, self._rounds())
+        self.assertEqual(last_stored_round(self.db, 2024), 2)
+        progression = load_progression(self.db, 2024)
+        self.assertEqual([r["round"] for r in progression], [1, 2])
+        self.assertEqual(progression[1]["race_name"], "Saudi Arabian Grand Prix")
+        self.assertEqual(progression[1]["standings"][0]["driver_code"], "VER")
+        self.assertEqual(progression[1]["standings"][0]["points"], 51.0)
+
+    def test_resaving_a_round_is_idempotent(self):
+        from storage.standings_store import save_progression_rounds, load_progression
+        save_progression_rounds(self.db, 2024, self._rounds())
+        save_progression_rounds(self.db, 2024, self._rounds()[1:])
+        progression = load_progression(self.db, 2024)
+        self.assertEqual([len(r["standings"]) for r in progression], [2, 2])
+
+    def test_empty_season(self):
+        from storage.standings_store import load_progression, last_stored_round
+        self.assertEqual(load_progression(self.db, 2030), [])
+        self.assertEqual(last_stored_round(self.db, 2030), 0)
+
+
+class TestLapStore(unittest.TestCase):
+    def setUp(self):
+        self.db = make_db()
+        self.addCleanup(self.db.close)
+
+    def test_ingested_laps_match_get_laps(self):
+        from connectors.fastf1_connector import extract_session_laps, get_laps
+        from ingestion.sessions import ingest_laps
+        from storage.lap_store import load_laps
+        session = lap_session()
+        self.assertEqual(ingest_laps(self.db, 2024, 1, "R", extract_session_laps(session)), 3)
+        stored = load_laps(self.db, 2024, 1, "r")
+        key = lambda l: (l["driver_id"], l["lap_number"])
+        self.assertEqual(sorted(stored, key=key), sorted(get_laps(session), key=key))
+
+    def test_reingest_is_idempotent(self):
+        from connectors.fastf1_connector import extract_session_laps
+        from ingestion.sessions import ingest_laps
+        from models import Lap, SessionRecord
+        session = lap_session()
+        ingest_laps(self.db, 2024, 1, "R", extract_session_laps(session))
+        ingest_laps(self.db, 2024, 1, "R", extract_session_laps(session))
+        self.assertEqual(self.db.query(Lap).count(), 3)
+        self.assertEqual(self.db.query(SessionRecord).count(), 1)
+
+    def test_replace_drops_laps_fastf1_no_longer_has(self):
+        from connectors.fastf1_connector import extract_session_laps
+        from ingestion.sessions import ingest_laps
+        from storage.lap_store import load_laps
+        session = lap_session()
+        ingest_laps(self.db, 2024, 1, "R", extract_session_laps(session))
+        session.laps = session.laps.iloc[[0, 2]]
+        loaded = extract_session_laps(session)
+        self.assertEqual(ingest_laps(self.db, 2024, 1, "R", loaded, replace=True), 2)
+        stored = load_laps(self.db, 2024, 1, "R")
+        self.assertEqual(sorted((l["driver_id"], l["lap_number"]) for l in stored), [("HAM", 1), ("VER", 1)])
+
+    def test_uses_ergast_driver_ids(self):
+        from connectors.fastf1_connector import extract_session_laps
+        from ingestion.sessions import ingest_laps
+        from models import Lap
+        ingest_laps(self.db, 2024, 1, "R", extract_session_laps(lap_session()))
+        ids = {lap.driver_id for lap in self.db.query(Lap)}
+        self.assertEqual(ids, {"max_verstappen", "HAM"})
+
+    def test_columns_added_to_existing_tables(self):
+        from sqlalchemy import create_engine, inspect, text
+        from db import add_missing_columns
+        from models import Base
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:  # laps as created before it carried the session clock
+            conn.execute(text("CREATE TABLE laps (id INTEGER PRIMARY KEY, session_id INTEGER, lap_number INTEGER)"))
+        Base.metadata.create_all(engine)
+        added = add_missing_columns(engine, Base.metadata)
+        self.assertIn("laps.session_time_s", added)
+        self.assertIn("session_time_s", {c["name"] for c in inspect(engine).get_columns("laps")})
+        self.assertEqual(add_missing_columns(engine, Base.metadata), [])
+
+    def test_not_ingested_returns_none(self):
+        from storage.lap_store import load_laps
+        self.assertIsNone(load_laps(self.db, 2024, 9, "Q"))
+
+
+
+class TestTelemetryStore(unittest.TestCase):
+    def setUp(self):
+        from connectors.fastf1_connector import extract_session_laps
+        from ingestion.sessions import ingest_laps
+        self.db = make_db()
+        self.addCleanup(self.db.close)
+        ingest_laps(self.db, 2024, 1, "R", extract_session_laps(lap_session()))
+
+    def _lap(self, code, lap_number, offset=0.0):
+        import numpy as np
+        from normalizers.telemetry_codec import encode_lap_blob
+        columns = {"distance": np.arange(5.0) * 10, "speed": np.arange(5.0) + offset, "gear": np.full(5, 7)}
+        return code, lap_number, 5, encode_lap_blob(columns)
+
+    def test_save_and_load_single_lap(self):
+        from models import LapTelemetry
+        from storage.telemetry_store import save_lap_telemetry, load_lap_telemetry
+        laps = [self._lap("VER", 1), self._lap("VER", 2, offset=100), self._lap("HAM", 1), self._lap("XXX", 1)]
+        self.assertEqual(save_lap_telemetry(self.db, 2024, 1, "R", laps), 3)  # unknown driver skipped
+        self.assertEqual(save_lap_telemetry(self.db, 2024, 1, "R", laps[:1]), 1)
+        self.assertEqual(self.db.query(LapTelemetry).count(), 3)
+
+        lap_number, lap2 = load_lap_telemetry(self.db, 2024, 1, "R", "VER", 2)
+        self.assertEqual(lap_number, 2)
+        self.assertEqual(lap2["speed"].tolist(), [100.0, 101.0, 102.0, 103.0, 104.0])
+        self.assertEqual(lap2["gear"].tolist(), [7] * 5)
+        self.assertIsNone(load_lap_telemetry(self.db, 2024, 1, "R", "VER", 9))
+
+    def test_fastest_lap_resolved_from_stored_laps(self):
+        from storage.telemetry_store import save_lap_telemetry, load_lap_telemetry
+        save_lap_telemetry(self.db, 2024, 1, "R", [self._lap("VER", 1), self._lap("VER", 2, offset=100)])
+        lap_number, columns = load_lap_telemetry(self.db, 2024, 1, "R", "VER")
+        self.assertEqual(lap_number, 1)  # lap 1 is the personal best
+        self.assertEqual(columns["speed"][0], 0.0)
+        self.assertIsNone(load_lap_telemetry(self.db, 2024, 1, "R", "HAM"))  # no personal-best lap
+        self.assertIsNone(load_lap_telemetry(self.db, 2024, 2, "R", "VER"))
+
+    def test_replacing_laps_drops_their_telemetry(self):
+        from connectors.fastf1_connector import extract_session_laps
+        from ingestion.sessions import ingest_laps
+        from models import LapTelemetry
+        from storage.telemetry_store import save_lap_telemetry
+        save_lap_telemetry(self.db, 2024, 1, "R", [self._lap("VER", 1), self._lap("VER", 2), self._lap("HAM", 1)])
+        session = lap_session()
+        session.laps = session.laps.iloc[[0, 2]]  # VER lap 2 deleted
+        ingest_laps(self.db, 2024, 1, "R", extract_session_laps(session), replace=True)
+        kept = {(row.driver_id, row.lap_number) for row in self.db.query(LapTelemetry)}
+        self.assertEqual(kept, {("max_verstappen", 1), ("HAM", 1)})
+
+    def test_many_laps_in_one_blob_query(self):
+        from sqlalchemy import event
+        from storage.telemetry_store import save_lap_telemetry, load_lap_telemetry_many
+        save_lap_telemetry(self.db, 2024, 1, "R", [self._lap("VER", 1), self._lap("VER", 2, offset=100), self._lap("HAM", 1)])
+        statements = []
+        event.listen(self.db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+        found = load_lap_telemetry_many(
+            self.db, 2024, 1, "R", [("VER", 2), ("HAM", None), ("XXX", 1), ("HAM", 1), ("VER", None), ("VER", 9)]
+        )
+        self.assertEqual([item and item[0] for item in found], [2, None, None, 1, 1, None])
+        self.assertEqual(found[0][1]["speed"][0], 100.0)
+        self.assertEqual(sum("FROM lap_telemetry" in sql for sql in statements), 1)
+
+
+class TestRollupStore(unittest.TestCase):
+    def setUp(self):
+        self.db = make_db()
+        self.addCleanup(self.db.close)
+
+    def _ingest(self, round_num, seed=0):
+        import pandas as pd
+        from types import SimpleNamespace
+        from benchmarks.synthetic import make_laps_frame
+        from connectors.fastf1_connector import extract_session_laps
+        from ingestion.sessions import ingest_laps
+        session = SimpleNamespace(laps=make_laps_frame(1140, seed=seed), results=pd.DataFrame(), event={},
+                                  date=pd.Timestamp("2025-03-16"))
+        ingest_laps(self.db, 2025, round_num, "R", extract_session_laps(session))
+
+    def test_rollups_written_at_ingestion(self):
+        from analytics.rollups import season_degradation, consistency_trend
+        from storage.rollup_store import load_rollups
+        self._ingest(1)
+        self._ingest(2, seed=1)
+        rows = load_rollups(self.db, [2025], "r")
+        self.assertEqual({row["round"] for row in rows}, {1, 2})
+        self.assertEqual({row["compound"] for row in rows}, {"SOFT", "MEDIUM", "HARD"})
+
+        # Synthetic laps lose 50 ms per lap of tyre age
+        for compound in season_degradation(rows):
+            self.assertAlmostEqual(compound["slope_ms_per_lap"], 50.0, delta=10.0)
+            self.assertEqual(compound["rounds"], 2)
+            self.assertAlmostEqual(compound["median_time_ms"], 90500, delta=300)
+
+        trend = consistency_trend(rows)
+        self.assertEqual(len(trend), 20)
+        self.assertEqual([point["round"] for point in trend["VER"]], [1, 2])
+        self.assertGreater(trend["VER"][0]["consistency"], 80.0)  # ~400 ms of noise
+
+    def test_new_round_leaves_existing_rollups_untouched(self):
+        from models import LapRollup
+        self._ingest(1)
+        before = {row.id for row in self.db.query(LapRollup)}
+        self._ingest(2, seed=1)
+        after = {row.id for row in self.db.query(LapRollup)}
+        self.assertTrue(before < after)
+
+    def test_refresh_backfills_sessions_without_rollups(self):
+        from ingestion.rollups import refresh_season_rollups
+        from models import LapRollup
+        from storage.rollup_store import load_rollups
+        self._ingest(1)
+        expected = load_rollups(self.db, [2025], "R")
+        self.db.query(LapRollup).delete()
+        self.db.commit()
+        self.assertEqual(refresh_season_rollups(self.db, 2025), 1)
+        self.assertEqual(refresh_season_rollups(self.db, 2025), 0)
+        key = lambda row: (row["driver_id"], row["compound"])
+        for got, want in zip(sorted(load_rollups(self.db, [2025], "R"), key=key), sorted(expected, key=key)):
+            self.assertEqual(got["laps"], want["laps"])
+            self.assertAlmostEqual(got["sum_xy"], want["sum_xy"], delta=1e-3)
+
+
+if __name__ == "__main__":
+    unittest.main()
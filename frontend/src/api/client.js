@@ -21,11 +21,28 @@ export async function fetchEvent(round, season = 2025) {
     return apiFetch(`/event/${round}?season=${season}`)
 }
 
-export async function fetchAnalytics(season, round, sessionType) {
-    return apiFetch(`/analytics/${season}/${round}/${sessionType}`)
+export async function fetchAnalytics(season, round, sessionType, { metrics = null, drivers = null } = {}) {
+    const params = new URLSearchParams()
+    if (metrics) params.set('metrics', metrics.join(','))
+    if (drivers) params.set('drivers', drivers.join(','))
+    const query = params.toString() ? `?${params}` : ''
+    return apiFetch(`/analytics/${season}/${round}/${sessionType}${query}`)
+}
+
+export async function fetchQualifyingAnalytics(season, round, sessionType = 'Q') {
+    return apiFetch(`/analytics/qualifying/${season}/${round}?session_type=${sessionType}`)
 }
 
 export async function fetchTelemetry(season, round, sessionType, driverCode, lapNumber = null) {
     const lap = lapNumber ? `?lap_number=${lapNumber}` : ''
     return apiFetch(`/telemetry/${season}/${round}/${sessionType}/${driverCode}${lap}`)
 }
+
+export async function fetchTelemetryComparison(season, round, sessionType, driverCodes, laps = 'fastest') {
+    const params = new URLSearchParams({ drivers: driverCodes.join(','), laps: [].concat(laps).join(',') })
+    return apiFetch(`/telemetry/${season}/${round}/${sessionType}/compare?${params}`)
+}
+
+export async function fetchChampionshipProgression(season = 2025) {
+    return apiFetch(`/standings/progression?season=${season}`)
+}